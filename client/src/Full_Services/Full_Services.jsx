@@ -18,13 +18,12 @@ function Full_Services({ formData }) {
   const [executorRating, setExecutorRating] = useState(0);
 
   const [isAuthenticated, setIsAuthenticated] = useState(false);
-  const [filteredServices, setFilteredServices] = useState([]);
-  const [services, setServices] = useState([]);
 
   const API_URL = "http://localhost:8000";
   const userData = JSON.parse(localStorage.getItem("user")) || {};
+  // Отклики сервер записывает под username из токена
   const currentUser =
-    formData?.name || formData?.username || userData.username || "Аноним";
+    userData.username || formData?.username || formData?.name || "Аноним";
 
   const hasResponded = responses.includes(currentUser);
 
@@ -256,6 +255,24 @@ function Full_Services({ formData }) {
     }
   }, [location, service]);
 
+  // Смена статуса и новые оценки приходят по SSE, без повторной загрузки заказа
+  useEffect(() => {
+    if (!service?.id) return;
+
+    const events = new EventSource(`${API_URL}/events?services=${service.id}`);
+    events.addEventListener("service_status", (event) => {
+      const data = JSON.parse(event.data);
+      setStatus(data.status);
+      setService((prev) => prev && ({ ...prev, status: data.status, freelancer_id: data.freelancer_id }));
+    });
+    events.addEventListener("rating", (event) => {
+      const data = JSON.parse(event.data);
+      fetchExecutorRating(data.worker_id);
+    });
+
+    return () => events.close();
+  }, [service?.id]);
+
   const changeStatus = async (newStatus) => {
     try {
       setLoading(true);
@@ -305,9 +322,8 @@ function Full_Services({ formData }) {
           {
             method: "POST",
             headers: {
-              "Content-Type": "application/json",
+              Authorization: `Bearer ${localStorage.getItem("token")}`,
             },
-            body: JSON.stringify({ name: currentUser }),
           }
         );
 
@@ -491,19 +507,6 @@ function Full_Services({ formData }) {
     return () => window.removeEventListener("storage", checkAuth);
   }, []);
 
-  const fetchServices = async () => {
-    try {
-      setLoading(true);
-      const response = await axios.get("http://localhost:8000/services");
-      setServices(response.data);
-      setFilteredServices(response.data);
-      setLoading(false);
-    } catch (err) {
-      setError(err.message);
-      setLoading(false);
-    }
-  };
-
   if (!service) {
     return <div>Сервис не найден</div>;
   }
@@ -19,12 +19,10 @@ function Main() {
     if (!searchQuery.trim()) return;
 
     try {
-      const response = await axios.get(`${API_URL}/services`);
-      const services = response.data;
-
-      const foundService = services.find(service =>
-        service.service_title.toLowerCase().includes(searchQuery.toLowerCase())
-      );
+      const response = await axios.get(`${API_URL}/services/search`, {
+        params: { q: searchQuery.trim(), limit: 1 }
+      });
+      const foundService = response.data.items[0];
 
       if (foundService) {
         navigate('/Full_Services', { state: { service: foundService } });
@@ -45,11 +43,8 @@ function Main() {
 
         const newCounts = { ...counts };
 
-        categories.forEach((category) => {
-          if (category === 'Программирование') newCounts.Программирование += 1;
-          if (category === 'Дизайн') newCounts.Дизайн += 1;
-          if (category === 'Маркетинг') newCounts.Маркетинг += 1;
-          if (category === 'Копирайтинг') newCounts.Копирайтинг += 1;
+        categories.forEach(({ name, count }) => {
+          if (name in newCounts) newCounts[name] = count;
         });
 
         setCounts(newCounts);
@@ -587,8 +587,9 @@ const GeneralInfo = ({
 };
 
 const FinancesSection = () => {
-  const [finances, setFinances] = useState({ balance: 0, total_earned: 0, transactions: [] });
+  const [finances, setFinances] = useState({ balance: 0, total_earned: 0, transactions: [], next_cursor: null });
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
   const API_URL = 'http://localhost:8000';
   const token = localStorage.getItem('token');
 
@@ -625,6 +626,26 @@ const FinancesSection = () => {
     }
   };
 
+  const loadMoreTransactions = async () => {
+    if (!finances.next_cursor) return;
+    setLoadingMore(true);
+    try {
+      const response = await axios.get(`${API_URL}/finances/transactions`, {
+        headers: { Authorization: `Bearer ${token}` },
+        params: { cursor: finances.next_cursor }
+      });
+      setFinances(prev => ({
+        ...prev,
+        transactions: [...prev.transactions, ...response.data.items],
+        next_cursor: response.data.next_cursor
+      }));
+    } catch (err) {
+      console.error("Ошибка загрузки транзакций:", err);
+    } finally {
+      setLoadingMore(false);
+    }
+  };
+
   if (loading) return <div>Загрузка финансов...</div>;
 
   return (
@@ -676,6 +697,11 @@ const FinancesSection = () => {
             <p>Нет транзакций</p>
           </div>
         )}
+        {finances.next_cursor && (
+          <button className="output-output-btn" onClick={loadMoreTransactions} disabled={loadingMore}>
+            {loadingMore ? 'Загрузка...' : 'Показать ещё'}
+          </button>
+        )}
       </div>
     </div>
   );
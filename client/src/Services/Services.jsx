@@ -25,8 +25,10 @@ function Services() {
   const fetchServices = async () => {
     try {
       setLoading(true);
-      const response = await axios.get("http://localhost:8000/services");
-      setServices(response.data.slice(0, 3));
+      const response = await axios.get("http://localhost:8000/services", {
+        params: { limit: 3 }
+      });
+      setServices(response.data.items);
       setLoading(false);
     } catch (err) {
       setError(err.message);
@@ -34,53 +36,37 @@ function Services() {
     }
   };
 
-  const fetchUser = async (userId) => {
-    if (!userId || users[userId]) return;
-    
+  const fetchUsers = async (userIds) => {
+    const ids = [...new Set(userIds.filter(Boolean))];
+    if (ids.length === 0) return;
+
     try {
-      const token = localStorage.getItem("token");
-      const response = await axios.get(`http://localhost:8000/users/${userId}`, {
-        headers: { Authorization: `Bearer ${token}` },
+      const response = await axios.get("http://localhost:8000/users", {
+        params: { ids: ids.join(",") },
       });
-      setUsers(prev => ({ ...prev, [userId]: response.data }));
-    } catch (err) {
-      console.error(`Не удалось загрузить пользователя ${userId}:`, err);
-    }
-  };
 
-  const fetchUserAvatar = async (userId) => {
-    if (!userId || avatars[userId]) return;
-    
-    try {
-      const token = localStorage.getItem("token");
-      const response = await axios.get(
-        `http://localhost:8000/users/${userId}/avatar`,
-        {
-          headers: { Authorization: `Bearer ${token}` },
+      const loadedUsers = {};
+      const loadedAvatars = {};
+      response.data.users.forEach(user => {
+        loadedUsers[user.id] = user;
+
+        let imagePath = user.image_variants?.thumb || user.image_path;
+        if (imagePath && !imagePath.startsWith("/")) {
+          imagePath = "/" + imagePath;
         }
-      );
-      
-      let imagePath = response.data.image_path;
-      if (imagePath && !imagePath.startsWith("/")) {
-        imagePath = "/" + imagePath;
-      }
-      
-      const fullUrl = `http://localhost:8000${imagePath}`;
-      setAvatars(prev => ({ ...prev, [userId]: fullUrl }));
+        loadedAvatars[user.id] = imagePath ? `http://localhost:8000${imagePath}` : null;
+      });
+
+      setUsers(prev => ({ ...prev, ...loadedUsers }));
+      setAvatars(prev => ({ ...prev, ...loadedAvatars }));
     } catch (err) {
-      console.error(`Не удалось загрузить аватарку для пользователя ${userId}:`, err);
-      setAvatars(prev => ({ ...prev, [userId]: null }));
+      console.error("Не удалось загрузить пользователей:", err);
     }
   };
 
   useEffect(() => {
     if (services.length > 0) {
-      services.forEach(service => {
-        if (service.user_id) {
-          fetchUser(service.user_id);
-          fetchUserAvatar(service.user_id);
-        }
-      });
+      fetchUsers(services.map(service => service.user_id));
     }
   }, [services]);
 
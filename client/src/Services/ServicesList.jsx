@@ -1,14 +1,38 @@
-import React, { useState, useEffect } from "react";
+import React, { useState, useEffect, useRef } from "react";
 import axios from "axios";
 import "./Services.css";
 import AddService from "./AddService";
 import { Link, useLocation, useNavigate } from "react-router-dom";
 
+const PAGE_SIZE = 20;
+
+// Значения фильтров -> параметры GET /services: фильтрует сервер, а не браузер
+const BUDGET_PARAMS = {
+  "до 100": { max_price: 100 },
+  "100-500": { min_price: 100, max_price: 500 },
+  "500-1000": { min_price: 500, max_price: 1000 },
+  "1000+": { min_price: 1000 },
+};
+
+const DURATION_PARAMS = {
+  "1-3 дня": { min_duration: 1, max_duration: 3 },
+  "3-7 дней": { min_duration: 3, max_duration: 7 },
+  "1-2 недели": { min_duration: 7, max_duration: 14 },
+  "Месяц+": { min_duration: 30 },
+};
+
+const STATUS_PARAMS = {
+  "Открытые": "Открытый",
+  "В работе": "В разработке",
+  "Завершенные": "Завершенный",
+};
+
 function ServicesList() {
   const [isAuthenticated, setIsAuthenticated] = useState(false);
   const [services, setServices] = useState([]);
-  const [filteredServices, setFilteredServices] = useState([]);
-  const [visibleServices, setVisibleServices] = useState([]);
+  const [visibleCount, setVisibleCount] = useState(0);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
   const [showForm, setShowForm] = useState(false);
@@ -19,6 +43,7 @@ function ServicesList() {
   
   const [users, setUsers] = useState({}); 
   const [avatars, setAvatars] = useState({}); 
+  const requestId = useRef(0);
   
   const location = useLocation();
   const navigate = useNavigate();
@@ -43,7 +68,6 @@ function ServicesList() {
 
   useEffect(() => {
     checkAuth();
-    fetchServices();
   }, []);
 
   useEffect(() => {
@@ -58,113 +82,87 @@ function ServicesList() {
   }, [isAuthenticated]);
 
 
+  // Карточки появляются по одной; после "Показать ещё" анимируются только новые
   useEffect(() => {
-    if (filteredServices.length === 0) return;
-    setVisibleServices([]);
-    const timeouts = [];
-    filteredServices.forEach((_, index) => {
-      const timeout = setTimeout(() => {
-        setVisibleServices((prev) => [...prev, index]);
-      }, 100 * index);
-      timeouts.push(timeout);
-    });
-    return () => {
-      timeouts.forEach(clearTimeout);
-    };
-  }, [filteredServices]);
+    if (visibleCount >= services.length) return;
+    const timeout = setTimeout(() => setVisibleCount((count) => count + 1), visibleCount ? 100 : 0);
+    return () => clearTimeout(timeout);
+  }, [visibleCount, services.length]);
+
+  const fetchUsers = async (userIds) => {
+    const ids = [...new Set(userIds.filter(Boolean))];
+    if (ids.length === 0) return;
 
-  const fetchUser = async (userId) => {
-    if (!userId || users[userId]) return;
-    
     try {
-      const token = localStorage.getItem("token");
-      const response = await axios.get(`http://localhost:8000/users/${userId}`, {
-        headers: { Authorization: `Bearer ${token}` },
+      const response = await axios.get("http://localhost:8000/users", {
+        params: { ids: ids.join(",") },
       });
-      setUsers(prev => ({ ...prev, [userId]: response.data }));
-    } catch (err) {
-      console.error(`Не удалось загрузить пользователя ${userId}:`, err);
-    }
-  };
 
-  const fetchUserAvatar = async (userId) => {
-    if (!userId || avatars[userId]) return;
-    
-    try {
-      const token = localStorage.getItem("token");
-      const response = await axios.get(
-        `http://localhost:8000/users/${userId}/avatar`,
-        {
-          headers: { Authorization: `Bearer ${token}` },
+      const loadedUsers = {};
+      const loadedAvatars = {};
+      response.data.users.forEach(user => {
+        loadedUsers[user.id] = user;
+
+        let imagePath = user.image_variants?.thumb || user.image_path;
+        if (imagePath && !imagePath.startsWith("/")) {
+          imagePath = "/" + imagePath;
         }
-      );
-      
-      let imagePath = response.data.image_path;
-      if (imagePath && !imagePath.startsWith("/")) {
-        imagePath = "/" + imagePath;
-      }
-      
-      const fullUrl = `http://localhost:8000${imagePath}`;
-      setAvatars(prev => ({ ...prev, [userId]: fullUrl }));
+        loadedAvatars[user.id] = imagePath ? `http://localhost:8000${imagePath}` : null;
+      });
+
+      setUsers(prev => ({ ...prev, ...loadedUsers }));
+      setAvatars(prev => ({ ...prev, ...loadedAvatars }));
     } catch (err) {
-      console.error(`Не удалось загрузить аватарку для пользователя ${userId}:`, err);
-      setAvatars(prev => ({ ...prev, [userId]: null }));
+      console.error("Не удалось загрузить пользователей:", err);
     }
   };
 
-  const fetchServices = async () => {
+  const buildParams = (cursor) => {
+    const params = {
+      limit: PAGE_SIZE,
+      ...BUDGET_PARAMS[budget],
+      ...DURATION_PARAMS[duration],
+    };
+    if (category !== "Все категории") params.category = category;
+    if (STATUS_PARAMS[status]) params.status = STATUS_PARAMS[status];
+    if (cursor) params.cursor = cursor;
+    return params;
+  };
+
+  const fetchServices = async (cursor = null) => {
+    // Ответ на устаревшие фильтры не должен перезаписать новый список
+    const currentRequest = ++requestId.current;
     try {
-      setLoading(true);
-      const response = await axios.get("http://localhost:8000/services");
-      setServices(response.data);
-      setFilteredServices(response.data);
-      
-      response.data.forEach(service => {
-        if (service.user_id) {
-          fetchUser(service.user_id);
-          fetchUserAvatar(service.user_id);
-        }
+      if (cursor) setLoadingMore(true);
+      const response = await axios.get("http://localhost:8000/services", {
+        params: buildParams(cursor)
       });
-      
-      setLoading(false);
+      if (currentRequest !== requestId.current) return;
+
+      const items = response.data.items;
+      if (cursor) {
+        setServices((prev) => [...prev, ...items]);
+      } else {
+        setServices(items);
+        setVisibleCount(0);
+      }
+      setNextCursor(response.data.next_cursor);
+      setError(null);
+
+      fetchUsers(items.map(service => service.user_id));
     } catch (err) {
-      setError(err.message);
-      setLoading(false);
+      if (currentRequest === requestId.current) setError(err.message);
+    } finally {
+      if (currentRequest === requestId.current) {
+        setLoading(false);
+        setLoadingMore(false);
+      }
     }
   };
 
   useEffect(() => {
-    let result = [...services];
-    if (category !== "Все категории") {
-      result = result.filter((service) => service.category === category);
-    }
-    if (budget !== "Любой") {
-      if (budget === "до 100") {
-        result = result.filter((service) => service.price <= 100);
-      } else if (budget === "100-500") {
-        result = result.filter((service) => service.price >= 100 && service.price <= 500);
-      } else if (budget === "500-1000") {
-        result = result.filter((service) => service.price >= 500 && service.price <= 1000);
-      } else if (budget === "1000+") {
-        result = result.filter((service) => service.price >= 1000);
-      }
-    }
-    if (duration !== "Любой") {
-      if (duration === "1-3 дня") {
-        result = result.filter((service) => service.duration >= 1 && service.duration <= 3);
-      } else if (duration === "3-7 дней") {
-        result = result.filter((service) => service.duration >= 3 && service.duration <= 7);
-      } else if (duration === "1-2 недели") {
-        result = result.filter((service) => service.duration >= 7 && service.duration <= 14);
-      } else if (duration === "Месяц+") {
-        result = result.filter((service) => service.duration >= 30);
-      }
-    }
-    if (status !== "Все") {
-      result = result.filter((service) => service.status === status);
-    }
-    setFilteredServices(result);
-  }, [category, budget, duration, status, services]);
+    fetchServices();
+  }, [category, budget, duration, status]);
 
   const handleServiceAdded = (newService) => {
     setServices((prev) => [...prev, newService]);
@@ -260,17 +258,17 @@ function ServicesList() {
         </div>
       </div>
       <div className="card-container">
-        {filteredServices.length === 0 ? (
+        {services.length === 0 ? (
           <p className="no-services-message">Нет подходящих заказов</p>
         ) : (
-          filteredServices.map((service, index) => {
+          services.map((service, index) => {
             const user = users[service.user_id];
             const avatar = avatars[service.user_id];
             
             return (
               <div
                 key={service.id}
-                className={`freelancer-card ${visibleServices.includes(index) ? "show" : "hide"}`}
+                className={`freelancer-card ${index < visibleCount ? "show" : "hide"}`}
               >
                 <div className="freelancer-header">
                   <div className="freelancer-avatar">
@@ -324,6 +322,17 @@ function ServicesList() {
           })
         )}
       </div>
+      {nextCursor && (
+        <div className="load-more-container">
+          <button
+            className={`add-service-btn ${loadingMore ? "disabled" : ""}`}
+            disabled={loadingMore}
+            onClick={() => fetchServices(nextCursor)}
+          >
+            {loadingMore ? "Загрузка..." : "Показать ещё"}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
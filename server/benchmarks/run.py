@@ -0,0 +1,248 @@
+"""
+Нагрузочный прогон основных сценариев по базе, наполненной benchmarks.seed.
+
+    cd server
+    python -m benchmarks.run --out baseline.json                  # приложение в том же процессе
+    python -m benchmarks.run --url http://localhost:8000 --out baseline.json
+    python -m benchmarks.run --compare baseline.json --out current.json
+
+Сценарии respond/complete/rate меняют данные: каждый запрос расходует свой заказ.
+Для --url сервер стоит запускать с RATE_LIMIT_ENABLED=0, иначе сценарий login упрётся в лимит.
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import subprocess
+import time
+from datetime import datetime
+
+import httpx
+from sqlalchemy import select
+
+# Меряем маршруты, а не ограничение частоты: в процессе все запросы идут с одного адреса.
+# Задаётся до импорта core.config
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
+from database import SessionLocal
+from models.service import Service
+from models.review import Review
+from models.user import User
+from core.security import create_jwt_token
+from benchmarks.seed import BENCH_PASSWORD, STATUS_OPEN, STATUS_IN_PROGRESS, STATUS_COMPLETED, CATEGORIES
+
+
+SCENARIOS = ["list", "detail", "respond", "complete", "rate", "finances", "login"]
+PERCENTILES = (50, 95, 99)
+
+
+def percentile(sorted_values: list, p: float) -> float:
+    """Процентиль методом ближайшего ранга"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+class Fixtures:
+    """Id и токены из базы, которые нужны сценариям"""
+
+    def __init__(self, requests: int, seed_value: int):
+        self.rng = random.Random(seed_value)
+        limit = requests * 2
+        with SessionLocal() as db:
+            self.max_service_id = db.scalar(select(Service.id).order_by(Service.id.desc()).limit(1)) or 0
+            self.max_user_id = db.scalar(select(User.id).order_by(User.id.desc()).limit(1)) or 0
+            self.open_services = db.execute(
+                select(Service.id, Service.user_id).where(Service.status == STATUS_OPEN).limit(limit)
+            ).all()
+            self.in_progress = db.execute(
+                select(Service.id, Service.freelancer_id).where(Service.status == STATUS_IN_PROGRESS).limit(limit)
+            ).all()
+            rated = select(Review.id).where(Review.service_id == Service.id, Review.reviewer_id == Service.user_id)
+            self.completed = db.execute(
+                select(Service.id, Service.user_id)
+                .where(Service.status == STATUS_COMPLETED, Service.freelancer_id.is_not(None), ~rated.exists())
+                .limit(limit)
+            ).all()
+        if not self.max_user_id or not self.max_service_id:
+            raise SystemExit("База пуста, сначала запустите python -m benchmarks.seed")
+        self._tokens = {}
+
+    def token(self, user_id: int) -> dict:
+        if user_id not in self._tokens:
+            self._tokens[user_id] = create_jwt_token(user_id)
+        return {"Authorization": f"Bearer {self._tokens[user_id]}"}
+
+    def random_user(self) -> int:
+        return self.rng.randint(1, self.max_user_id)
+
+    def take(self, pool: list, scenario: str):
+        if not pool:
+            raise SystemExit(f"Для сценария '{scenario}' закончились заказы, перенаполните базу")
+        return pool.pop()
+
+
+def build_request(scenario: str, fixtures: Fixtures) -> tuple:
+    """(метод, путь, параметры httpx) для одного запроса сценария"""
+    if scenario == "list":
+        params = {"limit": 20}
+        if fixtures.rng.random() < 0.5:
+            params["category"] = fixtures.rng.choice(CATEGORIES)
+        return "GET", "/services", {"params": params}
+    if scenario == "detail":
+        return "GET", f"/services/{fixtures.rng.randint(1, fixtures.max_service_id)}", {}
+    if scenario == "respond":
+        service_id, owner_id = fixtures.take(fixtures.open_services, scenario)
+        responder = owner_id % fixtures.max_user_id + 1
+        return "POST", f"/services/{service_id}/respond", {"headers": fixtures.token(responder)}
+    if scenario == "complete":
+        service_id, freelancer_id = fixtures.take(fixtures.in_progress, scenario)
+        return "PATCH", f"/services/{service_id}/complete", {"headers": fixtures.token(freelancer_id)}
+    if scenario == "rate":
+        service_id, owner_id = fixtures.take(fixtures.completed, scenario)
+        return "POST", f"/services/{service_id}/rate", {
+            "headers": fixtures.token(owner_id),
+            "json": {"rating": fixtures.rng.randint(1, 10) / 2}
+        }
+    if scenario == "finances":
+        return "GET", "/finances", {"headers": fixtures.token(fixtures.random_user())}
+    if scenario == "login":
+        return "POST", "/login", {"json": {"username": f"user{fixtures.random_user()}", "password": BENCH_PASSWORD}}
+    raise ValueError(f"Неизвестный сценарий: {scenario}")
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: str, fixtures: Fixtures,
+                       requests: int, concurrency: int, warmup: int) -> dict:
+    plan = [build_request(scenario, fixtures) for _ in range(warmup + requests)]
+    latencies = []
+    statuses = {}
+    position = 0
+
+    async def worker():
+        nonlocal position
+        while position < len(plan):
+            index = position
+            position += 1
+            method, path, kwargs = plan[index]
+            started = time.perf_counter()
+            response = await client.request(method, path, **kwargs)
+            elapsed = time.perf_counter() - started
+            if index < warmup:
+                continue
+            latencies.append(elapsed)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for code, count in statuses.items() if not code.startswith("2"))
+    result = {
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": statuses,
+        "throughput_rps": round(len(latencies) / wall, 2) if wall else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0
+    }
+    for p in PERCENTILES:
+        result[f"p{p}_ms"] = round(percentile(latencies, p) * 1000, 3)
+    return result
+
+
+def make_client(url: str, concurrency: int) -> httpx.AsyncClient:
+    if url:
+        limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+        return httpx.AsyncClient(base_url=url, limits=limits, timeout=60)
+    from main import app
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=60)
+
+
+async def run(scenarios: list, url: str, requests: int, concurrency: int, warmup: int, seed_value: int) -> dict:
+    fixtures = Fixtures(warmup + requests, seed_value)
+    results = {}
+    async with make_client(url, concurrency) as client:
+        for scenario in scenarios:
+            results[scenario] = await run_scenario(client, scenario, fixtures, requests, concurrency, warmup)
+            print_row(scenario, results[scenario])
+    return {
+        "meta": {
+            "revision": git_revision(),
+            "timestamp": datetime.utcnow().isoformat(timespec="seconds") + "Z",
+            "mode": "http" if url else "in-process",
+            "url": url,
+            "requests": requests,
+            "concurrency": concurrency,
+            "warmup": warmup,
+            "seed": seed_value,
+            "python": platform.python_version(),
+            "platform": platform.platform()
+        },
+        "scenarios": results
+    }
+
+
+def print_row(scenario: str, result: dict):
+    print(
+        f"{scenario:<10} {result['throughput_rps']:>9.1f} rps  "
+        + "  ".join(f"p{p} {result[f'p{p}_ms']:>8.2f} мс" for p in PERCENTILES)
+        + f"  ошибок {result['errors']}"
+    )
+
+
+def compare(baseline: dict, current: dict):
+    """Печать изменений относительно сохранённого прогона"""
+    print(f"\nСравнение с {baseline['meta'].get('revision')} ({baseline['meta'].get('timestamp')})")
+    for scenario, result in current["scenarios"].items():
+        before = baseline["scenarios"].get(scenario)
+        if not before:
+            continue
+        parts = []
+        for key in ["throughput_rps"] + [f"p{p}_ms" for p in PERCENTILES]:
+            if before[key]:
+                parts.append(f"{key} {(result[key] - before[key]) / before[key] * 100:+.1f}%")
+        print(f"{scenario:<10} " + "  ".join(parts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Нагрузочный прогон API")
+    parser.add_argument("--url", default="", help="адрес запущенного сервера; без него приложение поднимается в процессе")
+    parser.add_argument("--scenarios", default=",".join(SCENARIOS), help=f"через запятую из: {', '.join(SCENARIOS)}")
+    parser.add_argument("--requests", type=int, default=500, help="запросов на сценарий")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--out", default="", help="куда записать JSON с результатами")
+    parser.add_argument("--compare", default="", help="JSON предыдущего прогона для сравнения")
+    args = parser.parse_args()
+
+    scenarios = [name.strip() for name in args.scenarios.split(",") if name.strip()]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        raise SystemExit(f"Неизвестные сценарии: {', '.join(sorted(unknown))}")
+
+    report = asyncio.run(run(scenarios, args.url, args.requests, args.concurrency, args.warmup, args.seed))
+
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, sort_keys=True)
+        print(f"Результаты записаны в {args.out}")
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(json.load(f), report)
+
+
+if __name__ == "__main__":
+    main()
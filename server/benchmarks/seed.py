@@ -0,0 +1,245 @@
+"""
+Наполнение базы синтетическими данными для нагрузочных тестов.
+
+    cd server
+    python -m benchmarks.seed --users 10000 --services 200000 --reviews 1000000 --transactions 1000000
+
+База берётся из DATABASE_URL (по умолчанию pizza.db). Данные детерминированы при одинаковом --seed.
+"""
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import MetaData, text
+
+from database import engine, SessionLocal
+from models.user import User
+from models.worker import Worker
+from models.service import Service
+from models.review import Review
+from models.transaction import Transaction
+from models.wallet import Wallet
+from models.ledger_entry import LedgerEntry
+from core.security import hash_password
+from core.ratings import rebuild_ratings
+from core.ledger import to_minor, take_snapshots, KIND_OPENING
+from core.search import FTS_TABLE
+from migrations.runner import upgrade
+
+
+BENCH_PASSWORD = "benchmark"
+BATCH_SIZE = 10000
+
+STATUS_OPEN = "Открытый"
+STATUS_IN_PROGRESS = "В разработке"
+STATUS_COMPLETED = "Завершенный"
+
+CATEGORIES = ["Дизайн", "Разработка", "Тексты", "Маркетинг", "Видео", "Переводы", "Аудио", "Бизнес"]
+SKILLS = ["python", "react", "figma", "sql", "seo", "копирайтинг", "монтаж", "fastapi", "css", "аналитика"]
+WORDS = [
+    "сайт", "лендинг", "логотип", "бот", "интернет-магазин", "статья", "баннер", "приложение",
+    "презентация", "верстка", "дизайн", "перевод", "ролик", "парсер", "интеграция", "отчёт"
+]
+
+
+def username(user_id: int) -> str:
+    return f"user{user_id}"
+
+
+def service_status(service_id: int) -> str:
+    """Доли статусов: 50% открытых, 20% в работе, 30% завершённых"""
+    bucket = service_id % 10
+    if bucket < 5:
+        return STATUS_OPEN
+    if bucket < 7:
+        return STATUS_IN_PROGRESS
+    return STATUS_COMPLETED
+
+
+def insert_batches(table, rows, total: int, label: str):
+    batch = []
+    inserted = 0
+    started = time.perf_counter()
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= BATCH_SIZE:
+            with engine.begin() as conn:
+                conn.execute(table.insert(), batch)
+            inserted += len(batch)
+            batch = []
+            print(f"  {label}: {inserted}/{total}", end="\r")
+    if batch:
+        with engine.begin() as conn:
+            conn.execute(table.insert(), batch)
+        inserted += len(batch)
+    print(f"  {label}: {inserted} за {time.perf_counter() - started:.1f} с")
+
+
+def generate_users(count: int, password_hash: str):
+    for user_id in range(1, count + 1):
+        yield {
+            "id": user_id,
+            "username": username(user_id),
+            "email": f"{username(user_id)}@bench.local",
+            "password_hash": password_hash
+        }
+
+
+def generate_workers(rng: random.Random, users: int):
+    # Анкета исполнителя у каждого пятого пользователя
+    for user_id in range(1, users + 1, 5):
+        yield {
+            "user_id": user_id,
+            "name": f"Имя{user_id}",
+            "surname": f"Фамилия{user_id}",
+            "email": f"worker{user_id}@bench.local",
+            "description": " ".join(rng.choices(WORDS, k=12)),
+            "country": "Россия",
+            "city": "Москва",
+            "image_path": None
+        }
+
+
+def generate_services(rng: random.Random, count: int, users: int):
+    for service_id in range(1, count + 1):
+        owner_id = rng.randint(1, users)
+        status = service_status(service_id)
+        freelancer_id = None
+        if status != STATUS_OPEN:
+            freelancer_id = (owner_id + rng.randint(1, users - 1) - 1) % users + 1
+        title = " ".join(rng.choices(WORDS, k=3)).capitalize()
+        yield {
+            "id": service_id,
+            "freelancer_name": username(owner_id),
+            "service_title": title,
+            "description": " ".join(rng.choices(WORDS, k=rng.randint(20, 80))),
+            "price": float(rng.randint(10, 2000)),
+            "image_path": None,
+            "duration": rng.randint(1, 60),
+            "skills": ", ".join(rng.sample(SKILLS, 3)),
+            "freelancer_id": freelancer_id,
+            "status": status,
+            "responses_count": 0,
+            "category": rng.choice(CATEGORIES),
+            "user_id": owner_id
+        }
+
+
+def generate_reviews(rng: random.Random, count: int, users: int, completed: list):
+    """
+    Отзывы только на завершённые заказы. Рецензенты одного заказа различны и
+    никогда не совпадают с заказчиком, поэтому заказчик всегда может оценить заказ сам
+    """
+    now = datetime.utcnow()
+    for index in range(count):
+        service_id, owner_id, freelancer_id = completed[index % len(completed)]
+        offset = index // len(completed) + 1
+        yield {
+            "service_id": service_id,
+            "reviewer_id": (owner_id + offset - 1) % users + 1,
+            "worker_id": freelancer_id,
+            "rating": rng.randint(1, 10) / 2,
+            "created_at": now - timedelta(minutes=rng.randint(0, 525600))
+        }
+
+
+def generate_transactions(rng: random.Random, count: int, users: int):
+    now = datetime.utcnow()
+    for _ in range(count):
+        yield {
+            "user_id": rng.randint(1, users),
+            "amount": float(rng.randint(1, 500)),
+            "status": "Обработан",
+            "created_at": now - timedelta(minutes=rng.randint(0, 525600))
+        }
+
+
+def generate_wallets(rng: random.Random, users: int):
+    for user_id in range(1, users + 1):
+        balance_minor = to_minor(rng.randint(1000, 5000))
+        yield {
+            "user_id": user_id,
+            "balance_minor": balance_minor,
+            "earned_minor": balance_minor,
+            "snapshot_entry_id": 0,
+            "snapshot_balance_minor": 0
+        }
+
+
+def reset_database():
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+    # Все таблицы, что есть в базе (включая schema_migrations), а не только известные моделям
+    existing = MetaData()
+    existing.reflect(bind=engine)
+    existing.drop_all(bind=engine)
+
+
+def seed(users: int, services: int, reviews: int, transactions: int, seed_value: int, reset: bool):
+    if users < 2:
+        raise SystemExit("Нужно хотя бы 2 пользователя")
+    if reviews and reviews > (users - 1) * max(1, (services * 3) // 10):
+        raise SystemExit("Слишком много отзывов: на заказ не может быть больше users - 1 рецензентов")
+
+    if reset:
+        reset_database()
+    upgrade(engine, verbose=False)
+
+    with SessionLocal() as db:
+        if db.query(User.id).first() is not None:
+            raise SystemExit("База не пуста, запустите с --reset")
+
+    rng = random.Random(seed_value)
+    started = time.perf_counter()
+    print(f"Наполнение {engine.url.render_as_string(hide_password=True)}")
+
+    # Один хеш на всех: иначе посев упирается в bcrypt, а вход всё равно проверяет полную стоимость
+    password_hash = hash_password(BENCH_PASSWORD)
+    insert_batches(User.__table__, generate_users(users, password_hash), users, "users")
+    insert_batches(Worker.__table__, generate_workers(rng, users), (users + 4) // 5, "work")
+    wallets = list(generate_wallets(rng, users))
+    insert_batches(Wallet.__table__, wallets, users, "wallets")
+    insert_batches(LedgerEntry.__table__, (
+        {"user_id": row["user_id"], "kind": KIND_OPENING, "amount_minor": row["balance_minor"]} for row in wallets
+    ), users, "ledger_entries")
+
+    completed = []
+
+    def services_with_tracking():
+        for row in generate_services(rng, services, users):
+            if row["status"] == STATUS_COMPLETED:
+                completed.append((row["id"], row["user_id"], row["freelancer_id"]))
+            yield row
+
+    insert_batches(Service.__table__, services_with_tracking(), services, "services")
+    if reviews and completed:
+        insert_batches(Review.__table__, generate_reviews(rng, reviews, users, completed), reviews, "reviews")
+    insert_batches(Transaction.__table__, generate_transactions(rng, transactions, users), transactions, "transactions")
+
+    with SessionLocal() as db:
+        rebuild_ratings(db)
+        take_snapshots(db)
+
+    if engine.dialect.name == "sqlite":
+        with engine.begin() as conn:
+            conn.execute(text("ANALYZE"))
+
+    print(f"Готово за {time.perf_counter() - started:.1f} с, пароль всех пользователей: {BENCH_PASSWORD}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Синтетические данные для бенчмарков")
+    parser.add_argument("--users", type=int, default=10000)
+    parser.add_argument("--services", type=int, default=200000)
+    parser.add_argument("--reviews", type=int, default=1000000)
+    parser.add_argument("--transactions", type=int, default=1000000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="удалить все таблицы перед наполнением")
+    args = parser.parse_args()
+    seed(args.users, args.services, args.reviews, args.transactions, args.seed, args.reset)
+
+
+if __name__ == "__main__":
+    main()
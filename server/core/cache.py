@@ -0,0 +1,83 @@
+import threading
+import time
+from collections import OrderedDict
+from core.config import AUTH_CACHE_SIZE, AUTH_CACHE_TTL
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """
+    Потокобезопасный кэш в памяти процесса: записи живут ttl секунд,
+    при переполнении вытесняется давно не использованная (LRU)
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 60.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is _MISSING or entry[0] < time.monotonic():
+                if entry is not _MISSING:
+                    del self._data[key]
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "size": len(self._data),
+                "maxsize": self.maxsize,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses
+            }
+
+
+def cache_metrics() -> list:
+    """Счётчики кэшей для /metrics"""
+    caches = {"categories": categories_cache, "auth_user": auth_user_cache, "image_variants": image_variants_cache}
+    stats = {name: cache.stats() for name, cache in caches.items()}
+    return [
+        ("cache_hits_total", "counter", "Попадания в кэш",
+         [({"cache": name}, item["hits"]) for name, item in stats.items()]),
+        ("cache_misses_total", "counter", "Промахи кэша",
+         [({"cache": name}, item["misses"]) for name, item in stats.items()]),
+        ("cache_entries", "gauge", "Записей в кэше",
+         [({"cache": name}, item["size"]) for name, item in stats.items()]),
+    ]
+
+
+# Категории вместе с их версией для ETag; сбрасываются после bump_versions(CATEGORIES)
+categories_cache = TTLCache(maxsize=1, ttl=300)
+
+# Проекции аутентифицированных пользователей по user_id
+auth_user_cache = TTLCache(maxsize=AUTH_CACHE_SIZE, ttl=AUTH_CACHE_TTL)
+
+# Изображения с готовыми вариантами: файлы не меняются и не удаляются, поэтому хранится только "готово"
+image_variants_cache = TTLCache(maxsize=100000, ttl=3600)
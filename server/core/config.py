@@ -0,0 +1,91 @@
+import os
+
+
+def env_int(name: str, default: int) -> int:
+    value = os.getenv(name)
+    return int(value) if value not in (None, "") else default
+
+
+def env_float(name: str, default: float) -> float:
+    value = os.getenv(name)
+    return float(value) if value not in (None, "") else default
+
+
+def env_bool(name: str, default: bool) -> bool:
+    value = os.getenv(name)
+    if value in (None, ""):
+        return default
+    return value.strip().lower() in ("1", "true", "yes", "on")
+
+
+# База данных
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///pizza.db")
+DB_POOL_SIZE = env_int("DB_POOL_SIZE", 5)
+DB_MAX_OVERFLOW = env_int("DB_MAX_OVERFLOW", 10)
+DB_POOL_RECYCLE = env_int("DB_POOL_RECYCLE", 1800)
+DB_POOL_TIMEOUT = env_int("DB_POOL_TIMEOUT", 30)
+DB_ECHO = env_bool("DB_ECHO", False)
+
+# Настройки SQLite
+SQLITE_BUSY_TIMEOUT_MS = env_int("SQLITE_BUSY_TIMEOUT_MS", 5000)
+SQLITE_CACHE_SIZE_KB = env_int("SQLITE_CACHE_SIZE_KB", 64 * 1024)
+SQLITE_MMAP_SIZE = env_int("SQLITE_MMAP_SIZE", 256 * 1024 * 1024)
+
+# Загрузка изображений
+UPLOAD_MAX_BYTES = env_int("UPLOAD_MAX_BYTES", 10 * 1024 * 1024)
+UPLOAD_CHUNK_SIZE = env_int("UPLOAD_CHUNK_SIZE", 1024 * 1024)
+# Весь multipart-запрос: файл плюс текстовые поля формы (у Starlette поле до 1 МБ)
+UPLOAD_REQUEST_MAX_BYTES = env_int("UPLOAD_REQUEST_MAX_BYTES", UPLOAD_MAX_BYTES + 1024 * 1024)
+
+# Обработка изображений
+IMAGE_WORKERS = env_int("IMAGE_WORKERS", 2)
+IMAGE_WEBP_QUALITY = env_int("IMAGE_WEBP_QUALITY", 80)
+
+# Кэш аутентифицированных пользователей
+AUTH_CACHE_SIZE = env_int("AUTH_CACHE_SIZE", 10000)
+AUTH_CACHE_TTL = env_float("AUTH_CACHE_TTL", 60.0)
+
+# Хеширование паролей
+BCRYPT_ROUNDS = env_int("BCRYPT_ROUNDS", 12)
+PASSWORD_HASH_WORKERS = env_int("PASSWORD_HASH_WORKERS", 4)
+PASSWORD_HASH_MAX_QUEUE = env_int("PASSWORD_HASH_MAX_QUEUE", 32)
+
+# Бюджет SQL-запросов на HTTP-запрос (off / warn / raise)
+QUERY_BUDGET_MODE = os.getenv("QUERY_BUDGET_MODE", "off").lower()
+QUERY_REPEAT_THRESHOLD = env_int("QUERY_REPEAT_THRESHOLD", 3)
+
+# Снимки балансов по журналу (секунды, 0 - выключить)
+LEDGER_SNAPSHOT_INTERVAL = env_float("LEDGER_SNAPSHOT_INTERVAL", 300.0)
+
+# Миграции: по умолчанию применяются отдельным шагом (python -m migrations),
+# AUTO_MIGRATE=1 применяет их при старте (локальная разработка и тесты)
+AUTO_MIGRATE = env_bool("AUTO_MIGRATE", False)
+
+# SSE: очередь событий на подписчика и число заказов в одной подписке
+EVENTS_QUEUE_SIZE = env_int("EVENTS_QUEUE_SIZE", 100)
+EVENTS_MAX_SERVICES = env_int("EVENTS_MAX_SERVICES", 100)
+
+# Фоновые задачи (JOB_WORKERS=0 - этот процесс только ставит задачи, выполняют их другие экземпляры)
+JOB_WORKERS = env_int("JOB_WORKERS", 2)
+JOB_POLL_INTERVAL = env_float("JOB_POLL_INTERVAL", 1.0)
+JOB_VISIBILITY_TIMEOUT = env_float("JOB_VISIBILITY_TIMEOUT", 120.0)
+JOB_MAX_ATTEMPTS = env_int("JOB_MAX_ATTEMPTS", 5)
+JOB_BACKOFF_BASE = env_float("JOB_BACKOFF_BASE", 2.0)
+JOB_BACKOFF_MAX = env_float("JOB_BACKOFF_MAX", 300.0)
+
+# Провайдер выплат "модуль:функция", вызывается как f(transaction_id, user_id, amount_minor, idempotency_key).
+# Бросает core.withdrawals.PayoutFailed, если выплата точно не прошла; прочие ошибки - исход неизвестен.
+# По умолчанию деньги переводятся вручную, а вывод сразу помечается проведённым
+PAYOUT_PROVIDER = os.getenv("PAYOUT_PROVIDER") or "core.withdrawals:manual_payout"
+
+# Ограничение частоты запросов (token bucket): "запросов/секунд" на IP или пользователя.
+# memory - в памяти процесса, database - общая таблица для нескольких воркеров
+RATE_LIMIT_ENABLED = env_bool("RATE_LIMIT_ENABLED", True)
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory").lower()
+RATE_LIMIT_MAX_BUCKETS = env_int("RATE_LIMIT_MAX_BUCKETS", 100000)
+RATE_LIMIT_TRUST_PROXY = env_bool("RATE_LIMIT_TRUST_PROXY", False)
+RATE_LIMIT_LOGIN = os.getenv("RATE_LIMIT_LOGIN", "20/60")
+RATE_LIMIT_REGISTER = os.getenv("RATE_LIMIT_REGISTER", "10/600")
+RATE_LIMIT_CHANGE_PASSWORD = os.getenv("RATE_LIMIT_CHANGE_PASSWORD", "5/300")
+RATE_LIMIT_CREATE_SERVICE_USER = os.getenv("RATE_LIMIT_CREATE_SERVICE_USER", "20/60")
+RATE_LIMIT_CREATE_SERVICE_IP = os.getenv("RATE_LIMIT_CREATE_SERVICE_IP", "60/60")
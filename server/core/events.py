@@ -0,0 +1,144 @@
+import asyncio
+import itertools
+import json
+
+from fastapi.sse import ServerSentEvent
+
+from core.config import EVENTS_QUEUE_SIZE
+
+
+# Типы событий (имя события в SSE)
+SERVICE_STATUS = "service_status"
+SERVICE_RESPONSE = "service_response"
+RATING = "rating"
+BALANCE = "balance"
+TRANSACTION = "transaction"
+
+# Подписчик не успевает читать: его поток закрывается, клиент переподключается и перечитывает данные
+RESYNC = ServerSentEvent(event="resync", raw_data="{}")
+_CLOSE = object()
+
+
+def user_channel(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def service_channel(service_id: int) -> str:
+    return f"service:{service_id}"
+
+
+class Subscription:
+    __slots__ = ("channels", "queue")
+
+    def __init__(self, channels: set):
+        self.channels = channels
+        self.queue = asyncio.Queue(maxsize=EVENTS_QUEUE_SIZE)
+
+    async def __aiter__(self):
+        while True:
+            event = await self.queue.get()
+            if event is _CLOSE:
+                return
+            yield event
+            if event is RESYNC:
+                return
+
+
+class EventHub:
+    """
+    Pub/sub в памяти процесса для SSE. Подписки и рассылка живут в цикле событий,
+    а publish можно звать и из синхронных маршрутов (пул потоков).
+    Событие сериализуется один раз и один и тот же объект уходит всем подписчикам.
+    Подписчики другого процесса (при нескольких воркерах) событий не получат
+    """
+
+    def __init__(self):
+        self._loop = None
+        self._channels = {}
+        self._ids = itertools.count(1)
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self, channels) -> Subscription:
+        self._loop = asyncio.get_running_loop()
+        subscription = Subscription(set(channels))
+        for channel in subscription.channels:
+            self._channels.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for channel in subscription.channels:
+            subscribers = self._channels.get(channel)
+            if subscribers is None:
+                continue
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._channels[channel]
+
+    def publish(self, event_type: str, payload: dict, channels):
+        """Разослать событие подписчикам каналов; вызывать после коммита"""
+        loop = self._loop
+        if loop is None or not self._channels:
+            return
+
+        event = ServerSentEvent(
+            event=event_type,
+            raw_data=json.dumps(payload, ensure_ascii=False, separators=(",", ":")),
+            id=str(next(self._ids))
+        )
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+
+        if running is loop:
+            self._deliver(event, channels)
+        elif not loop.is_closed():
+            loop.call_soon_threadsafe(self._deliver, event, channels)
+
+    def _deliver(self, event: ServerSentEvent, channels):
+        self.published += 1
+        # Подписчик нескольких каналов получает событие один раз
+        targets = set()
+        for channel in channels:
+            targets.update(self._channels.get(channel, ()))
+
+        for subscription in targets:
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.dropped += 1
+                self.unsubscribe(subscription)
+                self._drain(subscription)
+                subscription.queue.put_nowait(RESYNC)
+
+    @staticmethod
+    def _drain(subscription: Subscription):
+        while not subscription.queue.empty():
+            subscription.queue.get_nowait()
+
+    def close(self):
+        """Завершить все потоки при остановке сервера"""
+        subscriptions = set()
+        for subscribers in self._channels.values():
+            subscriptions.update(subscribers)
+        self._channels.clear()
+        for subscription in subscriptions:
+            self._drain(subscription)
+            subscription.queue.put_nowait(_CLOSE)
+
+    def subscribers(self) -> int:
+        return len({subscription for subscribers in self._channels.values() for subscription in subscribers})
+
+
+def event_metrics() -> list:
+    """Счётчики хаба событий для /metrics"""
+    return [
+        ("events_subscribers", "gauge", "Открытые SSE-подписки", [({}, hub.subscribers())]),
+        ("events_published_total", "counter", "Разосланные события", [({}, hub.published)]),
+        ("events_dropped_subscribers_total", "counter", "Подписки, закрытые из-за переполнения очереди",
+         [({}, hub.dropped)]),
+    ]
+
+
+hub = EventHub()
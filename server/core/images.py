@@ -0,0 +1,136 @@
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+from core.config import IMAGE_WORKERS, IMAGE_WEBP_QUALITY
+from core.jobs import job_handler, enqueue, find_queued, replace_queued_payload
+from core.versions import bump_versions
+from core.cache import image_variants_cache
+
+try:
+    from PIL import Image, ImageOps
+except ImportError:
+    Image = None
+
+
+# Варианты по наибольшей стороне; генерируются по порядку, последний служит признаком готовности
+VARIANTS = (
+    ("thumb", 96),
+    ("card", 480),
+    ("full", 1600),
+)
+READY_MARKER = VARIANTS[-1][0]
+
+RASTER_EXTENSIONS = {"jpg", "jpeg", "png", "webp", "gif", "jfif"}
+
+JOB_IMAGE_VARIANTS = "image_variants"
+
+_executor = None
+
+
+def variant_path(image_path: str, variant: str) -> str:
+    stem, _ = os.path.splitext(image_path)
+    return f"{stem}.{variant}.webp"
+
+
+def supports_variants(image_path: str) -> bool:
+    extension = os.path.splitext(image_path)[1].lstrip(".").lower()
+    return Image is not None and extension in RASTER_EXTENSIONS
+
+
+def generate_variants(image_path: str) -> list:
+    """Выполняется в отдельном процессе: уменьшенные копии в WebP рядом с оригиналом"""
+    created = []
+    with Image.open(image_path) as source:
+        image = ImageOps.exif_transpose(source)
+        image = image.convert("RGBA" if image.mode in ("RGBA", "LA", "P") else "RGB")
+        for variant, size in VARIANTS:
+            target = variant_path(image_path, variant)
+            if os.path.exists(target):
+                continue
+            copy = image.copy()
+            copy.thumbnail((size, size), Image.LANCZOS)
+            temp_target = target + ".part"
+            copy.save(temp_target, "WEBP", quality=IMAGE_WEBP_QUALITY, method=4)
+            os.replace(temp_target, target)
+            created.append(target)
+    return created
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=IMAGE_WORKERS)
+    return _executor
+
+
+def _variants_ready(image_path: str) -> bool:
+    if image_variants_cache.get(image_path):
+        return True
+    ready = os.path.exists(variant_path(image_path, READY_MARKER))
+    if ready:
+        image_variants_cache.set(image_path, True)
+    return ready
+
+
+def enqueue_variants(db, image_path: str, version_keys: list):
+    """
+    Поставить генерацию вариантов в очередь задач, в транзакции записи с этим изображением.
+    version_keys - версии записей, в ответах которых есть image_variants: задача поднимет их, когда варианты готовы.
+    Синхронная сессия (из async-маршрута - через run_sync). Если тот же файл уже ждёт в очереди,
+    ключи добавляются в его задачу, а новая не ставится
+    """
+    if not image_path or not supports_variants(image_path) or _variants_ready(image_path):
+        return
+    pending = find_queued(db, JOB_IMAGE_VARIANTS, image_path)
+    if pending is not None:
+        payload = json.loads(pending.payload)
+        payload["version_keys"] = sorted(set(payload.get("version_keys") or []) | set(version_keys))
+        if replace_queued_payload(db, pending, payload):
+            return
+    enqueue(db, JOB_IMAGE_VARIANTS, {"image_path": image_path, "version_keys": version_keys}, dedupe_key=image_path)
+
+
+@job_handler(JOB_IMAGE_VARIANTS, max_attempts=3)
+def build_variants(db, payload: dict):
+    """Задача очереди: сама генерация идёт в пуле процессов, воркер ждёт результат"""
+    image_path = payload["image_path"]
+    if not os.path.exists(image_path):
+        return None
+    if not _variants_ready(image_path):
+        _get_executor().submit(generate_variants, image_path).result()
+    # Варианты могла собрать задача другой записи с тем же файлом - версии этой записи поднимаем всё равно
+    version_keys = payload.get("version_keys")
+    if version_keys:
+        bump_versions(db, version_keys)
+    return None
+
+
+def image_variants(image_path):
+    """
+    Пути к вариантам изображения. Пока варианты не готовы, все ключи указывают на оригинал.
+    Для ещё не готовых проверяет файл на диске: из async-маршрута - через add_image_variants
+    """
+    if not image_path:
+        return None
+    ready = supports_variants(image_path) and _variants_ready(image_path)
+    urls = {
+        variant: variant_path(image_path, variant) if ready else image_path
+        for variant, _ in VARIANTS
+    }
+    urls["original"] = image_path
+    urls["ready"] = ready
+    return urls
+
+
+def add_image_variants(items: list):
+    """Проставить image_variants строкам страницы; вызывается в пуле потоков: run_in_threadpool(add_image_variants, items)"""
+    for item in items:
+        item["image_variants"] = image_variants(item["image_path"])
+
+
+def shutdown_image_pool():
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
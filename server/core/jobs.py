@@ -0,0 +1,253 @@
+import asyncio
+import datetime
+import json
+import random
+import time
+import uuid
+
+from sqlalchemy import and_, delete, or_, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from database import SessionLocal
+from models.job import Job
+from core.metrics import registry, Counter, Histogram
+from core.config import (
+    JOB_POLL_INTERVAL,
+    JOB_VISIBILITY_TIMEOUT,
+    JOB_MAX_ATTEMPTS,
+    JOB_BACKOFF_BASE,
+    JOB_BACKOFF_MAX,
+)
+
+
+QUEUED = "queued"
+RUNNING = "running"
+FAILED = "failed"
+
+CLAIM_CANDIDATES = 5
+
+jobs_processed_total = registry.register(Counter(
+    "jobs_processed_total", "Выполнения фоновых задач", ("kind", "result")
+))
+job_duration_seconds = registry.register(Histogram(
+    "job_duration_seconds", "Время выполнения фоновой задачи", ("kind",)
+))
+
+_handlers = {}
+_wakeup = None
+_loop = None
+
+
+class JobHandler:
+    __slots__ = ("run", "on_failure", "max_attempts")
+
+    def __init__(self, run, on_failure, max_attempts: int):
+        self.run = run
+        self.on_failure = on_failure
+        self.max_attempts = max_attempts
+
+
+def job_handler(kind: str, on_failure=None, max_attempts: int = JOB_MAX_ATTEMPTS):
+    """
+    Регистрация обработчика: run(db, payload) выполняется в пуле потоков, в одной транзакции
+    с удалением задачи. Может вернуть функцию, которая вызовется после коммита (события и т.п.).
+    on_failure(db, payload) вызывается, когда попытки кончились, в той же транзакции, что и пометка failed
+    """
+    def decorator(func):
+        _handlers[kind] = JobHandler(func, on_failure, max_attempts)
+        return func
+
+    return decorator
+
+
+def enqueue(db, kind: str, payload: dict, delay: float = 0, dedupe_key: str = None):
+    """
+    Поставить задачу в той же транзакции, что и изменение, которое её породило.
+    Подходит и для Session, и для AsyncSession. После коммита стоит вызвать notify()
+    """
+    handler = _handlers.get(kind)
+    db.add(Job(
+        kind=kind,
+        payload=json.dumps(payload, ensure_ascii=False),
+        dedupe_key=dedupe_key,
+        status=QUEUED,
+        max_attempts=handler.max_attempts if handler else JOB_MAX_ATTEMPTS,
+        run_at=datetime.datetime.utcnow() + datetime.timedelta(seconds=delay)
+    ))
+
+
+def find_queued(db: Session, kind: str, dedupe_key: str):
+    """Ещё не взятая воркером задача с тем же ключом: (id, payload) или None"""
+    return db.execute(
+        select(Job.id, Job.payload)
+        .where(Job.kind == kind, Job.dedupe_key == dedupe_key, Job.status == QUEUED)
+        .limit(1)
+    ).first()
+
+
+def replace_queued_payload(db: Session, job, payload: dict) -> bool:
+    """
+    Заменить payload задачи из find_queued, если её ещё не взяли и не поменяли.
+    False - задачу успели взять, нужна новая
+    """
+    return db.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.status == QUEUED, Job.payload == job.payload)
+        .values(payload=json.dumps(payload, ensure_ascii=False))
+        .execution_options(synchronize_session=False)
+    ).rowcount > 0
+
+
+def notify():
+    """Разбудить воркеры этого процесса, не дожидаясь следующего опроса"""
+    if _loop is not None and _wakeup is not None and not _loop.is_closed():
+        _loop.call_soon_threadsafe(_wakeup.set)
+
+
+def backoff_seconds(attempts: int) -> float:
+    """Экспоненциальная задержка перед повтором, с разбросом, чтобы повторы не шли пачкой"""
+    delay = min(JOB_BACKOFF_BASE * 2 ** (attempts - 1), JOB_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+
+def _claimable(now):
+    return or_(
+        and_(Job.status == QUEUED, Job.run_at <= now),
+        # Аренда истекла: воркер упал или завис
+        and_(Job.status == RUNNING, Job.locked_until < now)
+    )
+
+
+def claim_job(db: Session):
+    """
+    Взять одну готовую задачу. Условный UPDATE по тому же условию, что и выборка:
+    из нескольких воркеров (и процессов) задачу получит только один
+    """
+    now = datetime.datetime.utcnow()
+    candidates = db.execute(
+        select(Job.id).where(_claimable(now)).order_by(Job.run_at).limit(CLAIM_CANDIDATES)
+    ).scalars().all()
+
+    for job_id in candidates:
+        lease = uuid.uuid4().hex
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, _claimable(now))
+            .values(
+                status=RUNNING,
+                lease=lease,
+                locked_until=now + datetime.timedelta(seconds=JOB_VISIBILITY_TIMEOUT),
+                attempts=Job.attempts + 1
+            )
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if claimed:
+            job = db.execute(
+                select(Job.id, Job.kind, Job.payload, Job.attempts, Job.max_attempts).where(Job.id == job_id)
+            ).first()
+            db.commit()
+            return job, lease
+
+    db.commit()
+    return None
+
+
+def _release(db: Session, job, lease: str, values: dict) -> bool:
+    return db.execute(
+        update(Job)
+        .where(Job.id == job.id, Job.lease == lease)
+        .values(lease=None, locked_until=None, **values)
+        .execution_options(synchronize_session=False)
+    ).rowcount > 0
+
+
+def run_job(job, lease: str) -> str:
+    """Выполнить взятую задачу; возвращает итог: done / retry / failed / lost"""
+    handler = _handlers.get(job.kind)
+    payload = json.loads(job.payload)
+    started = time.perf_counter()
+
+    with SessionLocal() as db:
+        try:
+            if handler is None:
+                raise LookupError(f"Нет обработчика для задачи {job.kind}")
+            if job.attempts > job.max_attempts:
+                # Последняя попытка не уложилась в аренду - больше не запускаем
+                raise TimeoutError("аренда истекла")
+            after_commit = handler.run(db, payload)
+
+            # Задача удаляется в той же транзакции, что и её изменения. Если аренду
+            # за это время забрал другой воркер, всё откатывается и повтор не задвоит результат
+            deleted = db.execute(
+                delete(Job).where(Job.id == job.id, Job.lease == lease).execution_options(synchronize_session=False)
+            ).rowcount
+            if not deleted:
+                db.rollback()
+                result = "lost"
+            else:
+                db.commit()
+                result = "done"
+                if after_commit is not None:
+                    after_commit()
+        except Exception as e:
+            db.rollback()
+            error = f"{type(e).__name__}: {e}"
+            if job.attempts < job.max_attempts:
+                delay = backoff_seconds(job.attempts)
+                run_at = datetime.datetime.utcnow() + datetime.timedelta(seconds=delay)
+                _release(db, job, lease, {"status": QUEUED, "run_at": run_at, "last_error": error})
+                db.commit()
+                result = "retry"
+                print(f"⚠️ Задача {job.kind} #{job.id} не выполнена (попытка {job.attempts}), повтор через {delay:.0f} с: {error}")
+            else:
+                after_commit = None
+                if handler is not None and handler.on_failure is not None:
+                    after_commit = handler.on_failure(db, payload)
+                if _release(db, job, lease, {"status": FAILED, "last_error": error}):
+                    db.commit()
+                    if after_commit is not None:
+                        after_commit()
+                else:
+                    db.rollback()
+                result = "failed"
+                print(f"❌ Задача {job.kind} #{job.id} не выполнена после {job.attempts} попыток: {error}")
+
+    jobs_processed_total.inc((job.kind, result))
+    job_duration_seconds.observe((job.kind,), time.perf_counter() - started)
+    return result
+
+
+async def job_worker():
+    """Цикл одного воркера: брать задачи, пока есть, иначе ждать notify() или опроса"""
+    while True:
+        _wakeup.clear()
+        try:
+            claimed = await run_in_threadpool(_claim_next)
+        except Exception as e:
+            print(f"❌ Не удалось взять задачу из очереди: {str(e)}")
+            claimed = None
+
+        if claimed is None:
+            try:
+                await asyncio.wait_for(_wakeup.wait(), JOB_POLL_INTERVAL)
+            except asyncio.TimeoutError:
+                pass
+            continue
+
+        try:
+            await run_in_threadpool(run_job, *claimed)
+        except Exception as e:
+            print(f"❌ Ошибка воркера задач: {str(e)}")
+
+
+def _claim_next():
+    with SessionLocal() as db:
+        return claim_job(db)
+
+
+def start_workers(count: int) -> list:
+    global _wakeup, _loop
+    _loop = asyncio.get_running_loop()
+    _wakeup = asyncio.Event()
+    return [asyncio.create_task(job_worker()) for _ in range(count)]
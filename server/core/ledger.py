@@ -0,0 +1,167 @@
+import asyncio
+import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from database import SessionLocal
+from models.ledger_entry import LedgerEntry
+from models.wallet import Wallet
+
+
+MINOR_UNITS = 100
+
+KIND_OPENING = "opening_balance"
+KIND_SERVICE_PAYMENT = "service_payment"
+KIND_WITHDRAWAL = "withdrawal"
+KIND_WITHDRAWAL_REFUND = "withdrawal_refund"
+
+
+def to_minor(amount) -> int:
+    """Сумма в долларах -> целые центы, без ошибок округления float"""
+    return int((Decimal(str(amount)) * MINOR_UNITS).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def from_minor(amount_minor) -> float:
+    return (amount_minor or 0) / MINOR_UNITS
+
+
+def _update_wallet(db: Session, user_id: int, values: dict, condition=None):
+    """
+    Один UPDATE кошелька. Возвращает новый баланс или None,
+    если строки нет или она не прошла условие
+    """
+    statement = update(Wallet).where(Wallet.user_id == user_id).values(**values)
+    if condition is not None:
+        statement = statement.where(condition)
+    statement = statement.execution_options(synchronize_session=False)
+
+    if db.get_bind().dialect.update_returning:
+        return db.execute(statement.returning(Wallet.balance_minor)).scalar()
+    if db.execute(statement).rowcount == 0:
+        return None
+    return db.scalar(select(Wallet.balance_minor).where(Wallet.user_id == user_id))
+
+
+def _ensure_wallet(db: Session, user_id: int):
+    # Записей нового кошелька в журнале ещё нет: снимок сразу стоит на конце журнала,
+    # иначе take_snapshots начнёт чтение с нулевой записи
+    last_entry_id = select(func.coalesce(func.max(LedgerEntry.id), 0)).scalar_subquery()
+    try:
+        with db.begin_nested():
+            db.add(Wallet(user_id=user_id, balance_minor=0, earned_minor=0, snapshot_entry_id=last_entry_id))
+    except IntegrityError:
+        # Кошелёк уже есть или его успел создать параллельный запрос
+        pass
+
+
+def credit_service_payment(db: Session, user_id: int, amount_minor: int, service_id: int) -> int:
+    """
+    Начислить оплату за заказ: баланс и доход растут атомарно, в журнал пишется запись.
+    Коммит остаётся за вызывающим. Возвращает новый баланс в копейках
+    """
+    values = {
+        "balance_minor": Wallet.balance_minor + amount_minor,
+        "earned_minor": Wallet.earned_minor + amount_minor
+    }
+    balance_minor = _update_wallet(db, user_id, values)
+    if balance_minor is None:
+        _ensure_wallet(db, user_id)
+        balance_minor = _update_wallet(db, user_id, values)
+
+    db.add(LedgerEntry(user_id=user_id, kind=KIND_SERVICE_PAYMENT, amount_minor=amount_minor, service_id=service_id))
+    return balance_minor
+
+
+def debit_withdrawal(db: Session, user_id: int, amount_minor: int, transaction_id: int = None):
+    """
+    Списать сумму, только если её хватает: amount = amount - ? WHERE amount >= ?.
+    Возвращает новый баланс или None при нехватке средств. Коммит остаётся за вызывающим
+    """
+    balance_minor = _update_wallet(
+        db, user_id,
+        {"balance_minor": Wallet.balance_minor - amount_minor},
+        Wallet.balance_minor >= amount_minor
+    )
+    if balance_minor is None:
+        return None
+
+    db.add(LedgerEntry(user_id=user_id, kind=KIND_WITHDRAWAL, amount_minor=-amount_minor, transaction_id=transaction_id))
+    return balance_minor
+
+
+def refund_withdrawal(db: Session, user_id: int, amount_minor: int, transaction_id: int) -> int:
+    """Вернуть на баланс списанное по несостоявшейся выплате. Коммит остаётся за вызывающим"""
+    balance_minor = _update_wallet(db, user_id, {"balance_minor": Wallet.balance_minor + amount_minor})
+    db.add(LedgerEntry(user_id=user_id, kind=KIND_WITHDRAWAL_REFUND, amount_minor=amount_minor, transaction_id=transaction_id))
+    return balance_minor
+
+
+def take_snapshots(db: Session) -> int:
+    """
+    Обновить снимки балансов по записям журнала, появившимся после прошлого снимка,
+    и сверить их с текущим балансом. Читает только новые записи, а не весь журнал
+    """
+    upto = db.scalar(select(func.max(LedgerEntry.id)))
+    if upto is None:
+        return 0
+
+    since = db.scalar(select(func.min(Wallet.snapshot_entry_id))) or 0
+    deltas = db.execute(
+        select(LedgerEntry.user_id, func.sum(LedgerEntry.amount_minor))
+        .join(Wallet, Wallet.user_id == LedgerEntry.user_id)
+        .where(LedgerEntry.id > since, LedgerEntry.id > Wallet.snapshot_entry_id, LedgerEntry.id <= upto)
+        .group_by(LedgerEntry.user_id)
+    ).all()
+
+    now = datetime.datetime.utcnow()
+    for user_id, delta in deltas:
+        db.execute(
+            update(Wallet)
+            .where(Wallet.user_id == user_id)
+            .values(
+                snapshot_balance_minor=Wallet.snapshot_balance_minor + delta,
+                snapshot_entry_id=upto,
+                snapshot_at=now
+            )
+            .execution_options(synchronize_session=False)
+        )
+    # У остальных кошельков новых записей нет, снимок тот же - двигаем только отметку,
+    # иначе один неактивный кошелёк заставит каждый раз читать журнал с начала
+    db.execute(
+        update(Wallet)
+        .where(Wallet.snapshot_entry_id < upto)
+        .values(snapshot_entry_id=upto)
+        .execution_options(synchronize_session=False)
+    )
+
+    # Записи, вставленные после upto, в снимок не вошли - сверяем только кошельки без них
+    mismatches = db.execute(
+        select(Wallet.user_id, Wallet.balance_minor, Wallet.snapshot_balance_minor)
+        .where(
+            Wallet.snapshot_entry_id == upto,
+            Wallet.balance_minor != Wallet.snapshot_balance_minor
+        )
+    ).all()
+    db.commit()
+
+    for user_id, balance_minor, snapshot_minor in mismatches:
+        print(f"⚠️ Баланс пользователя {user_id} расходится с журналом: {balance_minor} != {snapshot_minor}")
+    return len(deltas)
+
+
+async def snapshot_loop(interval: float):
+    """Фоновые снимки балансов раз в interval секунд"""
+    def run_once():
+        with SessionLocal() as db:
+            take_snapshots(db)
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(run_once)
+        except Exception as e:
+            print(f"❌ Не удалось сделать снимок балансов: {str(e)}")
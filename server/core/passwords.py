@@ -0,0 +1,94 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from fastapi import HTTPException, status
+from core.config import PASSWORD_HASH_WORKERS, PASSWORD_HASH_MAX_QUEUE
+from core.security import hash_password, verify_password
+
+
+# bcrypt отпускает GIL, поэтому достаточно потоков, но своих:
+# вход и регистрация не должны занимать общий пул синхронных маршрутов
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_HASH_WORKERS, thread_name_prefix="bcrypt")
+_capacity = PASSWORD_HASH_WORKERS + PASSWORD_HASH_MAX_QUEUE
+_pending = 0
+_pending_lock = threading.Lock()
+
+RETRY_AFTER_SECONDS = 1
+
+
+class PasswordPoolBusy(Exception):
+    pass
+
+
+def _acquire():
+    global _pending
+    with _pending_lock:
+        if _pending >= _capacity:
+            raise PasswordPoolBusy()
+        _pending += 1
+
+
+def _release(_future=None):
+    global _pending
+    with _pending_lock:
+        _pending -= 1
+
+
+async def _run(func, *args):
+    _acquire()
+    try:
+        future = _executor.submit(func, *args)
+    except BaseException:
+        _release()
+        raise
+    future.add_done_callback(_release)
+    return await asyncio.wrap_future(future)
+
+
+def _busy_error() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Сервер перегружен, попробуйте позже",
+        headers={"Retry-After": str(RETRY_AFTER_SECONDS)}
+    )
+
+
+async def hash_password_async(password: str) -> str:
+    """Хеширование в выделенном пуле; при переполнении очереди сразу 503"""
+    try:
+        return await _run(hash_password, password)
+    except PasswordPoolBusy:
+        raise _busy_error()
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return await _run(verify_password, plain_password, hashed_password)
+    except PasswordPoolBusy:
+        raise _busy_error()
+
+
+async def try_rehash_password(password: str):
+    """Перехеширование с текущей стоимостью; если пул занят - отложить до следующего входа"""
+    try:
+        return await _run(hash_password, password)
+    except PasswordPoolBusy:
+        return None
+
+
+def pool_stats() -> dict:
+    with _pending_lock:
+        return {"workers": PASSWORD_HASH_WORKERS, "capacity": _capacity, "pending": _pending}
+
+
+def password_pool_metrics() -> list:
+    stats = pool_stats()
+    return [
+        ("password_hash_pending", "gauge", "Задач bcrypt в работе и в очереди", [({}, stats["pending"])]),
+        ("password_hash_capacity", "gauge", "Предел задач bcrypt до отказа 503", [({}, stats["capacity"])]),
+    ]
+
+
+def shutdown_password_pool():
+    _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,86 @@
+import re
+from collections import Counter
+
+from core.config import QUERY_BUDGET_MODE, QUERY_REPEAT_THRESHOLD
+from core.metrics import current_request_stats
+
+
+BUDGET_MODES = ("off", "warn", "raise")
+
+_WHITESPACE = re.compile(r"\s+")
+_IN_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SAVEPOINT = re.compile(r"sa_savepoint_\d+")
+
+
+class QueryBudgetExceeded(AssertionError):
+    """Маршрут выполнил больше SQL-запросов, чем заявлено, или повторяет один запрос (N+1)"""
+
+
+def query_budget(max_queries: int):
+    """
+    Заявить бюджет SQL-запросов для маршрута.
+    Ставится под @router.get/post/..., чтобы FastAPI зарегистрировал уже размеченную функцию
+    """
+    def decorator(endpoint):
+        endpoint.query_budget = max_queries
+        return endpoint
+    return decorator
+
+
+def statement_shape(statement: str) -> str:
+    """Форма запроса: без лишних пробелов, списки IN (?, ?, ...) и имена точек сохранения схлопнуты"""
+    shape = _WHITESPACE.sub(" ", statement).strip()
+    shape = _IN_LIST.sub("(?...)", shape)
+    return _SAVEPOINT.sub("sa_savepoint", shape)
+
+
+def find_repeated(statements: Counter, threshold: int = QUERY_REPEAT_THRESHOLD) -> list:
+    """Формы запросов, выполненные за один HTTP-запрос threshold раз и больше"""
+    shapes = Counter()
+    for statement, count in statements.items():
+        shapes[statement_shape(statement)] += count
+    return [(shape, count) for shape, count in shapes.most_common() if count >= threshold]
+
+
+def check_request(method: str, route: str, budget, stats) -> list:
+    problems = []
+    if budget is not None and stats.queries > budget:
+        problems.append(f"{method} {route}: {stats.queries} SQL-запросов при бюджете {budget}")
+    for shape, count in find_repeated(stats.statements):
+        problems.append(f"{method} {route}: возможный N+1, запрос выполнен {count} раз: {shape}")
+    return problems
+
+
+class QueryBudgetMiddleware:
+    """
+    Контроль SQL на запрос для разработки и тестов. Ставится внутрь MetricsMiddleware,
+    которая ведёт счётчики. В режиме warn нарушения печатаются, в режиме raise
+    запрос завершается исключением QueryBudgetExceeded (TestClient пробрасывает его в тест)
+    """
+
+    def __init__(self, app, mode: str = QUERY_BUDGET_MODE):
+        if mode not in BUDGET_MODES:
+            raise ValueError(f"QUERY_BUDGET_MODE должен быть одним из {BUDGET_MODES}")
+        self.app = app
+        self.mode = mode
+
+    async def __call__(self, scope, receive, send):
+        stats = current_request_stats()
+        if self.mode == "off" or scope["type"] != "http" or stats is None:
+            await self.app(scope, receive, send)
+            return
+
+        stats.statements = Counter()
+        await self.app(scope, receive, send)
+
+        route = scope.get("route")
+        if route is None:
+            return
+        budget = getattr(getattr(route, "endpoint", None), "query_budget", None)
+        problems = check_request(scope["method"], route.path, budget, stats)
+        if not problems:
+            return
+        if self.mode == "raise":
+            raise QueryBudgetExceeded("\n".join(problems))
+        for problem in problems:
+            print(f"⚠️ {problem}")
@@ -0,0 +1,305 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+
+from fastapi.routing import APIRoute
+from sqlalchemy import case, delete, select, update
+from sqlalchemy.exc import IntegrityError
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+
+from database import SessionLocal
+from models.rate_limit_bucket import RateLimitBucket
+from core.metrics import registry, Counter
+from core.security import decode_jwt_token
+from core.config import (
+    RATE_LIMIT_ENABLED,
+    RATE_LIMIT_BACKEND,
+    RATE_LIMIT_MAX_BUCKETS,
+    RATE_LIMIT_TRUST_PROXY,
+)
+
+
+SCOPE_IP = "ip"
+SCOPE_USER = "user"
+
+# Как часто общий бэкенд удаляет полные (то есть ничего не помнящие) корзины
+SWEEP_INTERVAL = 60.0
+
+rate_limited_total = registry.register(Counter(
+    "rate_limited_total", "Запросы, отклонённые ограничением частоты", ("route", "scope")
+))
+
+
+class Rate:
+    """Корзина на capacity запросов, пополняется полностью за period секунд"""
+    __slots__ = ("capacity", "period", "refill")
+
+    def __init__(self, spec: str):
+        try:
+            capacity, period = spec.split("/")
+            self.capacity = float(capacity)
+            self.period = float(period)
+        except ValueError:
+            raise ValueError(f"Лимит должен иметь вид 'запросов/секунд', получено: {spec!r}")
+        if self.capacity < 1 or self.period <= 0:
+            raise ValueError(f"Неверный лимит: {spec!r}")
+        self.refill = self.capacity / self.period
+
+
+def rate_limit(ip: str = None, user: str = None):
+    """
+    Лимиты маршрута, ставится под @router.*: ip="10/60" - на адрес клиента,
+    user="5/300" - на пользователя из JWT (без токена проверяется только лимит по IP)
+    """
+    rules = []
+    if user:
+        rules.append((SCOPE_USER, Rate(user)))
+    if ip:
+        rules.append((SCOPE_IP, Rate(ip)))
+
+    def decorator(endpoint):
+        endpoint.rate_limits = tuple(rules)
+        return endpoint
+
+    return decorator
+
+
+class MemoryBuckets:
+    """
+    Корзины в памяти процесса. OrderedDict в порядке обращений: проверка O(1),
+    а с начала словаря по ходу дела убираются корзины, которые уже снова полные
+    """
+
+    def __init__(self, maxsize: int = RATE_LIMIT_MAX_BUCKETS):
+        self.maxsize = maxsize
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _evict(self, now: float):
+        while self._buckets:
+            _, (_, _, full_at) = next(iter(self._buckets.items()))
+            if full_at > now and len(self._buckets) <= self.maxsize:
+                break
+            self._buckets.popitem(last=False)
+
+    def take_sync(self, key: str, rate: Rate) -> float:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._buckets.get(key)
+            if entry is None:
+                tokens = rate.capacity
+            else:
+                tokens = min(rate.capacity, entry[0] + (now - entry[1]) * rate.refill)
+
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / rate.refill
+
+            self._buckets[key] = (tokens, now, now + (rate.capacity - tokens) / rate.refill)
+            self._buckets.move_to_end(key)
+            self._evict(now)
+        return wait
+
+    async def take(self, key: str, rate: Rate) -> float:
+        return self.take_sync(key, rate)
+
+    def refund_sync(self, key: str, rate: Rate):
+        with self._lock:
+            entry = self._buckets.get(key)
+            if entry is None:
+                return
+            tokens = min(rate.capacity, entry[0] + 1)
+            self._buckets[key] = (tokens, entry[1], entry[1] + (rate.capacity - tokens) / rate.refill)
+
+    async def refund(self, key: str, rate: Rate):
+        self.refund_sync(key, rate)
+
+    def __len__(self):
+        return len(self._buckets)
+
+
+class DatabaseBuckets:
+    """
+    Общие корзины в таблице rate_limit_buckets для нескольких воркеров.
+    Списание токена - один условный UPDATE, пополнение считается в том же выражении
+    """
+
+    def __init__(self):
+        self._last_sweep = 0.0
+        self._lock = threading.Lock()
+
+    def _sweep(self, db, now: float):
+        with self._lock:
+            if now - self._last_sweep < SWEEP_INTERVAL:
+                return
+            self._last_sweep = now
+        db.execute(delete(RateLimitBucket).where(RateLimitBucket.full_at <= now))
+
+    def take_sync(self, key: str, rate: Rate) -> float:
+        now = time.time()
+        refilled = RateLimitBucket.tokens + (now - RateLimitBucket.updated_at) * rate.refill
+        refilled = case((refilled > rate.capacity, rate.capacity), else_=refilled)
+
+        with SessionLocal() as db:
+            self._sweep(db, now)
+            for _ in range(2):
+                taken = db.execute(
+                    update(RateLimitBucket)
+                    .where(RateLimitBucket.key == key, refilled >= 1)
+                    .values(
+                        tokens=refilled - 1,
+                        updated_at=now,
+                        full_at=now + (rate.capacity - (refilled - 1)) / rate.refill
+                    )
+                    .execution_options(synchronize_session=False)
+                ).rowcount
+                if taken:
+                    db.commit()
+                    return 0.0
+
+                row = db.execute(
+                    select(RateLimitBucket.tokens, RateLimitBucket.updated_at).where(RateLimitBucket.key == key)
+                ).first()
+                if row is not None:
+                    db.commit()
+                    tokens = min(rate.capacity, row.tokens + (now - row.updated_at) * rate.refill)
+                    return (1 - tokens) / rate.refill
+
+                try:
+                    with db.begin_nested():
+                        db.add(RateLimitBucket(
+                            key=key,
+                            tokens=rate.capacity - 1,
+                            updated_at=now,
+                            full_at=now + 1 / rate.refill
+                        ))
+                    db.commit()
+                    return 0.0
+                except IntegrityError:
+                    # Корзину успел создать параллельный запрос - списываем из неё
+                    continue
+            db.commit()
+        return 1 / rate.refill
+
+    async def take(self, key: str, rate: Rate) -> float:
+        return await run_in_threadpool(self.take_sync, key, rate)
+
+    def refund_sync(self, key: str, rate: Rate):
+        tokens = case((RateLimitBucket.tokens + 1 > rate.capacity, rate.capacity), else_=RateLimitBucket.tokens + 1)
+        with SessionLocal() as db:
+            db.execute(
+                update(RateLimitBucket)
+                .where(RateLimitBucket.key == key)
+                .values(
+                    tokens=tokens,
+                    full_at=RateLimitBucket.updated_at + (rate.capacity - tokens) / rate.refill
+                )
+                .execution_options(synchronize_session=False)
+            )
+            db.commit()
+
+    async def refund(self, key: str, rate: Rate):
+        await run_in_threadpool(self.refund_sync, key, rate)
+
+
+def make_backend(name: str = RATE_LIMIT_BACKEND):
+    if name == "memory":
+        return MemoryBuckets()
+    if name == "database":
+        return DatabaseBuckets()
+    raise ValueError("RATE_LIMIT_BACKEND должен быть memory или database")
+
+
+def client_ip(scope, headers: Headers) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        forwarded = headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.split(",")[0].strip()
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+
+def token_user_id(headers: Headers):
+    """id из JWT без похода в базу; с неверным токеном маршрут сам ответит 401"""
+    scheme, _, token = headers.get("authorization", "").partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return None
+    try:
+        return decode_jwt_token(token)
+    except Exception:
+        return None
+
+
+class RateLimitMiddleware:
+    """
+    Проверка лимитов до маршрута: лишний запрос не доходит ни до разбора тела, ни до bcrypt.
+    Таблица лимитов собирается из маршрутов с @rate_limit в переданных роутерах
+    """
+
+    def __init__(self, app, routers=(), enabled: bool = RATE_LIMIT_ENABLED, backend=None):
+        self.app = app
+        self.enabled = enabled
+        self.backend = backend if backend is not None else make_backend()
+        self._build(routers)
+
+    def _build(self, routers):
+        static, dynamic = {}, []
+        for route in (route for router in routers for route in router.routes):
+            rules = getattr(getattr(route, "endpoint", None), "rate_limits", None)
+            if not isinstance(route, APIRoute) or not rules:
+                continue
+            for method in route.methods:
+                if route.param_convertors:
+                    dynamic.append((method, route.path_regex, route.path, rules))
+                else:
+                    static[(method, route.path)] = (route.path, rules)
+        self._static, self._dynamic = static, dynamic
+
+    def _match(self, method: str, path: str):
+        match = self._static.get((method, path))
+        if match is not None:
+            return match
+        for route_method, path_regex, route_path, rules in self._dynamic:
+            if route_method == method and path_regex.match(path):
+                return route_path, rules
+        return None
+
+    async def __call__(self, scope, receive, send):
+        if not self.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        match = self._match(scope["method"], scope["path"])
+        if match is None:
+            await self.app(scope, receive, send)
+            return
+
+        route_path, rules = match
+        headers = Headers(scope=scope)
+        taken = []
+        for rule_scope, rate in rules:
+            identity = client_ip(scope, headers) if rule_scope == SCOPE_IP else token_user_id(headers)
+            if identity is None:
+                continue
+            key = f"{scope['method']} {route_path}|{rule_scope}:{identity}"
+            wait = await self.backend.take(key, rate)
+            if wait > 0:
+                # Запрос не пройдёт: токены, списанные предыдущими правилами, возвращаются
+                for taken_key, taken_rate in taken:
+                    await self.backend.refund(taken_key, taken_rate)
+                rate_limited_total.inc((route_path, rule_scope))
+                response = JSONResponse(
+                    {"detail": "Слишком много запросов, попробуйте позже"},
+                    status_code=429,
+                    headers={"Retry-After": str(max(1, math.ceil(wait)))}
+                )
+                await response(scope, receive, send)
+                return
+            taken.append((key, rate))
+
+        await self.app(scope, receive, send)
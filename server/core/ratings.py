@@ -0,0 +1,80 @@
+from sqlalchemy import func
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.review import Review
+from models.worker_rating import WorkerRating
+
+
+def empty_rating() -> dict:
+    return {"rating": 0.0, "count": 0}
+
+
+def format_rating(rating_sum: float, rating_count: int) -> dict:
+    if not rating_count:
+        return empty_rating()
+    return {"rating": round(float(rating_sum) / rating_count, 1), "count": rating_count}
+
+
+def get_rating(db: Session, worker_id: int) -> dict:
+    """Рейтинг исполнителя из агрегата, без чтения отзывов"""
+    row = db.query(WorkerRating.rating_sum, WorkerRating.rating_count).filter(
+        WorkerRating.worker_id == worker_id
+    ).first()
+    if not row:
+        return empty_rating()
+    return format_rating(row.rating_sum, row.rating_count)
+
+
+def get_ratings(db: Session, worker_ids) -> dict:
+    """Рейтинги сразу нескольких исполнителей одним запросом"""
+    worker_ids = [worker_id for worker_id in set(worker_ids) if worker_id is not None]
+    if not worker_ids:
+        return {}
+
+    rows = (
+        db.query(WorkerRating.worker_id, WorkerRating.rating_sum, WorkerRating.rating_count)
+        .filter(WorkerRating.worker_id.in_(worker_ids))
+        .all()
+    )
+    return {row.worker_id: format_rating(row.rating_sum, row.rating_count) for row in rows}
+
+
+def _increment(db: Session, worker_id: int, rating: float) -> int:
+    return db.query(WorkerRating).filter(WorkerRating.worker_id == worker_id).update(
+        {
+            WorkerRating.rating_sum: WorkerRating.rating_sum + rating,
+            WorkerRating.rating_count: WorkerRating.rating_count + 1
+        },
+        synchronize_session=False
+    )
+
+
+def record_rating(db: Session, worker_id: int, rating: float):
+    """
+    Учесть новую оценку в агрегате. Коммит остаётся за вызывающим,
+    чтобы агрегат менялся в одной транзакции с вставкой отзыва
+    """
+    if _increment(db, worker_id, rating):
+        return
+
+    try:
+        with db.begin_nested():
+            db.add(WorkerRating(worker_id=worker_id, rating_sum=rating, rating_count=1))
+    except IntegrityError:
+        # Строку успел создать параллельный запрос
+        _increment(db, worker_id, rating)
+
+
+def rebuild_ratings(db: Session):
+    """Пересчитать агрегаты по таблице отзывов (для уже существующих баз)"""
+    db.query(WorkerRating).delete(synchronize_session=False)
+    rows = (
+        db.query(Review.worker_id, func.sum(Review.rating), func.count(Review.id))
+        .group_by(Review.worker_id)
+        .all()
+    )
+    db.add_all(
+        WorkerRating(worker_id=worker_id, rating_sum=rating_sum, rating_count=count)
+        for worker_id, rating_sum, count in rows
+    )
+    db.commit()
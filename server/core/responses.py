@@ -0,0 +1,37 @@
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from models.service import Service
+from models.service_response import ServiceResponse
+
+
+def add_response(db: Session, service_id: int, responder: str) -> bool:
+    """
+    Добавить отклик и увеличить счётчик в одной транзакции.
+    Возвращает False, если этот пользователь уже откликался
+    """
+    try:
+        with db.begin_nested():
+            db.add(ServiceResponse(service_id=service_id, responder=responder))
+    except IntegrityError:
+        return False
+
+    db.query(Service).filter(Service.id == service_id).update(
+        {Service.responses_count: Service.responses_count + 1},
+        synchronize_session=False
+    )
+    return True
+
+
+def remove_response(db: Session, service_id: int, responder: str) -> bool:
+    deleted = db.query(ServiceResponse).filter(
+        ServiceResponse.service_id == service_id,
+        ServiceResponse.responder == responder
+    ).delete(synchronize_session=False)
+    if not deleted:
+        return False
+
+    db.query(Service).filter(Service.id == service_id).update(
+        {Service.responses_count: Service.responses_count - 1},
+        synchronize_session=False
+    )
+    return True
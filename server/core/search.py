@@ -0,0 +1,130 @@
+import html
+import re
+
+from sqlalchemy import text, or_, func
+from sqlalchemy.orm import Session
+from models.service import Service
+
+
+FTS_TABLE = "services_fts"
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_END = "</mark>"
+# FTS5 расставляет метки в сыром тексте заказа; HTML-экранирование идёт после, метки - управляющие символы
+_MARK_START = "\x02"
+_MARK_END = "\x03"
+LIKE_ESCAPE = "\\"
+SNIPPET_TOKENS = 16
+DESCRIPTION_PREVIEW_LENGTH = 300
+
+# Веса колонок для bm25: заголовок важнее навыков, навыки важнее описания
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+SKILLS_WEIGHT = 5.0
+
+_fts_enabled = False
+
+
+def enable_search_index(engine):
+    """При старте: искать через FTS5, только если миграция создала индекс"""
+    global _fts_enabled
+
+    if engine.dialect.name != "sqlite":
+        _fts_enabled = False
+        return
+    with engine.connect() as conn:
+        _fts_enabled = _search_index_exists(conn)
+
+
+def _search_index_exists(conn) -> bool:
+    return conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+        {"name": FTS_TABLE}
+    ).first() is not None
+
+
+def build_match_query(q: str) -> str:
+    """Превращает пользовательский ввод в безопасный MATCH-запрос: все слова, по префиксу"""
+    words = re.findall(r"\w+", q)
+    return " ".join('"' + word.replace('"', '""') + '"*' for word in words)
+
+
+def highlight_html(text_with_marks):
+    """Текст заказа с метками FTS5 -> безопасный HTML, где совпадения обёрнуты в <mark>"""
+    if text_with_marks is None:
+        return None
+    return html.escape(text_with_marks).replace(_MARK_START, HIGHLIGHT_START).replace(_MARK_END, HIGHLIGHT_END)
+
+
+def like_pattern(q: str) -> str:
+    """Подстрока для LIKE: % и _ из запроса ищутся как обычные символы"""
+    escaped = q.strip().replace(LIKE_ESCAPE, LIKE_ESCAPE * 2).replace("%", LIKE_ESCAPE + "%").replace("_", LIKE_ESCAPE + "_")
+    return f"%{escaped}%"
+
+
+def search_services(db: Session, q: str, limit: int, offset: int) -> list:
+    if not _fts_enabled:
+        return _search_services_like(db, q, limit, offset)
+
+    match = build_match_query(q)
+    if not match:
+        return []
+
+    rows = db.execute(
+        text(f"""
+            SELECT
+                s.id, s.service_title, substr(s.description, 1, :description_length) AS description,
+                s.price, s.duration, s.skills, s.status,
+                s.category, s.image_path, s.user_id, s.freelancer_id,
+                highlight({FTS_TABLE}, 0, :hl_start, :hl_end) AS title_highlight,
+                snippet({FTS_TABLE}, 1, :hl_start, :hl_end, '…', :snippet_tokens) AS snippet,
+                bm25({FTS_TABLE}, :title_weight, :description_weight, :skills_weight) AS rank
+            FROM {FTS_TABLE}
+            JOIN services AS s ON s.id = {FTS_TABLE}.rowid
+            WHERE {FTS_TABLE} MATCH :match
+            ORDER BY rank
+            LIMIT :limit OFFSET :offset
+        """),
+        {
+            "match": match,
+            "description_length": DESCRIPTION_PREVIEW_LENGTH,
+            "hl_start": _MARK_START,
+            "hl_end": _MARK_END,
+            "snippet_tokens": SNIPPET_TOKENS,
+            "title_weight": TITLE_WEIGHT,
+            "description_weight": DESCRIPTION_WEIGHT,
+            "skills_weight": SKILLS_WEIGHT,
+            "limit": limit,
+            "offset": offset
+        }
+    ).mappings().all()
+
+    return [
+        {**row, "title_highlight": highlight_html(row["title_highlight"]), "snippet": highlight_html(row["snippet"])}
+        for row in rows
+    ]
+
+
+def _search_services_like(db: Session, q: str, limit: int, offset: int) -> list:
+    pattern = like_pattern(q)
+    rows = (
+        db.query(
+            Service.id, Service.service_title,
+            func.substr(Service.description, 1, DESCRIPTION_PREVIEW_LENGTH).label("description"),
+            Service.price, Service.duration,
+            Service.skills, Service.status, Service.category, Service.image_path,
+            Service.user_id, Service.freelancer_id
+        )
+        .filter(or_(
+            Service.service_title.ilike(pattern, escape=LIKE_ESCAPE),
+            Service.description.ilike(pattern, escape=LIKE_ESCAPE),
+            Service.skills.ilike(pattern, escape=LIKE_ESCAPE)
+        ))
+        .order_by(Service.id.desc())
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
+    return [
+        {**dict(row._mapping), "title_highlight": html.escape(row.service_title), "snippet": None, "rank": None}
+        for row in rows
+    ]
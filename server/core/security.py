@@ -1,12 +1,16 @@
 import bcrypt
 import jwt
+from dataclasses import dataclass
 from datetime import datetime, timedelta
+from typing import Optional
 
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from sqlalchemy.orm import Session
+from sqlalchemy import select
 from models.user import User
-from database import SessionLocal
+from database import SessionLocal, AsyncSessionLocal
+from core.cache import auth_user_cache
+from core.config import BCRYPT_ROUNDS
 
 
 
@@ -25,9 +29,13 @@ def get_db():
     finally:
         db.close()
 
-def hash_password(password: str) -> str:
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+def hash_password(password: str, rounds: int = BCRYPT_ROUNDS) -> str:
     """Хеширование пароля с использованием bcrypt"""
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=rounds)
     hashed = bcrypt.hashpw(password.encode("utf-8"), salt)
     return hashed.decode("utf-8")
 
@@ -35,6 +43,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Проверка пароля"""
     return bcrypt.checkpw(plain_password.encode("utf-8"), hashed_password.encode("utf-8"))
 
+def password_hash_rounds(hashed_password: str) -> Optional[int]:
+    """Стоимость (cost) из bcrypt-хеша вида $2b$12$..."""
+    try:
+        return int(hashed_password.split("$")[2])
+    except (IndexError, ValueError):
+        return None
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    return password_hash_rounds(hashed_password) != BCRYPT_ROUNDS
+
 def create_jwt_token(user_id: int) -> str:
     """Создание JWT токена"""
     try:
@@ -65,17 +83,38 @@ def decode_jwt_token(token: str) -> int:
     except Exception as e:
         raise HTTPException(status_code=401, detail=f"Ошибка при декодировании токена: {str(e)}")
 
-def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security), db: Session = Depends(get_db)):
-    print("🔐 Получен токен:", credentials.credentials)
-    try:
-        user_id = decode_jwt_token(credentials.credentials)
-        print("✅ Раскодирован user_id:", user_id)
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            print("❌ Пользователь не найден")
-            raise HTTPException(status_code=404, detail="Пользователь не найден")
-        print("👤 Пользователь найден:", user.username, user.id)
+@dataclass(frozen=True)
+class AuthUser:
+    """Всё, что маршрутам нужно знать о текущем пользователе"""
+    id: int
+    username: str
+    email: Optional[str]
+
+
+def invalidate_user(user_id: int):
+    """Сбросить кэш пользователя: после смены пароля, удаления и т.п."""
+    auth_user_cache.invalidate(user_id)
+
+
+async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> AuthUser:
+    return await user_from_token(credentials.credentials)
+
+
+async def user_from_token(token: str) -> AuthUser:
+    """Пользователь по JWT не из заголовка (например, ?token= у EventSource)"""
+    user_id = decode_jwt_token(token)
+
+    user = auth_user_cache.get(user_id)
+    if user is not None:
         return user
-    except Exception as e:
-        print("🔴 Ошибка аутентификации:", str(e))
-        raise HTTPException(status_code=401, detail="Неверный токен")
\ No newline at end of file
+
+    async with AsyncSessionLocal() as db:
+        row = (await db.execute(
+            select(User.id, User.username, User.email).where(User.id == user_id)
+        )).first()
+    if not row:
+        raise HTTPException(status_code=401, detail="Неверный токен")
+
+    user = AuthUser(id=row.id, username=row.username, email=row.email)
+    auth_user_cache.set(user_id, user)
+    return user
@@ -0,0 +1,83 @@
+import mimetypes
+import os
+import re
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse
+from starlette.staticfiles import NotModifiedResponse
+
+
+# Имена, которые выдаёт core/uploads: <sha256>.<ext> и варианты <sha256>.<variant>.webp
+CONTENT_HASHED_NAME = re.compile(r"^([0-9a-f]{64})((?:\.[a-z0-9]+)*)$")
+
+IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+REVALIDATE_CACHE_CONTROL = "public, no-cache"
+
+# Типы, которые браузер исполняет как документ: уже загруженные SVG отдаются только вложением
+ACTIVE_MEDIA_TYPES = {"image/svg+xml", "text/html", "application/xhtml+xml"}
+
+# Заранее сжатые копии рядом с файлом, в порядке предпочтения
+PRECOMPRESSED_ENCODINGS = (
+    ("br", ".br"),
+    ("gzip", ".gz"),
+)
+
+
+def accepted_encodings(request_headers: Headers) -> set:
+    header = request_headers.get("accept-encoding", "")
+    return {part.split(";")[0].strip().lower() for part in header.split(",") if part.strip()}
+
+
+class CachedStaticFiles(StaticFiles):
+    """
+    StaticFiles с долгим кэшем для файлов с хешем в имени, сильными ETag
+    и отдачей заранее сжатых копий (.br / .gz), если они есть
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code: int = 200):
+        request_headers = Headers(scope=scope)
+        full_path = str(full_path)
+        media_type = mimetypes.guess_type(full_path)[0] or "application/octet-stream"
+
+        serve_path, serve_stat, encoding = full_path, stat_result, None
+        accepted = accepted_encodings(request_headers)
+        for candidate_encoding, suffix in PRECOMPRESSED_ENCODINGS:
+            if candidate_encoding not in accepted:
+                continue
+            try:
+                serve_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            serve_path, encoding = full_path + suffix, candidate_encoding
+            break
+
+        response = FileResponse(
+            serve_path,
+            status_code=status_code,
+            stat_result=serve_stat,
+            media_type=media_type
+        )
+        response.headers["vary"] = "Accept-Encoding"
+        response.headers["x-content-type-options"] = "nosniff"
+        if media_type in ACTIVE_MEDIA_TYPES:
+            response.headers["content-disposition"] = "attachment"
+            response.headers["content-security-policy"] = "sandbox"
+        if encoding:
+            response.headers["content-encoding"] = encoding
+
+        match = CONTENT_HASHED_NAME.match(os.path.basename(full_path))
+        if match:
+            # Содержимое файла однозначно определяется именем, поэтому ETag и кэш навсегда
+            tag = match.group(1) + match.group(2)
+            if encoding:
+                tag += "-" + encoding
+            response.headers["etag"] = f'"{tag}"'
+            response.headers["cache-control"] = IMMUTABLE_CACHE_CONTROL
+        else:
+            # Старые файлы вида user_<id>.<ext> перезаписывались на месте: только с проверкой
+            response.headers["cache-control"] = REVALIDATE_CACHE_CONTROL
+
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,115 @@
+import hashlib
+import os
+import uuid
+
+from fastapi import HTTPException, UploadFile
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.responses import JSONResponse
+from core.config import UPLOAD_MAX_BYTES, UPLOAD_CHUNK_SIZE, UPLOAD_REQUEST_MAX_BYTES
+
+
+# Без SVG: он может содержать скрипты, а отдаётся с того же origin
+ALLOWED_IMAGE_EXTENSIONS = {"jpg", "jpeg", "png", "webp", "gif", "jfif"}
+
+
+def too_large_detail(max_bytes: int) -> str:
+    return f"Файл слишком большой, максимум {max_bytes // (1024 * 1024)} МБ"
+
+
+def image_extension(filename: str) -> str:
+    extension = os.path.splitext(filename or "")[1].lstrip(".").lower()
+    if extension not in ALLOWED_IMAGE_EXTENSIONS:
+        raise HTTPException(status_code=400, detail="Неподдерживаемый формат изображения")
+    return extension
+
+
+def _discard(path: str):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+async def save_upload(upload: UploadFile, directory: str, max_bytes: int = UPLOAD_MAX_BYTES) -> str:
+    """
+    Сохранить загруженный файл по частям, не держа его целиком в памяти.
+    Имя файла - sha256 содержимого, поэтому одинаковые картинки хранятся один раз,
+    а разные никогда не перезаписывают друг друга. Возвращает путь вида directory/<hash>.<ext>
+    """
+    extension = image_extension(upload.filename)
+    os.makedirs(directory, exist_ok=True)
+
+    temp_path = os.path.join(directory, f".upload-{uuid.uuid4().hex}.part")
+    digest = hashlib.sha256()
+    size = 0
+
+    f = await run_in_threadpool(open, temp_path, "wb")
+    try:
+        while True:
+            chunk = await upload.read(UPLOAD_CHUNK_SIZE)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > max_bytes:
+                raise HTTPException(status_code=413, detail=too_large_detail(max_bytes))
+            digest.update(chunk)
+            await run_in_threadpool(f.write, chunk)
+    except BaseException:
+        await run_in_threadpool(f.close)
+        await run_in_threadpool(_discard, temp_path)
+        raise
+    await run_in_threadpool(f.close)
+
+    if size == 0:
+        await run_in_threadpool(_discard, temp_path)
+        raise HTTPException(status_code=400, detail="Пустой файл")
+
+    final_path = f"{directory}/{digest.hexdigest()}.{extension}"
+    if os.path.exists(final_path):
+        await run_in_threadpool(_discard, temp_path)
+    else:
+        await run_in_threadpool(os.replace, temp_path, final_path)
+    return final_path
+
+
+class UploadLimitMiddleware:
+    """
+    Ограничение размера multipart-запроса до разбора формы: иначе Starlette
+    сначала примет и сохранит во временный файл всё тело, и только потом
+    save_upload увидит, что файл слишком большой
+    """
+
+    def __init__(self, app, max_bytes: int = UPLOAD_REQUEST_MAX_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        if not headers.get("content-type", "").startswith("multipart/form-data"):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = headers.get("content-length")
+        if content_length and content_length.isdigit() and int(content_length) > self.max_bytes:
+            response = JSONResponse({"detail": too_large_detail(UPLOAD_MAX_BYTES)}, status_code=413)
+            await response(scope, receive, send)
+            return
+
+        # Без Content-Length (chunked) считаем байты по мере чтения и обрываем разбор
+        received = 0
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise HTTPException(status_code=413, detail=too_large_detail(UPLOAD_MAX_BYTES))
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,43 @@
+from sqlalchemy.orm import Session
+from models.user import User
+from models.worker import Worker
+from models.worker_rating import WorkerRating
+from core.ratings import format_rating
+from core.images import image_variants
+
+
+def build_user_card(user_id: int, username: str, image_path, rating: dict) -> dict:
+    """Краткая карточка пользователя для списков и деталей заказа"""
+    return {
+        "id": user_id,
+        "username": username,
+        "image_path": image_path,
+        "image_variants": image_variants(image_path),
+        "rating": rating["rating"],
+        "count": rating["count"]
+    }
+
+
+def get_user_cards(db: Session, user_ids) -> dict:
+    """
+    Карточки пользователей по id: один JOIN users/work/worker_ratings
+    """
+    user_ids = [user_id for user_id in set(user_ids) if user_id is not None]
+    if not user_ids:
+        return {}
+
+    rows = (
+        db.query(
+            User.id, User.username, Worker.image_path,
+            WorkerRating.rating_sum, WorkerRating.rating_count
+        )
+        .outerjoin(Worker, Worker.user_id == User.id)
+        .outerjoin(WorkerRating, WorkerRating.worker_id == User.id)
+        .filter(User.id.in_(user_ids))
+        .all()
+    )
+
+    return {
+        row.id: build_user_card(row.id, row.username, row.image_path, format_rating(row.rating_sum, row.rating_count))
+        for row in rows
+    }
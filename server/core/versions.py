@@ -0,0 +1,169 @@
+import datetime
+import hashlib
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Optional
+
+from fastapi import Request, Response
+from sqlalchemy import event, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from starlette.staticfiles import NotModifiedResponse
+
+from core.static import REVALIDATE_CACHE_CONTROL
+from models.resource_version import ResourceVersion
+
+
+# Коллекции
+SERVICES = "services"
+CATEGORIES = "categories"
+USERS = "users"
+
+_UPSERT_DIALECTS = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+# Ключ версии -> сброс локальных кэшей этого процесса после коммита
+_invalidators = {}
+
+
+def service_key(service_id: int) -> str:
+    return f"service:{service_id}"
+
+
+def user_key(user_id: int) -> str:
+    return f"user:{user_id}"
+
+
+def service_changed(service_id: int) -> list:
+    """Заказ изменился: он сам, список заказов и счётчики категорий"""
+    return [SERVICES, CATEGORIES, service_key(service_id)]
+
+
+def user_changed(user_id: int) -> list:
+    """Карточка пользователя изменилась: она сама и все карточки во вложениях"""
+    return [USERS, user_key(user_id)]
+
+
+def on_bump(key: str, invalidate):
+    """Вызывать invalidate() после коммита транзакции, увеличившей версию key"""
+    _invalidators.setdefault(key, []).append(invalidate)
+
+
+def bump_versions(db: Session, keys):
+    """
+    Увеличить версии в текущей транзакции: новые ETag появятся вместе с коммитом изменения.
+    Коммит остаётся за вызывающим
+    """
+    # Один порядок блокировок для всех писателей
+    keys = sorted(set(keys))
+    invalidators = [invalidate for key in keys for invalidate in _invalidators.get(key, ())]
+    if invalidators:
+        event.listen(db, "after_commit", lambda session: [invalidate() for invalidate in invalidators], once=True)
+    now = datetime.datetime.utcnow()
+    make_insert = _UPSERT_DIALECTS.get(db.get_bind().dialect.name)
+
+    if make_insert is not None:
+        statement = make_insert(ResourceVersion).values([
+            {"key": key, "version": 1, "updated_at": now} for key in keys
+        ])
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[ResourceVersion.key],
+            set_={"version": ResourceVersion.version + 1, "updated_at": now}
+        ))
+        return
+
+    for key in keys:
+        bumped = db.execute(
+            update(ResourceVersion)
+            .where(ResourceVersion.key == key)
+            .values(version=ResourceVersion.version + 1, updated_at=now)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if bumped:
+            continue
+        try:
+            with db.begin_nested():
+                db.add(ResourceVersion(key=key, version=1, updated_at=now))
+        except IntegrityError:
+            # Строку успел создать параллельный запрос
+            db.execute(
+                update(ResourceVersion)
+                .where(ResourceVersion.key == key)
+                .values(version=ResourceVersion.version + 1, updated_at=now)
+                .execution_options(synchronize_session=False)
+            )
+
+
+def read_versions(db: Session, keys) -> dict:
+    """{ключ: (версия, updated_at)} одним запросом; ещё не менявшихся ключей в ответе нет"""
+    rows = db.execute(
+        select(ResourceVersion.key, ResourceVersion.version, ResourceVersion.updated_at)
+        .where(ResourceVersion.key.in_(list(keys)))
+    ).all()
+    return {row.key: (row.version, row.updated_at) for row in rows}
+
+
+class Validators:
+    """Сильный ETag и Last-Modified для представления, собранного из версий ключей"""
+
+    def __init__(self, keys, versions: dict):
+        parts = []
+        last_modified = None
+        for key in keys:
+            version, updated_at = versions.get(key, (0, None))
+            parts.append(f"{key}={version}@{updated_at.isoformat() if updated_at else ''}")
+            if updated_at and (last_modified is None or updated_at > last_modified):
+                last_modified = updated_at
+
+        self.etag = '"' + hashlib.sha1(";".join(parts).encode("utf-8")).hexdigest() + '"'
+        self.last_modified = self._http_last_modified(last_modified)
+
+    @staticmethod
+    def _http_last_modified(updated_at) -> Optional[datetime.datetime]:
+        """
+        Last-Modified с точностью до секунды. Пока секунда последнего изменения не прошла,
+        следующая запись в ту же секунду получит ту же дату, и клиент с одним If-Modified-Since
+        получил бы ложный 304 - такой ответ идёт без Last-Modified, только с ETag
+        """
+        if updated_at is None:
+            return None
+        second = updated_at.replace(microsecond=0)
+        if datetime.datetime.utcnow() < second + datetime.timedelta(seconds=1):
+            return None
+        return second.replace(tzinfo=datetime.timezone.utc)
+
+    def matches(self, request: Request) -> bool:
+        # Есть If-None-Match - решает только ETag, If-Modified-Since не смотрим (RFC 9110, 13.1.3)
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match:
+            if if_none_match.strip() == "*":
+                return True
+            return self.etag in [tag.strip().removeprefix("W/") for tag in if_none_match.split(",")]
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if not if_modified_since or self.last_modified is None:
+            return False
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            return False
+        return self.last_modified <= since
+
+    def apply(self, response: Response):
+        response.headers["etag"] = self.etag
+        response.headers["cache-control"] = REVALIDATE_CACHE_CONTROL
+        if self.last_modified is not None:
+            response.headers["last-modified"] = format_datetime(self.last_modified, usegmt=True)
+
+
+def not_modified(request: Request, response: Response, keys, versions: dict) -> Optional[Response]:
+    """
+    Проставить валидаторы в ответ и вернуть 304, если у клиента то же представление.
+    Версии читаются до сборки тела: так тело никогда не окажется старше своего ETag
+    """
+    validators = Validators(keys, versions)
+    validators.apply(response)
+    if validators.matches(request):
+        return NotModifiedResponse(response.headers)
+    return None
@@ -0,0 +1,116 @@
+import importlib
+
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from models.transaction import Transaction
+from core.jobs import job_handler
+from core.ledger import refund_withdrawal, from_minor
+from core.events import hub, user_channel, TRANSACTION, BALANCE
+from core.config import PAYOUT_PROVIDER
+
+
+STATUS_PENDING = "В обработке"
+STATUS_DONE = "Обработан"
+STATUS_REJECTED = "Отклонён"
+# Исход выплаты неизвестен (таймаут, потерянная аренда): деньги не возвращаются, пока их не проверят вручную
+STATUS_REVIEW = "На проверке"
+
+JOB_WITHDRAWAL = "withdrawal"
+
+
+_provider = None
+
+
+class PayoutFailed(Exception):
+    """Провайдер точно знает, что выплата не прошла: сумму можно вернуть на баланс"""
+
+
+def manual_payout(transaction_id: int, user_id: int, amount_minor: int, idempotency_key: str):
+    """
+    Провайдер по умолчанию: деньги переводятся вне приложения, как и до очереди задач,
+    а транзакция сразу помечается проведённой
+    """
+    print(f"💸 Вывод #{transaction_id}: {from_minor(amount_minor)}$ пользователю {user_id}, выплата вручную")
+
+
+def payout_provider():
+    global _provider
+    if _provider is None:
+        module_name, _, name = PAYOUT_PROVIDER.partition(":")
+        _provider = getattr(importlib.import_module(module_name), name)
+    return _provider
+
+
+def send_payout(transaction_id: int, user_id: int, amount_minor: int):
+    """
+    Выплата через провайдера из PAYOUT_PROVIDER. Задача может выполниться повторно (аренда истекла,
+    воркер упал после выплаты), поэтому провайдеру передаётся ключ идемпотентности - id транзакции
+    """
+    payout_provider()(
+        transaction_id=transaction_id,
+        user_id=user_id,
+        amount_minor=amount_minor,
+        idempotency_key=f"withdrawal-{transaction_id}"
+    )
+
+
+def _set_status(db: Session, transaction_id: int, status: str) -> bool:
+    return db.execute(
+        update(Transaction)
+        .where(Transaction.id == transaction_id, Transaction.status == STATUS_PENDING)
+        .values(status=status)
+        .execution_options(synchronize_session=False)
+    ).rowcount > 0
+
+
+def _publish_status(user_id: int, transaction_id: int, status: str):
+    hub.publish(TRANSACTION, {"id": transaction_id, "status": status}, [user_channel(user_id)])
+
+
+def reject_withdrawal(db: Session, payload: dict):
+    """Выплата точно не прошла: транзакция отклоняется, деньги возвращаются на баланс"""
+    transaction_id, user_id = payload["transaction_id"], payload["user_id"]
+    if not _set_status(db, transaction_id, STATUS_REJECTED):
+        return None
+    balance_minor = refund_withdrawal(db, user_id, payload["amount_minor"], transaction_id)
+
+    def after_commit():
+        _publish_status(user_id, transaction_id, STATUS_REJECTED)
+        hub.publish(BALANCE, {"balance": from_minor(balance_minor)}, [user_channel(user_id)])
+
+    return after_commit
+
+
+def hold_withdrawal(db: Session, payload: dict):
+    """
+    Попытки кончились, а исход неизвестен: выплата могла пройти до таймаута или потери аренды.
+    Возврат здесь мог бы заплатить дважды, поэтому транзакция ждёт ручной проверки
+    """
+    transaction_id, user_id = payload["transaction_id"], payload["user_id"]
+    if not _set_status(db, transaction_id, STATUS_REVIEW):
+        return None
+    print(f"⚠️ Вывод #{transaction_id}: исход выплаты неизвестен, нужна ручная проверка")
+    return lambda: _publish_status(user_id, transaction_id, STATUS_REVIEW)
+
+
+@job_handler(JOB_WITHDRAWAL, on_failure=hold_withdrawal)
+def settle_withdrawal(db: Session, payload: dict):
+    """
+    Провести выплату по транзакции "В обработке". Сумма уже списана с баланса при запросе,
+    здесь только выплата и смена статуса. PayoutFailed - отказ с возвратом,
+    любая другая ошибка - повтор с тем же ключом идемпотентности
+    """
+    transaction_id, user_id = payload["transaction_id"], payload["user_id"]
+    status = db.scalar(select(Transaction.status).where(Transaction.id == transaction_id))
+    if status != STATUS_PENDING:
+        return None
+
+    try:
+        send_payout(transaction_id, user_id, payload["amount_minor"])
+    except PayoutFailed as e:
+        print(f"⚠️ Вывод #{transaction_id} отклонён провайдером, сумма возвращена на баланс: {str(e)}")
+        return reject_withdrawal(db, payload)
+    if not _set_status(db, transaction_id, STATUS_DONE):
+        return None
+    return lambda: _publish_status(user_id, transaction_id, STATUS_DONE)
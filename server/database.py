@@ -1,9 +1,98 @@
-from sqlalchemy import create_engine, Column, Integer, String, Float, Text
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.orm import sessionmaker, declarative_base
+from core.metrics import instrument_engine
+from core.config import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_RECYCLE,
+    DB_POOL_TIMEOUT,
+    DB_ECHO,
+    SQLITE_BUSY_TIMEOUT_MS,
+    SQLITE_CACHE_SIZE_KB,
+    SQLITE_MMAP_SIZE,
+)
 
 
 
 Base = declarative_base()
 
-engine = create_engine("sqlite:///pizza.db")
-SessionLocal = sessionmaker(bind=engine)
\ No newline at end of file
+
+def is_sqlite_memory(url) -> bool:
+    return url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:")
+
+
+# Синхронный драйвер -> асинхронный для того же URL
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+}
+
+
+def to_async_url(url):
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS or url.drivername in ASYNC_DRIVERS.values():
+        return url
+    return url.set(drivername=ASYNC_DRIVERS[backend])
+
+
+def _engine_kwargs(url) -> dict:
+    kwargs = {"echo": DB_ECHO, "pool_pre_ping": True}
+    if not is_sqlite_memory(url):
+        kwargs.update(
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_timeout=DB_POOL_TIMEOUT,
+        )
+    return kwargs
+
+
+def build_engine(database_url: str = DATABASE_URL):
+    """Движок по DATABASE_URL: пул соединений для файловых БД, прагмы для SQLite"""
+    url = make_url(database_url)
+    new_engine = create_engine(url, **_engine_kwargs(url))
+
+    if url.get_backend_name() == "sqlite":
+        event.listen(new_engine, "connect", _make_sqlite_pragmas(is_sqlite_memory(url)))
+
+    return new_engine
+
+
+def build_async_engine(database_url: str = DATABASE_URL):
+    """Асинхронный движок для той же базы (aiosqlite / asyncpg)"""
+    url = to_async_url(make_url(database_url))
+    new_engine = create_async_engine(url, **_engine_kwargs(url))
+
+    if url.get_backend_name() == "sqlite":
+        event.listen(new_engine.sync_engine, "connect", _make_sqlite_pragmas(is_sqlite_memory(url)))
+
+    return new_engine
+
+
+def _make_sqlite_pragmas(in_memory: bool):
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if not in_memory:
+            # WAL: читатели не блокируют писателя и наоборот
+            cursor.execute("PRAGMA journal_mode=WAL")
+            cursor.execute("PRAGMA synchronous=NORMAL")
+            cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+    return set_sqlite_pragmas
+
+
+engine = build_engine()
+SessionLocal = sessionmaker(bind=engine)
+instrument_engine(engine)
+
+async_engine = build_async_engine()
+instrument_engine(async_engine.sync_engine)
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, expire_on_commit=False)
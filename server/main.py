@@ -1,17 +1,66 @@
+import asyncio
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from database import Base, engine
-from fastapi.staticfiles import StaticFiles
-from routes import pizza_routes, auth_routes, protected_routes, worker_routes
+from fastapi.responses import PlainTextResponse
+from database import engine
+from core.static import CachedStaticFiles
+from routes import pizza_routes, auth_routes, protected_routes, worker_routes, events_routes
+from core.search import enable_search_index
+from core.images import shutdown_image_pool
+from core.passwords import shutdown_password_pool, password_pool_metrics
+from core.cache import cache_metrics
+from core.events import hub, event_metrics
+from core.metrics import MetricsMiddleware, registry, CONTENT_TYPE
+from core.query_budget import QueryBudgetMiddleware
+from core.rate_limit import RateLimitMiddleware
+from core.uploads import UploadLimitMiddleware
+from core.ledger import snapshot_loop
+from core.jobs import start_workers
+from core.config import LEDGER_SNAPSHOT_INTERVAL, AUTO_MIGRATE, JOB_WORKERS
+from migrations.runner import upgrade, ensure_current
 
 
 
-Base.metadata.create_all(bind=engine) 
+# Схема меняется только миграциями (python -m migrations), воркер лишь проверяет версию
+if AUTO_MIGRATE:
+    upgrade(engine)
+else:
+    ensure_current(engine)
+enable_search_index(engine)
 
-app = FastAPI() 
-app.mount("/pizza_images", StaticFiles(directory="pizza_images"), name="pizza_images")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    snapshot_task = None
+    if LEDGER_SNAPSHOT_INTERVAL > 0:
+        snapshot_task = asyncio.create_task(snapshot_loop(LEDGER_SNAPSHOT_INTERVAL))
+    job_tasks = start_workers(JOB_WORKERS)
+    yield
+    if snapshot_task:
+        snapshot_task.cancel()
+    # Прерванные задачи вернутся в очередь, когда истечёт их аренда
+    for task in job_tasks:
+        task.cancel()
+    hub.close()
+    shutdown_image_pool()
+    shutdown_password_pool()
 
 
+app = FastAPI(lifespan=lifespan) 
+ROUTERS = [
+    pizza_routes.router,
+    auth_routes.router,
+    protected_routes.router,
+    worker_routes.router,
+    events_routes.router,
+]
+app.mount("/pizza_images", CachedStaticFiles(directory="pizza_images"), name="pizza_images")
+
+
+app.add_middleware(UploadLimitMiddleware)
+# Внутри CORS: ответы 413 и 429 тоже получает CORS-заголовки и читается браузером
+app.add_middleware(RateLimitMiddleware, routers=ROUTERS)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=["http://localhost:3000"],  
@@ -20,13 +69,22 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-app.include_router(pizza_routes.router) 
-app.include_router(auth_routes.router)
-app.include_router(protected_routes.router) 
-app.include_router(worker_routes.router)
-app.mount("/user_images", StaticFiles(directory="user_images"), name="user_images")
+app.add_middleware(QueryBudgetMiddleware)
+app.add_middleware(MetricsMiddleware)
+
+registry.register_collector(cache_metrics)
+registry.register_collector(password_pool_metrics)
+registry.register_collector(event_metrics)
+
+for router in ROUTERS:
+    app.include_router(router)
+app.mount("/user_images", CachedStaticFiles(directory="user_images"), name="user_images")
+
 
 
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type=CONTENT_TYPE)
 
 @app.get("/test")
 def test():
@@ -0,0 +1,33 @@
+"""
+Применение миграций схемы - отдельный шаг деплоя, до запуска воркеров:
+
+    cd server
+    python -m migrations            # применить недостающие
+    python -m migrations --status   # показать, что не применено
+"""
+import argparse
+
+from database import engine
+from migrations.runner import upgrade, pending
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Миграции базы данных")
+    parser.add_argument("--status", action="store_true", help="только показать неприменённые миграции")
+    args = parser.parse_args()
+
+    url = engine.url.render_as_string(hide_password=True)
+    if args.status:
+        missing = pending(engine)
+        if not missing:
+            print(f"{url}: схема актуальна")
+        for version, name in missing:
+            print(f"не применена: {version:04d}_{name}")
+        return
+
+    applied = upgrade(engine)
+    print(f"{url}: применено миграций: {len(applied)}")
+
+
+if __name__ == "__main__":
+    main()
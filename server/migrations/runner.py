@@ -0,0 +1,97 @@
+import datetime
+import importlib
+import os
+import pkgutil
+import re
+
+from sqlalchemy import Column, Integer, String, DateTime, MetaData, Table, inspect, select, text
+
+from database import engine as default_engine
+
+
+VERSIONS_DIR = os.path.join(os.path.dirname(__file__), "versions")
+_VERSION_NAME = re.compile(r"^(\d{4})_(\w+)$")
+
+schema_migrations = Table(
+    "schema_migrations",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("name", String(100), nullable=False),
+    Column("applied_at", DateTime, nullable=False),
+)
+
+
+class SchemaOutdated(RuntimeError):
+    """В базе применены не все миграции"""
+
+
+def discover() -> list:
+    """[(версия, имя, модуль)] по возрастанию версии"""
+    found = []
+    for module in pkgutil.iter_modules([VERSIONS_DIR]):
+        match = _VERSION_NAME.match(module.name)
+        if not match:
+            continue
+        found.append((int(match.group(1)), match.group(2), f"migrations.versions.{module.name}"))
+    found.sort()
+
+    versions = [version for version, _, _ in found]
+    if len(versions) != len(set(versions)):
+        raise RuntimeError("Номера миграций повторяются")
+    return found
+
+
+def applied_versions(conn) -> set:
+    schema_migrations.create(conn, checkfirst=True)
+    return set(conn.execute(select(schema_migrations.c.version)).scalars())
+
+
+def pending(engine=default_engine) -> list:
+    with engine.begin() as conn:
+        applied = applied_versions(conn)
+    return [(version, name) for version, name, _ in discover() if version not in applied]
+
+
+def upgrade(engine=default_engine, verbose: bool = True) -> list:
+    """
+    Применить недостающие миграции по порядку. Каждая идёт в своей транзакции
+    вместе с записью в schema_migrations, поэтому повторный запуск безопасен
+    """
+    applied = []
+    for version, name, module_name in discover():
+        with engine.begin() as conn:
+            if version in applied_versions(conn):
+                continue
+            if verbose:
+                print(f"→ {version:04d}_{name}")
+            importlib.import_module(module_name).upgrade(conn)
+            conn.execute(schema_migrations.insert().values(
+                version=version, name=name, applied_at=datetime.datetime.utcnow()
+            ))
+        applied.append((version, name))
+    return applied
+
+
+def ensure_current(engine=default_engine):
+    """Проверка при старте приложения: сама схема не меняется"""
+    missing = pending(engine)
+    if missing:
+        names = ", ".join(f"{version:04d}_{name}" for version, name in missing)
+        raise SchemaOutdated(f"Не применены миграции: {names}. Запустите: python -m migrations")
+
+
+# Помощники для миграций
+
+def column_exists(conn, table: str, column: str) -> bool:
+    return any(item["name"] == column for item in inspect(conn).get_columns(table))
+
+
+def index_exists(conn, table: str, name: str) -> bool:
+    return any(item["name"] == name for item in inspect(conn).get_indexes(table))
+
+
+def create_index(conn, name: str, table: str, columns: list, unique: bool = False):
+    if index_exists(conn, table, name):
+        return
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    conn.execute(text(f"CREATE {kind} {name} ON {table} ({', '.join(columns)})"))
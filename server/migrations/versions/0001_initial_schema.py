@@ -0,0 +1,131 @@
+"""
+Базовая схема на момент появления миграций, записана явно и от моделей не зависит:
+новые таблицы и колонки добавляются только своими миграциями.
+В базе, созданной до миграций, создаются лишь недостающие таблицы, поэтому
+следующие миграции проверяют, нет ли уже колонки или индекса, прежде чем их добавить
+"""
+from sqlalchemy import (
+    MetaData, Table, Column, Index, UniqueConstraint, ForeignKey,
+    Integer, BigInteger, String, Text, Float, Date, DateTime, func,
+)
+
+
+metadata = MetaData()
+
+Table(
+    "users", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("username", String(100), unique=True, index=True, nullable=False),
+    Column("email", String(50), unique=True, index=True),
+    Column("password_hash", String(255), nullable=False),
+)
+
+Table(
+    "work", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("name", String(100)),
+    Column("user_id", Integer, ForeignKey("users.id"), unique=True),
+    Column("surname", String(40)),
+    Column("email", String(50), unique=True, index=True),
+    Column("description", Text),
+    Column("number", String(20)),
+    Column("country", String(50)),
+    Column("city", String(30)),
+    Column("data", Date, server_default=func.current_date()),
+    Column("image_path", String(255)),
+)
+
+Table(
+    "services", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("freelancer_name", String(100), nullable=False),
+    Column("service_title", String(100), nullable=False),
+    Column("description", Text),
+    Column("price", Float, nullable=False),
+    Column("image_path", String(255)),
+    Column("duration", Integer),
+    Column("skills", String(255)),
+    Column("freelancer_id", Integer, ForeignKey("users.id"), index=True),
+    Column("status", String(50), nullable=False, index=True),
+    Column("responses", Text),
+    Column("responses_count", Integer, server_default="0", nullable=False),
+    Column("category", String(50), index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False, index=True),
+)
+
+Table(
+    "service_responses", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("service_id", Integer, ForeignKey("services.id"), nullable=False),
+    Column("responder", String(100), nullable=False),
+    Column("created_at", DateTime),
+    UniqueConstraint("service_id", "responder", name="uq_service_responses_service_responder"),
+)
+
+Table(
+    "reviews", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("service_id", Integer, ForeignKey("services.id"), nullable=False),
+    Column("reviewer_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("worker_id", Integer, ForeignKey("users.id"), nullable=False, index=True),
+    Column("rating", Float, nullable=False),
+    Column("created_at", DateTime),
+    Index("uq_reviews_service_reviewer", "service_id", "reviewer_id", unique=True),
+)
+
+Table(
+    "worker_ratings", metadata,
+    Column("worker_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("rating_sum", Float, nullable=False),
+    Column("rating_count", Integer, nullable=False),
+)
+
+Table(
+    "transactions", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("amount", Float, nullable=False),
+    Column("status", String(50)),
+    Column("created_at", DateTime),
+    Index("ix_transactions_user_created", "user_id", "created_at"),
+)
+
+Table(
+    "balances", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), unique=True, nullable=False),
+    Column("amount", Float),
+)
+
+Table(
+    "earnings", metadata,
+    Column("id", Integer, primary_key=True, index=True),
+    Column("user_id", Integer, ForeignKey("users.id"), unique=True, nullable=False),
+    Column("total_earned", Float),
+)
+
+Table(
+    "wallets", metadata,
+    Column("user_id", Integer, ForeignKey("users.id"), primary_key=True),
+    Column("balance_minor", BigInteger, nullable=False),
+    Column("earned_minor", BigInteger, nullable=False),
+    Column("snapshot_entry_id", Integer, nullable=False),
+    Column("snapshot_balance_minor", BigInteger, nullable=False),
+    Column("snapshot_at", DateTime),
+)
+
+Table(
+    "ledger_entries", metadata,
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, ForeignKey("users.id"), nullable=False),
+    Column("kind", String(30), nullable=False),
+    Column("amount_minor", BigInteger, nullable=False),
+    Column("service_id", Integer, ForeignKey("services.id")),
+    Column("transaction_id", Integer, ForeignKey("transactions.id")),
+    Column("created_at", DateTime),
+    Index("ix_ledger_entries_user_id_id", "user_id", "id"),
+)
+
+
+def upgrade(conn):
+    metadata.create_all(bind=conn, checkfirst=True)
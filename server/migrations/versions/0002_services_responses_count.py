@@ -0,0 +1,30 @@
+"""Счётчик откликов в services и перенос откликов из старого текстового поля"""
+import datetime
+
+from sqlalchemy import text
+
+from migrations.runner import column_exists
+
+
+def upgrade(conn):
+    if not column_exists(conn, "services", "responses_count"):
+        conn.execute(text("ALTER TABLE services ADD COLUMN responses_count INTEGER NOT NULL DEFAULT 0"))
+
+    if conn.execute(text("SELECT 1 FROM service_responses LIMIT 1")).first() is not None:
+        return
+
+    legacy = conn.execute(text(
+        "SELECT id, responses FROM services WHERE responses IS NOT NULL AND responses != ''"
+    )).all()
+    now = datetime.datetime.utcnow()
+    for service_id, responses in legacy:
+        names = list(dict.fromkeys(name.strip() for name in responses.split(",") if name.strip()))
+        if names:
+            conn.execute(
+                text("INSERT INTO service_responses (service_id, responder, created_at) VALUES (:service_id, :responder, :created_at)"),
+                [{"service_id": service_id, "responder": name, "created_at": now} for name in names]
+            )
+        conn.execute(
+            text("UPDATE services SET responses_count = :count WHERE id = :service_id"),
+            {"count": len(names), "service_id": service_id}
+        )
@@ -0,0 +1,54 @@
+"""
+Полнотекстовый индекс по заказам (SQLite FTS5) и триггеры синхронизации.
+Если индекс создаётся впервые, он заполняется из уже существующих заказов
+"""
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+
+
+SCHEMA = [
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS services_fts USING fts5(
+        service_title, description, skills,
+        content='services', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS services_fts_ai AFTER INSERT ON services BEGIN
+        INSERT INTO services_fts(rowid, service_title, description, skills)
+        VALUES (new.id, new.service_title, new.description, new.skills);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS services_fts_ad AFTER DELETE ON services BEGIN
+        INSERT INTO services_fts(services_fts, rowid, service_title, description, skills)
+        VALUES ('delete', old.id, old.service_title, old.description, old.skills);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS services_fts_au AFTER UPDATE OF service_title, description, skills ON services BEGIN
+        INSERT INTO services_fts(services_fts, rowid, service_title, description, skills)
+        VALUES ('delete', old.id, old.service_title, old.description, old.skills);
+        INSERT INTO services_fts(rowid, service_title, description, skills)
+        VALUES (new.id, new.service_title, new.description, new.skills);
+    END
+    """,
+]
+
+
+def upgrade(conn):
+    if conn.dialect.name != "sqlite":
+        return
+
+    existed = conn.execute(
+        text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'services_fts'")
+    ).first() is not None
+    try:
+        with conn.begin_nested():
+            for statement in SCHEMA:
+                conn.execute(text(statement))
+            if not existed:
+                conn.execute(text("INSERT INTO services_fts(services_fts) VALUES ('rebuild')"))
+    except OperationalError as e:
+        print(f"⚠️ FTS5 недоступен, поиск работает через LIKE: {str(e)}")
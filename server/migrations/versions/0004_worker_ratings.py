@@ -0,0 +1,11 @@
+"""Агрегаты рейтингов исполнителей по уже существующим отзывам"""
+from sqlalchemy import text
+
+
+def upgrade(conn):
+    if conn.execute(text("SELECT 1 FROM worker_ratings LIMIT 1")).first() is not None:
+        return
+    conn.execute(text("""
+        INSERT INTO worker_ratings (worker_id, rating_sum, rating_count)
+        SELECT worker_id, SUM(rating), COUNT(id) FROM reviews GROUP BY worker_id
+    """))
@@ -0,0 +1,6 @@
+"""Индекс для истории транзакций пользователя"""
+from migrations.runner import create_index
+
+
+def upgrade(conn):
+    create_index(conn, "ix_transactions_user_created", "transactions", ["user_id", "created_at"])
@@ -0,0 +1,50 @@
+"""Перенос балансов и дохода из Float-таблиц в кошельки и журнал"""
+import datetime
+from decimal import Decimal, ROUND_HALF_UP
+
+from sqlalchemy import text
+
+from migrations.runner import create_index
+
+
+def to_minor(amount) -> int:
+    return int((Decimal(str(amount or 0)) * 100).quantize(Decimal("1"), rounding=ROUND_HALF_UP))
+
+
+def upgrade(conn):
+    create_index(conn, "ix_ledger_entries_user_id_id", "ledger_entries", ["user_id", "id"])
+
+    if conn.execute(text("SELECT 1 FROM wallets LIMIT 1")).first() is not None:
+        return
+
+    wallets = {}
+    for user_id, amount in conn.execute(text("SELECT user_id, amount FROM balances")):
+        wallets.setdefault(user_id, [0, 0])[0] = to_minor(amount)
+    for user_id, total_earned in conn.execute(text("SELECT user_id, total_earned FROM earnings")):
+        wallets.setdefault(user_id, [0, 0])[1] = to_minor(total_earned)
+    if not wallets:
+        return
+
+    conn.execute(
+        text("""
+            INSERT INTO wallets (user_id, balance_minor, earned_minor, snapshot_entry_id, snapshot_balance_minor)
+            VALUES (:user_id, :balance_minor, :earned_minor, 0, 0)
+        """),
+        [
+            {"user_id": user_id, "balance_minor": balance_minor, "earned_minor": earned_minor}
+            for user_id, (balance_minor, earned_minor) in wallets.items()
+        ]
+    )
+    opening = [
+        {"user_id": user_id, "amount_minor": balance_minor, "created_at": datetime.datetime.utcnow()}
+        for user_id, (balance_minor, _) in wallets.items()
+        if balance_minor
+    ]
+    if opening:
+        conn.execute(
+            text("""
+                INSERT INTO ledger_entries (user_id, kind, amount_minor, created_at)
+                VALUES (:user_id, 'opening_balance', :amount_minor, :created_at)
+            """),
+            opening
+        )
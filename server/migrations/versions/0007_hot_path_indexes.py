@@ -0,0 +1,30 @@
+"""
+Индексы под фильтры заказов и отзывов и одна оценка от рецензента на заказ.
+Дубли отзывов, если они уже есть, удаляются (остаётся первый), рейтинги пересчитываются
+"""
+from sqlalchemy import text
+
+from migrations.runner import create_index
+
+
+def upgrade(conn):
+    create_index(conn, "ix_services_user_id", "services", ["user_id"])
+    create_index(conn, "ix_services_freelancer_id", "services", ["freelancer_id"])
+    create_index(conn, "ix_services_status", "services", ["status"])
+    create_index(conn, "ix_services_category", "services", ["category"])
+    create_index(conn, "ix_reviews_worker_id", "reviews", ["worker_id"])
+
+    removed = conn.execute(text("""
+        DELETE FROM reviews WHERE id NOT IN (
+            SELECT MIN(id) FROM reviews GROUP BY service_id, reviewer_id
+        )
+    """)).rowcount
+    create_index(conn, "uq_reviews_service_reviewer", "reviews", ["service_id", "reviewer_id"], unique=True)
+
+    if removed:
+        print(f"  удалено повторных отзывов: {removed}")
+        conn.execute(text("DELETE FROM worker_ratings"))
+        conn.execute(text("""
+            INSERT INTO worker_ratings (worker_id, rating_sum, rating_count)
+            SELECT worker_id, SUM(rating), COUNT(id) FROM reviews GROUP BY worker_id
+        """))
@@ -0,0 +1,14 @@
+"""Версии ресурсов и коллекций для ETag / 304"""
+from sqlalchemy import MetaData, Table, Column, Integer, String, DateTime
+
+
+resource_versions = Table(
+    "resource_versions", MetaData(),
+    Column("key", String(100), primary_key=True),
+    Column("version", Integer, nullable=False),
+    Column("updated_at", DateTime, nullable=False),
+)
+
+
+def upgrade(conn):
+    resource_versions.create(bind=conn, checkfirst=True)
@@ -0,0 +1,23 @@
+"""Очередь фоновых задач"""
+from sqlalchemy import MetaData, Table, Column, Index, Integer, String, Text, DateTime
+
+
+jobs = Table(
+    "jobs", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("kind", String(50), nullable=False),
+    Column("payload", Text, nullable=False),
+    Column("status", String(20), nullable=False),
+    Column("attempts", Integer, nullable=False),
+    Column("max_attempts", Integer, nullable=False),
+    Column("run_at", DateTime, nullable=False),
+    Column("lease", String(32)),
+    Column("locked_until", DateTime),
+    Column("last_error", Text),
+    Column("created_at", DateTime),
+    Index("ix_jobs_status_run_at", "status", "run_at"),
+)
+
+
+def upgrade(conn):
+    jobs.create(bind=conn, checkfirst=True)
@@ -0,0 +1,15 @@
+"""Корзины токенов для общего бэкенда ограничения частоты запросов"""
+from sqlalchemy import MetaData, Table, Column, String, Float
+
+
+rate_limit_buckets = Table(
+    "rate_limit_buckets", MetaData(),
+    Column("key", String(200), primary_key=True),
+    Column("tokens", Float, nullable=False),
+    Column("updated_at", Float, nullable=False),
+    Column("full_at", Float, nullable=False, index=True),
+)
+
+
+def upgrade(conn):
+    rate_limit_buckets.create(bind=conn, checkfirst=True)
@@ -0,0 +1,39 @@
+"""
+Журнал без внешних ключей: при удалении пользователя, заказа или транзакции
+записи остаются, а базы с проверкой ключей не отказывают в удалении
+"""
+from sqlalchemy import MetaData, Table, Column, Integer, BigInteger, String, DateTime, inspect, text
+
+from migrations.runner import create_index
+
+
+ledger_entries = Table(
+    "ledger_entries_rebuild", MetaData(),
+    Column("id", Integer, primary_key=True),
+    Column("user_id", Integer, nullable=False),
+    Column("kind", String(30), nullable=False),
+    Column("amount_minor", BigInteger, nullable=False),
+    Column("service_id", Integer),
+    Column("transaction_id", Integer),
+    Column("created_at", DateTime),
+)
+
+COLUMNS = "id, user_id, kind, amount_minor, service_id, transaction_id, created_at"
+
+
+def upgrade(conn):
+    foreign_keys = inspect(conn).get_foreign_keys("ledger_entries")
+    if not foreign_keys:
+        return
+
+    if conn.dialect.name != "sqlite":
+        for foreign_key in foreign_keys:
+            conn.execute(text(f"ALTER TABLE ledger_entries DROP CONSTRAINT {foreign_key['name']}"))
+        return
+
+    # SQLite не умеет удалять ограничения: таблица пересобирается с теми же id
+    ledger_entries.create(bind=conn)
+    conn.execute(text(f"INSERT INTO ledger_entries_rebuild ({COLUMNS}) SELECT {COLUMNS} FROM ledger_entries"))
+    conn.execute(text("DROP TABLE ledger_entries"))
+    conn.execute(text("ALTER TABLE ledger_entries_rebuild RENAME TO ledger_entries"))
+    create_index(conn, "ix_ledger_entries_user_id_id", "ledger_entries", ["user_id", "id"])
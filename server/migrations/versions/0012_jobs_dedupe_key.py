@@ -0,0 +1,10 @@
+"""Ключ задачи: повторная загрузка того же изображения не ставит вторую задачу"""
+from sqlalchemy import text
+
+from migrations.runner import column_exists, create_index
+
+
+def upgrade(conn):
+    if not column_exists(conn, "jobs", "dedupe_key"):
+        conn.execute(text("ALTER TABLE jobs ADD COLUMN dedupe_key VARCHAR(255)"))
+    create_index(conn, "ix_jobs_kind_dedupe_key", "jobs", ["kind", "dedupe_key"])
@@ -3,6 +3,7 @@ from sqlalchemy.orm import relationship
 from database import Base
 
 class Balance(Base):
+    # Устаревшая таблица: баланс хранится в wallets (в копейках), см. core/ledger.py
     __tablename__ = "balances"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -3,6 +3,7 @@ from sqlalchemy.orm import relationship
 from database import Base
 
 class Earnings(Base):
+    # Устаревшая таблица: доход хранится в wallets (в копейках), см. core/ledger.py
     __tablename__ = "earnings"
 
     id = Column(Integer, primary_key=True, index=True)
@@ -0,0 +1,29 @@
+from sqlalchemy import Column, Integer, String, Text, DateTime, Index
+from database import Base
+from datetime import datetime
+
+class Job(Base):
+    """
+    Фоновая задача. Воркер берёт её условным UPDATE и держит аренду (lease) до locked_until:
+    если воркер упал, после истечения аренды задачу заберёт другой.
+    Выполненные задачи удаляются, упавшие после всех попыток остаются со статусом failed
+    """
+    __tablename__ = "jobs"
+    __table_args__ = (
+        Index("ix_jobs_status_run_at", "status", "run_at"),
+        Index("ix_jobs_kind_dedupe_key", "kind", "dedupe_key"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    kind = Column(String(50), nullable=False)
+    payload = Column(Text, nullable=False, default="{}")
+    # Ключ для поиска ещё не взятой задачи того же вида, чтобы не ставить её повторно
+    dedupe_key = Column(String(255))
+    status = Column(String(20), nullable=False, default="queued")
+    attempts = Column(Integer, nullable=False, default=0)
+    max_attempts = Column(Integer, nullable=False)
+    run_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+    lease = Column(String(32))
+    locked_until = Column(DateTime)
+    last_error = Column(Text)
+    created_at = Column(DateTime, default=datetime.utcnow)
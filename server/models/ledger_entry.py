@@ -0,0 +1,21 @@
+from sqlalchemy import Column, Integer, BigInteger, String, DateTime, Index
+from database import Base
+import datetime
+
+class LedgerEntry(Base):
+    """
+    Журнал движения денег: только вставки, сумма со знаком в копейках (центах).
+    Внешних ключей нет: записи переживают удаление пользователя, заказа и транзакции
+    """
+    __tablename__ = "ledger_entries"
+    __table_args__ = (
+        Index("ix_ledger_entries_user_id_id", "user_id", "id"),
+    )
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, nullable=False)
+    kind = Column(String(30), nullable=False)
+    amount_minor = Column(BigInteger, nullable=False)
+    service_id = Column(Integer)
+    transaction_id = Column(Integer)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
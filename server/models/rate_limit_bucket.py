@@ -0,0 +1,15 @@
+from sqlalchemy import Column, String, Float
+from database import Base
+
+class RateLimitBucket(Base):
+    """
+    Корзина токенов общего бэкенда ограничения частоты (RATE_LIMIT_BACKEND=database).
+    Время - unix-секунды, одинаковые для всех процессов
+    """
+    __tablename__ = "rate_limit_buckets"
+
+    key = Column(String(200), primary_key=True)
+    tokens = Column(Float, nullable=False)
+    updated_at = Column(Float, nullable=False)
+    # Когда корзина снова станет полной: после этого строку можно удалить без потери состояния
+    full_at = Column(Float, nullable=False, index=True)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from database import Base
+
+class ResourceVersion(Base):
+    """
+    Версия ресурса ("service:<id>", "user:<id>") или коллекции ("services", "categories", "users").
+    Растёт в той же транзакции, что и изменение, по ней строятся ETag
+    """
+    __tablename__ = "resource_versions"
+
+    key = Column(String(100), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, nullable=False)
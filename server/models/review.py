@@ -1,16 +1,20 @@
 
-from sqlalchemy import Column, Integer, ForeignKey, Float, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, Float, DateTime, Index
 from sqlalchemy.orm import relationship
 from database import Base
 import datetime
 
 class Review(Base):
     __tablename__ = "reviews"
+    __table_args__ = (
+        # Одна оценка от рецензента на заказ; индекс же обслуживает проверку has-rated
+        Index("uq_reviews_service_reviewer", "service_id", "reviewer_id", unique=True),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     service_id = Column(Integer, ForeignKey("services.id"), nullable=False)
     reviewer_id = Column(Integer, ForeignKey("users.id"), nullable=False) 
-    worker_id = Column(Integer, ForeignKey("users.id"), nullable=False)   
+    worker_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     rating = Column(Float, nullable=False)  
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
@@ -2,6 +2,7 @@
 from sqlalchemy import Column, Integer, String, Float, Text, ForeignKey
 from database import Base
 from sqlalchemy.orm import relationship
+from models.service_response import ServiceResponse
 
 class Service(Base):
     __tablename__ = "services"
@@ -13,15 +14,17 @@ class Service(Base):
     image_path = Column(String(255))
     duration = Column(Integer)
     skills = Column(String(255))
-    freelancer_id = Column(Integer, ForeignKey("users.id"))
+    freelancer_id = Column(Integer, ForeignKey("users.id"), index=True)
     reviews = Column(Integer, default=0)
-    status = Column(String(50), default="Открытый", nullable=False)
-    responses = Column(Text)
-    category = Column(String(50))
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    status = Column(String(50), default="Открытый", nullable=False, index=True)
+    responses = Column(Text)  # устаревшее поле, отклики хранятся в service_responses
+    responses_count = Column(Integer, default=0, server_default="0", nullable=False)
+    category = Column(String(50), index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     user = relationship("User", back_populates="services", foreign_keys=[user_id])
     freelancer = relationship("User", foreign_keys=[freelancer_id])
     reviews = relationship("Review", back_populates="service")
+    response_entries = relationship("ServiceResponse", back_populates="service", cascade="all, delete-orphan")
 
     
     
\ No newline at end of file
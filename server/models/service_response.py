@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, UniqueConstraint
+from sqlalchemy.orm import relationship
+from database import Base
+import datetime
+
+class ServiceResponse(Base):
+    __tablename__ = "service_responses"
+    __table_args__ = (
+        UniqueConstraint("service_id", "responder", name="uq_service_responses_service_responder"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    service_id = Column(Integer, ForeignKey("services.id"), nullable=False)
+    responder = Column(String(100), nullable=False)
+    created_at = Column(DateTime, default=datetime.datetime.utcnow)
+
+    service = relationship("Service", back_populates="response_entries")
@@ -1,10 +1,14 @@
-from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, DateTime, ForeignKey, Index
 from sqlalchemy.orm import relationship
 from database import Base
 from datetime import datetime
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    __table_args__ = (
+        # История пользователя читается по user_id в порядке created_at
+        Index("ix_transactions_user_created", "user_id", "created_at"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
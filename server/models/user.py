@@ -2,6 +2,8 @@ from sqlalchemy import create_engine, Column, Integer, String, Float, Text
 from sqlalchemy.orm import sessionmaker, declarative_base, relationship     
 from database import Base
 from models.review import Review
+from models.balance import Balance
+from models.earnings import Earnings
 
 
 class User(Base):
@@ -15,6 +17,7 @@ class User(Base):
     balance = relationship("Balance", back_populates="user", uselist=False, cascade="all, delete-orphan")
     earnings = relationship("Earnings", back_populates="user", uselist=False, cascade="all, delete-orphan")
     transactions = relationship("Transaction", back_populates="user", cascade="all, delete-orphan")
+    wallet = relationship("Wallet", uselist=False, cascade="all, delete-orphan")
     reviews_as_worker = relationship("Review", foreign_keys=[Review.worker_id], back_populates="worker")
     reviews_as_reviewer = relationship("Review", foreign_keys=[Review.reviewer_id], back_populates="reviewer")  
 
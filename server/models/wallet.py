@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, BigInteger, DateTime, ForeignKey
+from database import Base
+
+class Wallet(Base):
+    """
+    Текущий баланс и доход пользователя в копейках (центах).
+    Меняется только одиночными UPDATE вместе с записью в ledger_entries
+    """
+    __tablename__ = "wallets"
+
+    user_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    balance_minor = Column(BigInteger, nullable=False, default=0)
+    earned_minor = Column(BigInteger, nullable=False, default=0)
+
+    # Последний снимок: баланс по журналу до записи snapshot_entry_id включительно
+    snapshot_entry_id = Column(Integer, nullable=False, default=0)
+    snapshot_balance_minor = Column(BigInteger, nullable=False, default=0)
+    snapshot_at = Column(DateTime)
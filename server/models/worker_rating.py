@@ -0,0 +1,9 @@
+from sqlalchemy import Column, Integer, Float, ForeignKey
+from database import Base
+
+class WorkerRating(Base):
+    __tablename__ = "worker_ratings"
+
+    worker_id = Column(Integer, ForeignKey("users.id"), primary_key=True)
+    rating_sum = Column(Float, nullable=False, default=0.0)
+    rating_count = Column(Integer, nullable=False, default=0)
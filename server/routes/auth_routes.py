@@ -1,29 +1,28 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Body
-from pydantic import BaseModel
+from fastapi import APIRouter, HTTPException, Depends, status, Body, Query, Request, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import or_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import or_, select
 from models.user import User
-from models.review import Review
-from core.security import hash_password, verify_password, create_jwt_token
+from core.security import create_jwt_token, password_needs_rehash, get_async_db
+from core.passwords import hash_password_async, verify_password_async, try_rehash_password
 from database import SessionLocal
 from fastapi.security import OAuth2PasswordBearer
-from core.security import get_current_user
+from core.security import get_current_user, invalidate_user, AuthUser
+from core.users import get_user_cards
+from core.query_budget import query_budget
+from core.rate_limit import rate_limit
+from core.config import RATE_LIMIT_LOGIN, RATE_LIMIT_REGISTER, RATE_LIMIT_CHANGE_PASSWORD
+from core.versions import user_key, user_changed, service_changed, bump_versions, read_versions, not_modified
 from models.worker import Worker
+from models.service import Service
+from schemas.common import MessageOut
+from schemas.users import UserRegister, UserLogin, AuthOut, UsersBatchOut, UserOut, AvatarOut
 
 
 
 router = APIRouter()
 
 
-class UserRegister(BaseModel):
-    username: str
-    email: str
-    password: str
-
-class UserLogin(BaseModel):
-    username: str 
-    password: str
-
 def get_db():
     db = SessionLocal()
     try:
@@ -31,13 +30,14 @@ def get_db():
     finally:
         db.close()
 
-@router.post("/register")
-def register(user: UserRegister, db: Session = Depends(get_db)):
+@router.post("/register", response_model=AuthOut)
+@rate_limit(ip=RATE_LIMIT_REGISTER)
+async def register(user: UserRegister, db: AsyncSession = Depends(get_async_db)):
     """Регистрация + автоматический вход (возвращает токен)"""
     try:
-        existing_user = db.query(User).filter(
+        existing_user = await db.scalar(select(User.id).where(
             or_(User.username == user.username, User.email == user.email)
-        ).first()
+        ))
         if existing_user:
             raise HTTPException(
                 status_code=400,
@@ -45,15 +45,14 @@ def register(user: UserRegister, db: Session = Depends(get_db)):
             )
 
 
-        hashed_password = hash_password(user.password)
+        hashed_password = await hash_password_async(user.password)
         new_user = User(
             username=user.username,
             email=user.email,
             password_hash=hashed_password
         )
         db.add(new_user)
-        db.commit()
-        db.refresh(new_user)
+        await db.commit()
 
         token = create_jwt_token(new_user.id)
 
@@ -67,17 +66,22 @@ def register(user: UserRegister, db: Session = Depends(get_db)):
             "message": "Пользователь успешно зарегистрирован и вошёл в аккаунт"
         }
 
+    except HTTPException:
+        await db.rollback()
+        raise
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Ошибка регистрации: {str(e)}")
 
-@router.post("/login")
-def login(user: UserLogin, db: Session = Depends(get_db)):
+@router.post("/login", response_model=AuthOut)
+@rate_limit(ip=RATE_LIMIT_LOGIN)
+@query_budget(2)
+async def login(user: UserLogin, db: AsyncSession = Depends(get_async_db)):
     """Вход пользователя"""
     try:
-        db_user = db.query(User).filter(
+        db_user = await db.scalar(select(User).where(
             or_(User.username == user.username, User.email == user.username)
-        ).first()
+        ))
         
         if not db_user:
             raise HTTPException(
@@ -86,12 +90,19 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
             )
 
  
-        if not verify_password(user.password, db_user.password_hash):
+        if not await verify_password_async(user.password, db_user.password_hash):
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Неверный логин или пароль"
             )
 
+        # Хеш со старой стоимостью bcrypt обновляем, пока пароль известен
+        if password_needs_rehash(db_user.password_hash):
+            new_hash = await try_rehash_password(user.password)
+            if new_hash:
+                db_user.password_hash = new_hash
+                await db.commit()
+
         token = create_jwt_token(db_user.id)
         
         return {
@@ -103,13 +114,15 @@ def login(user: UserLogin, db: Session = Depends(get_db)):
             }
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Ошибка входа: {str(e)}"
         )
 
-@router.delete("/users/{user_id}")
+@router.delete("/users/{user_id}", response_model=MessageOut)
 def delete_user(
     user_id: int,
     db: Session = Depends(get_db),
@@ -123,8 +136,18 @@ def delete_user(
                 detail="Пользователь не найден"
             )
 
+        # Заказы пользователя удаляются каскадом, у назначенных меняется карточка исполнителя
+        service_ids = db.scalars(
+            select(Service.id).where(or_(Service.user_id == user_id, Service.freelancer_id == user_id))
+        ).all()
+        keys = user_changed(user_id)
+        for service_id in service_ids:
+            keys += service_changed(service_id)
+
         db.delete(db_user)
+        bump_versions(db, keys)
         db.commit()
+        invalidate_user(user_id)
         
         return {"message": "Пользователь успешно удален"}
         
@@ -135,19 +158,20 @@ def delete_user(
             detail=f"Ошибка удаления пользователя: {str(e)}"
         )
 
-@router.post("/change-password")
-def change_password(
+@router.post("/change-password", response_model=MessageOut)
+@rate_limit(user=RATE_LIMIT_CHANGE_PASSWORD, ip=RATE_LIMIT_LOGIN)
+async def change_password(
     current_password: str = Body(..., embed=True),
     new_password: str = Body(..., embed=True),
     confirm_password: str = Body(..., embed=True),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthUser = Depends(get_current_user)
 ):
     """
     Смена пароля пользователя
     """
    
-    user = db.query(User).filter(User.id == current_user.id).first()
+    user = await db.scalar(select(User).where(User.id == current_user.id))
     if not user:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
@@ -155,7 +179,7 @@ def change_password(
         )
 
   
-    if not verify_password(current_password, user.password_hash):
+    if not await verify_password_async(current_password, user.password_hash):
         raise HTTPException(
             status_code=400,
             detail="Неверный текущий пароль"
@@ -169,13 +193,13 @@ def change_password(
         )
 
  
-    user.password_hash = hash_password(new_password)
+    user.password_hash = await hash_password_async(new_password)
 
     try:
-        db.commit()
-        db.refresh(user) 
+        await db.commit()
+        invalidate_user(user.id)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=500,
             detail=f"Ошибка при сохранении пароля: {str(e)}"
@@ -183,52 +207,49 @@ def change_password(
 
     return {"message": "Пароль успешно изменён"}
 
-@router.get("/users/{user_id}")
-def get_user(user_id: int, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.id == user_id).first()
-    if not user:
-        raise HTTPException(status_code=404, detail="Пользователь не найден")
-
-    # Находим анкету фрилансера (Worker)
-    worker = db.query(Worker).filter(Worker.user_id == user.id).first()
+MAX_BATCH_USERS = 100
 
-    return {
-        "id": user.id,
-        "username": user.username,
-        "email": user.email,
-        "image_path": worker.image_path if worker else None
-    }
 
-@router.get("/users/{user_id}/avatar")
-def get_customer_avatar(user_id: int, db: Session = Depends(get_db)):
-    worker = db.query(Worker).filter(Worker.user_id == user_id).first()
-    if not worker:
-        return {"image_path": None}
-    
-    return {"image_path": worker.image_path}
-@router.get("/users/{user_id}/rating")
-def get_user_rating(user_id: int, db: Session = Depends(get_db)):
+@router.get("/users", response_model=UsersBatchOut)
+@query_budget(1)
+def get_users_batch(ids: str = Query(..., description="id пользователей через запятую"), db: Session = Depends(get_db)):
     """
-    Получить средний рейтинг пользователя (исполнителя)
+    Карточки сразу нескольких пользователей: имя, аватар и рейтинг
     """
-    reviews = db.query(Review).filter(Review.worker_id == user_id).all()
-    
-    if not reviews:
-        return {"rating": 0.0, "count": 0}
-
-    total_rating = sum(r.rating for r in reviews)
-    avg_rating = total_rating / len(reviews)
-
-    return {"rating": round(avg_rating, 1), "count": len(reviews)}
-
-@router.get("/users/{user_id}/rating")
-def get_user_rating(user_id: int, db: Session = Depends(get_db)):
-    reviews = db.query(Review).filter(Review.worker_id == user_id).all()
-    
-    if not reviews:
-        return {"rating": 0.0, "count": 0}
+    try:
+        user_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Параметр 'ids' должен содержать числа через запятую")
+
+    if not user_ids:
+        return {"users": []}
+    if len(user_ids) > MAX_BATCH_USERS:
+        raise HTTPException(status_code=400, detail=f"Не больше {MAX_BATCH_USERS} пользователей за запрос")
+
+    cards = get_user_cards(db, user_ids)
+    return {"users": [cards[user_id] for user_id in user_ids if user_id in cards]}
+
+@router.get("/users/{user_id}", response_model=UserOut)
+@query_budget(2)
+def get_user(user_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    keys = [user_key(user_id)]
+    cached = not_modified(request, response, keys, read_versions(db, keys))
+    if cached:
+        return cached
+
+    # Пользователь вместе с аватаром из анкеты фрилансера (Worker)
+    user = (
+        db.query(User.id, User.username, User.email, Worker.image_path)
+        .outerjoin(Worker, Worker.user_id == User.id)
+        .filter(User.id == user_id)
+        .first()
+    )
+    if not user:
+        raise HTTPException(status_code=404, detail="Пользователь не найден")
 
-    total = sum(r.rating for r in reviews)
-    avg = total / len(reviews)
+    return dict(user._mapping)
 
-    return {"rating": round(float(avg), 1), "count": len(reviews)}
\ No newline at end of file
+@router.get("/users/{user_id}/avatar", response_model=AvatarOut)
+def get_customer_avatar(user_id: int, db: Session = Depends(get_db)):
+    image_path = db.query(Worker.image_path).filter(Worker.user_id == user_id).scalar()
+    return {"image_path": image_path}
@@ -0,0 +1,49 @@
+from typing import Optional
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.sse import EventSourceResponse, ServerSentEvent
+from core.security import user_from_token
+from core.events import hub, user_channel, service_channel
+from core.config import EVENTS_MAX_SERVICES
+
+router = APIRouter()
+
+RECONNECT_DELAY_MS = 3000
+
+
+async def event_channels(
+    services: Optional[str] = Query(None, description="id заказов через запятую"),
+    token: Optional[str] = Query(None, description="JWT: EventSource не умеет отправлять заголовки")
+) -> list:
+    """Каналы подписки; ошибки здесь, пока поток ещё не начался"""
+    try:
+        service_ids = list(dict.fromkeys(int(part) for part in (services or "").split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Параметр 'services' должен содержать числа через запятую")
+
+    if len(service_ids) > EVENTS_MAX_SERVICES:
+        raise HTTPException(status_code=400, detail=f"Не больше {EVENTS_MAX_SERVICES} заказов в одной подписке")
+
+    channels = [service_channel(service_id) for service_id in service_ids]
+    if token:
+        # Личный канал: смена статусов своих заказов, отклики, оценки, баланс и статусы выводов
+        user = await user_from_token(token)
+        channels.append(user_channel(user.id))
+
+    if not channels:
+        raise HTTPException(status_code=400, detail="Укажите services или token")
+    return channels
+
+
+@router.get("/events", response_class=EventSourceResponse)
+async def stream_events(channels: list = Depends(event_channels)):
+    """
+    Поток событий (SSE): service_status, service_response, rating, balance, transaction.
+    После resync или обрыва клиент переподключается и перечитывает данные
+    """
+    subscription = hub.subscribe(channels)
+    try:
+        yield ServerSentEvent(event="ready", data={"channels": channels}, retry=RECONNECT_DELAY_MS)
+        async for event in subscription:
+            yield event
+    finally:
+        hub.unsubscribe(subscription)
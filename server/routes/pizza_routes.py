@@ -1,14 +1,46 @@
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Body, Depends
+from typing import Optional, List
+from datetime import datetime
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Body, Depends, Query, Request, Response
 from database import SessionLocal
+from sqlalchemy import func, case, select, or_, and_
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from models.service import Service
 from models.user import User
-from models.balance import Balance
-from models.earnings import Earnings
+from models.wallet import Wallet
 from models.review import Review
 from models.transaction import Transaction
-from core.security import get_current_user
+from models.service_response import ServiceResponse
+from core.security import get_current_user, get_async_db, AuthUser
+from core.users import get_user_cards
+from core.ratings import get_rating, get_ratings, empty_rating, record_rating
+from core.search import search_services
+from core.responses import add_response, remove_response
+from core.cache import categories_cache
+from core.uploads import save_upload
+from core.images import enqueue_variants, image_variants, add_image_variants
+from core.jobs import enqueue, notify
+from core.withdrawals import STATUS_PENDING, JOB_WITHDRAWAL
+from core.pagination import encode_cursor, decode_cursor, DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
+from core.query_budget import query_budget
+from core.rate_limit import rate_limit
+from core.config import RATE_LIMIT_CREATE_SERVICE_USER, RATE_LIMIT_CREATE_SERVICE_IP
+from core.ledger import credit_service_payment, debit_withdrawal, to_minor, from_minor
+from core.versions import (
+    SERVICES, CATEGORIES, USERS, service_key, service_changed, user_changed,
+    bump_versions, read_versions, not_modified, on_bump
+)
+from core.events import hub, user_channel, service_channel, SERVICE_STATUS, SERVICE_RESPONSE, RATING, BALANCE
+from schemas.common import MessageOut, RatingOut
+from schemas.services import (
+    ServiceOut, ServiceListPage, ServiceSearchPage, ServiceCreatedOut, StatusUpdatedOut,
+    ReviewsUpdatedOut, ResponseChangedOut, ServiceResponsesPage, CategoriesOut, CompleteOut,
+    RespondOut, ServiceDetail, CompletedServiceItem, HasRatedOut, RatingsOut
+)
+from schemas.finances import FinancesOut, TransactionsPage, WithdrawOut
 
 router = APIRouter()
 
@@ -19,14 +51,159 @@ def get_db():
     finally:
         db.close()
 
-@router.get("/services")
-def get_services():
-    db: Session = SessionLocal()
-    services = db.query(Service).all()
-    db.close()
-    return services
+SERVICE_LIST_DESCRIPTION_LENGTH = 300
+CATEGORIES_CACHE_KEY = "categories"
+# Запись сбрасывается после коммита, изменившего заказы; в других воркерах живёт до TTL
+on_bump(CATEGORIES, lambda: categories_cache.invalidate(CATEGORIES_CACHE_KEY))
+SERVICE_EMBEDS = {"owner", "freelancer"}
+SERVICE_COLUMNS = (
+    Service.id, Service.freelancer_name, Service.service_title, Service.description,
+    Service.price, Service.image_path, Service.duration, Service.skills, Service.freelancer_id,
+    Service.status, Service.responses_count, Service.category, Service.user_id
+)
+
+
+def publish_status(service_id: int, status: str, owner_id: int, freelancer_id: Optional[int]):
+    """Смена статуса - подписчикам заказа, заказчику и исполнителю"""
+    channels = [service_channel(service_id), user_channel(owner_id)]
+    if freelancer_id is not None:
+        channels.append(user_channel(freelancer_id))
+    hub.publish(SERVICE_STATUS, {
+        "service_id": service_id,
+        "status": status,
+        "freelancer_id": freelancer_id
+    }, channels)
+
+
+def publish_balance(user_id: int, balance_minor: int):
+    hub.publish(BALANCE, {"balance": from_minor(balance_minor)}, [user_channel(user_id)])
+
+
+def parse_embed(embed: Optional[str]) -> set:
+    if not embed:
+        return set()
+    requested = {part.strip() for part in embed.split(",") if part.strip()}
+    unknown = requested - SERVICE_EMBEDS
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Неизвестные поля embed: {', '.join(sorted(unknown))}")
+    return requested
+
+
+@router.get("/services", response_model=ServiceListPage)
+@query_budget(3)
+async def get_services(
+    request: Request,
+    response: Response,
+    category: Optional[str] = None,
+    status: Optional[str] = None,
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    min_duration: Optional[int] = Query(None, ge=0),
+    max_duration: Optional[int] = Query(None, ge=0),
+    user_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    embed: Optional[str] = Query(None, description="owner,freelancer"),
+    db: AsyncSession = Depends(get_async_db)
+):
+    """
+    Список заказов с фильтрами и keyset-пагинацией (новые сверху)
+    """
+    embeds = parse_embed(embed)
+    keys = [SERVICES, USERS] if embeds else [SERVICES]
+    cached = not_modified(request, response, keys, await db.run_sync(read_versions, keys))
+    if cached:
+        return cached
+
+    query = select(
+        Service.id,
+        Service.freelancer_name,
+        Service.service_title,
+        func.substr(Service.description, 1, SERVICE_LIST_DESCRIPTION_LENGTH).label("description"),
+        Service.price,
+        Service.image_path,
+        Service.duration,
+        Service.skills,
+        Service.freelancer_id,
+        Service.status,
+        Service.category,
+        Service.user_id,
+        Service.responses_count
+    )
+
+    if category:
+        query = query.where(Service.category == category)
+    if status:
+        query = query.where(Service.status == status)
+    if min_price is not None:
+        query = query.where(Service.price >= min_price)
+    if max_price is not None:
+        query = query.where(Service.price <= max_price)
+    if min_duration is not None:
+        query = query.where(Service.duration >= min_duration)
+    if max_duration is not None:
+        query = query.where(Service.duration <= max_duration)
+    if user_id is not None:
+        query = query.where(Service.user_id == user_id)
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="Неверный курсор")
+        query = query.where(Service.id < last_id)
+
+    rows = (await db.execute(query.order_by(Service.id.desc()).limit(limit + 1))).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id)
+
+    items = [dict(row._mapping) for row in rows]
+    # Готовность вариантов ещё не закэширована - проверка файлов не должна держать цикл событий
+    await run_in_threadpool(add_image_variants, items)
+
+    if embeds:
+        user_ids = set()
+        if "owner" in embeds:
+            user_ids.update(item["user_id"] for item in items)
+        if "freelancer" in embeds:
+            user_ids.update(item["freelancer_id"] for item in items)
+        cards = await db.run_sync(get_user_cards, user_ids)
+
+        for item in items:
+            if "owner" in embeds:
+                item["owner"] = cards.get(item["user_id"])
+            if "freelancer" in embeds:
+                item["freelancer"] = cards.get(item["freelancer_id"])
 
-@router.post("/services")
+    return {
+        "items": items,
+        "next_cursor": next_cursor
+    }
+
+@router.get("/services/search", response_model=ServiceSearchPage)
+@query_budget(2)
+def search_services_route(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    db: Session = Depends(get_db)
+):
+    """
+    Полнотекстовый поиск по заказам с ранжированием bm25 и подсветкой
+    """
+    rows = search_services(db, q, limit + 1, offset)
+    add_image_variants(rows)
+
+    next_offset = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_offset = offset + limit
+
+    return {"items": rows, "next_offset": next_offset}
+
+@router.post("/services", response_model=ServiceCreatedOut)
+@rate_limit(user=RATE_LIMIT_CREATE_SERVICE_USER, ip=RATE_LIMIT_CREATE_SERVICE_IP)
 async def add_service(
     freelancer_name: str = Form(...),
     service_title: str = Form(...),
@@ -36,15 +213,13 @@ async def add_service(
     skills: str = Form(...),
     image: UploadFile = File(...),
     category: str = Form(...),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthUser = Depends(get_current_user)
 ):
     
     
-    image_path = f"pizza_images/{image.filename}"
-    with open(image_path, "wb") as f:
-        f.write(await image.read())
+    image_path = await save_upload(image, "pizza_images")
 
-    db: Session = SessionLocal()
     service = Service(
         freelancer_name=freelancer_name,
         service_title=service_title,
@@ -58,13 +233,20 @@ async def add_service(
 
     )
     db.add(service)
-    db.commit()
-    db.refresh(service)
-    db.close()
+    await db.flush()
+    await db.run_sync(enqueue_variants, image_path, service_changed(service.id))
+    await db.run_sync(bump_versions, service_changed(service.id))
+    await db.commit()
+    await db.refresh(service)
+    notify()
 
-    return {"message": "Услуга добавлена!", "service": service}
+    return {
+        "message": "Услуга добавлена!",
+        "service": ServiceOut.model_validate(service),
+        "image_variants": await run_in_threadpool(image_variants, image_path)
+    }
 
-@router.patch("/services/{service_id}/status")
+@router.patch("/services/{service_id}/status", response_model=StatusUpdatedOut)
 def update_service_status(service_id: int, status_data: dict = Body(...)):
     db = SessionLocal()
     try:
@@ -78,13 +260,15 @@ def update_service_status(service_id: int, status_data: dict = Body(...)):
             raise HTTPException(status_code=400, detail="Поле 'status' обязательно")
 
         service.status = new_status
+        bump_versions(db, service_changed(service_id))
         db.commit()
         db.refresh(service)
+        publish_status(service.id, service.status, service.user_id, service.freelancer_id)
         return {"message": "Статус обновлён", "status": service.status}
     finally:
         db.close()
 
-@router.patch("/services/{service_id}/reviews")
+@router.patch("/services/{service_id}/reviews", response_model=ReviewsUpdatedOut)
 def update_service_reviews(service_id: int, data: dict = Body(...)):
     db = SessionLocal()
     try:
@@ -104,65 +288,143 @@ def update_service_reviews(service_id: int, data: dict = Body(...)):
     finally:
         db.close()
 
-@router.post("/services/{service_id}/responses")
-def add_service_response(service_id: int, data: dict = Body(...)):
-    db = SessionLocal()
-    try:
-        service = db.query(Service).filter(Service.id == service_id).first()
+@router.post("/services/{service_id}/responses", response_model=ResponseChangedOut)
+def add_service_response(
+    service_id: int,
+    db: Session = Depends(get_db),
+    current_user: AuthUser = Depends(get_current_user)
+):
+    service = db.query(Service.id, Service.user_id).filter(Service.id == service_id).first()
+    if not service:
+        raise HTTPException(status_code=404, detail="Услуга не найдена")
 
-        if not service:
-            raise HTTPException(status_code=404, detail="Услуга не найдена")
+    # Откликается только сам пользователь, под своим именем
+    responder_name = current_user.username
+    if not add_response(db, service_id, responder_name):
+        db.rollback()
+        raise HTTPException(
+            status_code=400,
+            detail="Вы уже откликнулись на эту услугу"
+        )
 
-        responder_name = data.get("name")
-        if not responder_name:
-            raise HTTPException(status_code=400, detail="Имя откликнувшегося обязательно")
+    bump_versions(db, [SERVICES, service_key(service_id)])
+    db.commit()
 
-        existing_names = []
-        if service.responses:
-            existing_names = [name.strip() for name in service.responses.split(",")]
+    hub.publish(SERVICE_RESPONSE, {"service_id": service_id, "name": responder_name, "action": "added"},
+                [service_channel(service_id), user_channel(service.user_id)])
+    return {"message": "Отклик успешно добавлен", "name": responder_name}
 
-        if responder_name in existing_names:
-            raise HTTPException(
-                status_code=400,
-                detail="Вы уже откликнулись на эту услугу"
-            )
+@router.delete("/services/{service_id}/responses", response_model=ResponseChangedOut)
+def delete_service_response(
+    service_id: int,
+    data: Optional[dict] = Body(None),
+    db: Session = Depends(get_db),
+    current_user: AuthUser = Depends(get_current_user)
+):
+    service = db.query(Service.id, Service.user_id).filter(Service.id == service_id).first()
+    if not service:
+        raise HTTPException(status_code=404, detail="Услуга не найдена")
 
-        if service.responses:
-            service.responses = service.responses + "," + responder_name
-        else:
-            service.responses = responder_name
+    # Свой отклик может отозвать любой, чужой - только владелец заказа
+    responder_name = (data or {}).get("name") or current_user.username
+    if responder_name != current_user.username and service.user_id != current_user.id:
+        raise HTTPException(status_code=403, detail="Можно отозвать только свой отклик")
 
-        db.commit()
-        db.refresh(service)
-        return {"message": "Отклик успешно добавлен", "name": responder_name}
-    finally:
-        db.close()
+    if not remove_response(db, service_id, responder_name):
+        raise HTTPException(status_code=404, detail="Отклик не найден")
 
-@router.get("/services/categories")
-def get_all_categories():
-    db = SessionLocal()
-    try:
-        result = db.query(Service.category).all()
-        categories = [row.category for row in result if row.category]
-        return {"categories": categories}
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Ошибка: {str(e)}")
-    finally:
-        db.close()
+    bump_versions(db, [SERVICES, service_key(service_id)])
+    db.commit()
+
+    hub.publish(SERVICE_RESPONSE, {"service_id": service_id, "name": responder_name, "action": "removed"},
+                [service_channel(service_id)])
+    return {"message": "Отклик удалён", "name": responder_name}
+
+@router.get("/services/{service_id}/responses", response_model=ServiceResponsesPage)
+@query_budget(3)
+def get_service_responses(
+    service_id: int,
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: Session = Depends(get_db)
+):
+    """
+    Откликнувшиеся на заказ, по порядку откликов
+    """
+    query = db.query(ServiceResponse.id, ServiceResponse.responder, ServiceResponse.created_at).filter(
+        ServiceResponse.service_id == service_id
+    )
+    if cursor:
+        (last_id,) = decode_cursor(cursor, 1)
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="Неверный курсор")
+        query = query.filter(ServiceResponse.id > last_id)
+
+    rows = query.order_by(ServiceResponse.id).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].id)
+
+    return {
+        "items": [
+            {
+                "name": row.responder,
+                "created_at": row.created_at.strftime("%Y-%m-%d %H:%M") if row.created_at else None
+            }
+            for row in rows
+        ],
+        "next_cursor": next_cursor
+    }
 
-@router.get("/my-services")
+@router.get("/services/categories", response_model=CategoriesOut)
+@query_budget(2)
+def get_all_categories(request: Request, response: Response, db: Session = Depends(get_db)):
+    """
+    Категории без повторов с количеством открытых заказов
+    """
+    # Попадание в кэш не трогает базу: версия для ETag хранится вместе с категориями
+    entry = categories_cache.get(CATEGORIES_CACHE_KEY)
+    if entry is None:
+        versions = read_versions(db, [CATEGORIES])
+        try:
+            rows = (
+                db.query(
+                    Service.category,
+                    func.sum(case((Service.status == "Открытый", 1), else_=0)).label("open_count")
+                )
+                .filter(Service.category.isnot(None), Service.category != "")
+                .group_by(Service.category)
+                .order_by(Service.category)
+                .all()
+            )
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"Ошибка: {str(e)}")
+        categories = [{"name": row.category, "count": int(row.open_count or 0)} for row in rows]
+        entry = (versions, categories)
+        categories_cache.set(CATEGORIES_CACHE_KEY, entry)
+
+    versions, categories = entry
+    cached = not_modified(request, response, [CATEGORIES], versions)
+    if cached:
+        return cached
+    return {"categories": categories}
+
+@router.get("/my-services", response_model=List[ServiceOut])
 def get_my_services(
     db: Session = Depends(get_db), 
-    current_user: User = Depends(get_current_user)
+    current_user: AuthUser = Depends(get_current_user)
 ):
-    services = db.query(Service).filter(Service.user_id == current_user.id).all()
-    return services
+    rows = db.query(*SERVICE_COLUMNS).filter(Service.user_id == current_user.id).all()
+    return [dict(row._mapping) for row in rows]
 
-@router.patch("/services/{service_id}/complete")
+@router.patch("/services/{service_id}/complete", response_model=CompleteOut)
+@query_budget(10)
 def complete_service(
     service_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthUser = Depends(get_current_user)
 ):
     service = db.query(Service).filter(Service.id == service_id).first()
     if not service:
@@ -176,80 +438,151 @@ def complete_service(
 
     amount = service.price
 
-    balance = db.query(Balance).filter(Balance.user_id == current_user.id).first()
-    if not balance:
-        balance = Balance(user_id=current_user.id, amount=0.0)
-        db.add(balance)
-
- 
-    earnings = db.query(Earnings).filter(Earnings.user_id == current_user.id).first()
-    if not earnings:
-        earnings = Earnings(user_id=current_user.id, total_earned=0.0)
-        db.add(earnings)
-
+    # Статус меняется условным UPDATE: параллельное завершение того же заказа не начислит оплату дважды
+    completed = db.query(Service).filter(
+        Service.id == service_id,
+        Service.status == "В разработке",
+        Service.freelancer_id == current_user.id
+    ).update({Service.status: "Завершенный"}, synchronize_session=False)
+    if not completed:
+        db.rollback()
+        raise HTTPException(status_code=409, detail="Заказ уже завершён")
 
-    balance.amount += amount
-    earnings.total_earned += amount
-
-
-    service.status = "Завершенный"
+    balance_minor = credit_service_payment(db, current_user.id, to_minor(amount), service_id)
+    bump_versions(db, service_changed(service_id))
+    owner_id = service.user_id
 
     db.commit()
+    publish_status(service_id, "Завершенный", owner_id, current_user.id)
+    publish_balance(current_user.id, balance_minor)
 
-    return {"message": f"Заказ завершён. Вам начислено {amount}$", "balance": balance.amount}
+    return {"message": f"Заказ завершён. Вам начислено {amount}$", "balance": from_minor(balance_minor)}
 
-@router.post("/withdraw")
+@router.post("/withdraw", response_model=WithdrawOut)
 def withdraw(
-    amount: float = Body(..., embed=True),
+    amount: float = Body(..., embed=True, gt=0),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthUser = Depends(get_current_user)
 ):
-    balance = db.query(Balance).filter(Balance.user_id == current_user.id).first()
-    if not balance or balance.amount < amount:
-        raise HTTPException(status_code=400, detail="Недостаточно средств")
+    amount_minor = to_minor(amount)
+    if amount_minor <= 0:
+        raise HTTPException(status_code=400, detail="Слишком маленькая сумма")
 
     transaction = Transaction(
         user_id=current_user.id,
         amount=amount,
-        status="Обработан"
+        status=STATUS_PENDING
     )
     db.add(transaction)
+    db.flush()
 
+    # Сумма резервируется сразу, выплата и смена статуса - в фоновой задаче
+    balance_minor = debit_withdrawal(db, current_user.id, amount_minor, transaction.id)
+    if balance_minor is None:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Недостаточно средств")
 
-    balance.amount -= amount
-
+    enqueue(db, JOB_WITHDRAWAL, {
+        "transaction_id": transaction.id,
+        "user_id": current_user.id,
+        "amount_minor": amount_minor
+    })
+    item = transaction_item(transaction)
     db.commit()
-    db.refresh(transaction)
+    notify()
+    publish_balance(current_user.id, balance_minor)
 
-    return {"message": "Запрос на вывод отправлен", "transaction": transaction}
+    return {
+        "message": "Запрос на вывод отправлен",
+        "transaction": item,
+        "balance": from_minor(balance_minor)
+    }
  
-@router.get("/finances")
-def get_finances(
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+FINANCES_RECENT_TRANSACTIONS = 10
+
+
+def transaction_item(row) -> dict:
+    return {
+        "id": row.id,
+        "amount": row.amount,
+        "status": row.status,
+        "created_at": row.created_at.strftime("%Y-%m-%d %H:%M") if row.created_at else None
+    }
+
+
+async def transactions_page(db: AsyncSession, user_id: int, limit: int, cursor: Optional[str] = None) -> dict:
+    """Страница истории (новые сверху) по индексу (user_id, created_at), ключ курсора - (created_at, id)"""
+    query = select(Transaction.id, Transaction.amount, Transaction.status, Transaction.created_at).where(
+        Transaction.user_id == user_id
+    )
+    if cursor:
+        last_created_at, last_id = decode_cursor(cursor, 2)
+        try:
+            last_created_at = datetime.fromisoformat(last_created_at)
+        except (TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Неверный курсор")
+        if not isinstance(last_id, int):
+            raise HTTPException(status_code=400, detail="Неверный курсор")
+        query = query.where(or_(
+            Transaction.created_at < last_created_at,
+            and_(Transaction.created_at == last_created_at, Transaction.id < last_id)
+        ))
+
+    rows = (await db.execute(
+        query.order_by(Transaction.created_at.desc(), Transaction.id.desc()).limit(limit + 1)
+    )).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at.isoformat(), rows[-1].id)
+
+    return {
+        "items": [transaction_item(row) for row in rows],
+        "next_cursor": next_cursor
+    }
+
+
+@router.get("/finances", response_model=FinancesOut)
+@query_budget(3)
+async def get_finances(
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthUser = Depends(get_current_user)
 ):
-    balance = db.query(Balance).filter(Balance.user_id == current_user.id).first()
-    earnings = db.query(Earnings).filter(Earnings.user_id == current_user.id).first()
-    transactions = db.query(Transaction).filter(Transaction.user_id == current_user.id).order_by(Transaction.created_at.desc()).all()
+    """
+    Баланс, общий доход и последние транзакции; остальная история - через /finances/transactions
+    """
+    wallet = (await db.execute(
+        select(Wallet.balance_minor, Wallet.earned_minor).where(Wallet.user_id == current_user.id)
+    )).first()
+    recent = await transactions_page(db, current_user.id, FINANCES_RECENT_TRANSACTIONS)
 
     return {
-        "balance": balance.amount if balance else 0.0,
-        "total_earned": earnings.total_earned if earnings else 0.0,
-        "transactions": [
-            {
-                "id": t.id,
-                "amount": t.amount,
-                "status": t.status,
-                "created_at": t.created_at.strftime("%Y-%m-%d %H:%M")
-            }
-            for t in transactions
-        ]
+        "balance": from_minor(wallet.balance_minor) if wallet else 0.0,
+        "total_earned": from_minor(wallet.earned_minor) if wallet else 0.0,
+        "transactions": recent["items"],
+        "next_cursor": recent["next_cursor"]
     }
-@router.post("/services/{service_id}/respond")
+
+@router.get("/finances/transactions", response_model=TransactionsPage)
+@query_budget(2)
+async def get_transactions(
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthUser = Depends(get_current_user)
+):
+    """
+    История транзакций с keyset-пагинацией
+    """
+    return await transactions_page(db, current_user.id, limit, cursor)
+
+@router.post("/services/{service_id}/respond", response_model=RespondOut)
+@query_budget(6)
 def respond_to_service(
     service_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthUser = Depends(get_current_user)
 ):
     print(f"🎯 Начало обработки отклика на заказ {service_id}")
     service = db.query(Service).filter(Service.id == service_id).first()
@@ -262,11 +595,11 @@ def respond_to_service(
 
     service.freelancer_id = current_user.id
     service.status = "В разработке"
-
-
+    bump_versions(db, service_changed(service_id))
 
     db.commit()
     db.refresh(service)
+    publish_status(service.id, service.status, service.user_id, service.freelancer_id)
 
     return {
         "message": "Вы откликнулись на заказ",
@@ -274,51 +607,80 @@ def respond_to_service(
         "freelancer_id": service.freelancer_id
     }
 
-@router.get("/services/{service_id}")
-def get_service(service_id: int, db: Session = Depends(get_db)):
-    service = db.query(Service).filter(Service.id == service_id).first()
-    if not service:
+@router.get("/services/{service_id}", response_model=ServiceDetail)
+@query_budget(4)
+async def get_service(service_id: int, request: Request, response: Response, db: AsyncSession = Depends(get_async_db)):
+    # Карточки заказчика и исполнителя с рейтингами - часть представления, поэтому и версия USERS
+    keys = [service_key(service_id), USERS]
+    cached = not_modified(request, response, keys, await db.run_sync(read_versions, keys))
+    if cached:
+        return cached
+
+    row = (await db.execute(
+        select(*SERVICE_COLUMNS, User.username.label("owner_name"), User.email.label("owner_email"))
+        .join(User, User.id == Service.user_id)
+        .where(Service.id == service_id)
+    )).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Сервис не найден")
 
-    owner = db.query(User).filter(User.id == service.user_id).first()
-    if not owner:
-        raise HTTPException(status_code=404, detail="Заказчик не найден")
+    cards = await db.run_sync(get_user_cards, [row.user_id, row.freelancer_id])
+    reviews = (await db.execute(
+        select(Review.id, Review.service_id, Review.reviewer_id, Review.worker_id, Review.rating, Review.created_at)
+        .where(Review.service_id == service_id)
+        .order_by(Review.id)
+    )).all()
 
     return {
-        "id": service.id,
-        "service_title": service.service_title,
-        "description": service.description,
-        "price": service.price,
-        "duration": service.duration,
-        "skills": service.skills,
-        "image_path": service.image_path,
-        "reviews": service.reviews,
-        "status": service.status,
-        "category": service.category,
-        "responses": service.responses,
-        "freelancer_name": service.freelancer_name,
-        "user_id": service.user_id,
+        "id": row.id,
+        "service_title": row.service_title,
+        "description": row.description,
+        "price": row.price,
+        "duration": row.duration,
+        "skills": row.skills,
+        "image_path": row.image_path,
+        "image_variants": await run_in_threadpool(image_variants, row.image_path),
+        "reviews": [
+            {
+                **review._mapping,
+                "created_at": review.created_at.strftime("%Y-%m-%d %H:%M") if review.created_at else None
+            }
+            for review in reviews
+        ],
+        "status": row.status,
+        "category": row.category,
+        "responses_count": row.responses_count,
+        "freelancer_name": row.freelancer_name,
+        "user_id": row.user_id,
+        "freelancer_id": row.freelancer_id,
         "customer": {
-            "name": owner.username,
-            "email": owner.email
-        }
+            "name": row.owner_name,
+            "email": row.owner_email
+        },
+        "owner": cards.get(row.user_id),
+        "freelancer": cards.get(row.freelancer_id)
     }
-@router.get("/my-completed-services")
+@router.get("/my-completed-services", response_model=List[CompletedServiceItem])
+@query_budget(2)
 def get_my_completed_services(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthUser = Depends(get_current_user)
 ):
 
-    services = db.query(Service).filter(
-        Service.freelancer_id == current_user.id,
-        Service.status == "Завершенный"
-    ).all()
+    services = (
+        db.query(*SERVICE_COLUMNS, User.username.label("customer_name"))
+        .outerjoin(User, User.id == Service.user_id)
+        .filter(
+            Service.freelancer_id == current_user.id,
+            Service.status == "Завершенный"
+        )
+        .all()
+    )
 
     result = []
     for service in services:
 
-        customer = db.query(User).filter(User.id == service.user_id).first()
-        customer_name = customer.username if customer else "Неизвестно"
+        customer_name = service.customer_name or "Неизвестно"
 
   
         price = float(service.price) if service.price is not None else 0.0
@@ -340,12 +702,13 @@ def get_my_completed_services(
 
     return result
 
-@router.post("/services/{service_id}/rate")
+@router.post("/services/{service_id}/rate", response_model=MessageOut)
+@query_budget(9)
 def rate_worker(
     service_id: int,
     rating: float = Body(..., embed=True, ge=0.5, le=5),
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthUser = Depends(get_current_user)
 ):
     """
     Оценить исполнителя после завершения заказа
@@ -383,15 +746,27 @@ def rate_worker(
         rating=rating
     )
     db.add(review)
+    try:
+        db.flush()
+    except IntegrityError:
+        # Параллельный запрос того же заказчика успел оценить первым
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Вы уже оценили этот заказ")
+    record_rating(db, service.freelancer_id, rating)
+    worker_id = service.freelancer_id
+    bump_versions(db, [service_key(service_id)] + user_changed(worker_id))
     db.commit()
 
+    hub.publish(RATING, {"service_id": service_id, "worker_id": worker_id, "rating": rating},
+                [service_channel(service_id), user_channel(worker_id)])
+
     return {"message": "Оценка успешно добавлена"}
-    
-@router.get("/services/{service_id}/has-rated")
+
+@router.get("/services/{service_id}/has-rated", response_model=HasRatedOut)
 def has_user_rated(
     service_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthUser = Depends(get_current_user)
 ):
 
     review = db.query(Review).filter(
@@ -400,62 +775,26 @@ def has_user_rated(
     ).first()
     return {"has_rated": review is not None}
 
-@router.post("/services/{service_id}/rate")
-def rate_user(
-    service_id: int,
-    rating: float = Body(..., ge=0.5, le=5),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
-):
-
-    service = db.query(Service).filter(Service.id == service_id).first()
-    if not service:
-        raise HTTPException(status_code=404, detail="Заказ не найден")
-
-    if service.status != "Завершенный":
-        raise HTTPException(status_code=400, detail="Заказ ещё не завершён")
-
-
-    if service.user_id != current_user.id:
-        raise HTTPException(status_code=403, detail="Оценивать может только заказчик")
-
-    if not service.freelancer_id:
-        raise HTTPException(status_code=400, detail="У заказа нет исполнителя")
-
-    existing_review = db.query(Review).filter(
-        Review.service_id == service_id,
-        Review.reviewer_id == current_user.id
-    ).first()
-
-    if existing_review:
-        raise HTTPException(status_code=400, detail="Вы уже оценили этот заказ")
-
-
-    review = Review(
-        rating=rating,
-        reviewer_id=current_user.id,
-        worker_id=service.freelancer_id,
-        service_id=service_id
-    )
-    db.add(review)
-    db.commit()
-
-    return {"message": "Оценка успешно добавлена"}
-
-@router.get("/users/{user_id}/rating")
+@router.get("/users/{user_id}/rating", response_model=RatingOut)
 def get_user_rating(user_id: int, db: Session = Depends(get_db)):
     """
     Получить средний рейтинг пользователя
     """
-    reviews = db.query(Review).filter(Review.worker_id == user_id).all()
-    
-    if not reviews:
-        return {"rating": 0.0, "count": 0}
+    return get_rating(db, user_id)
 
-    total = sum(r.rating for r in reviews)
-    avg = total / len(reviews)
-
-    return {"rating": round(avg, 1), "count": len(reviews)}
+@router.get("/ratings", response_model=RatingsOut)
+@query_budget(1)
+def get_users_ratings(ids: str = Query(..., description="id исполнителей через запятую"), db: Session = Depends(get_db)):
+    """
+    Рейтинги сразу нескольких исполнителей
+    """
+    try:
+        worker_ids = list(dict.fromkeys(int(part) for part in ids.split(",") if part.strip()))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Параметр 'ids' должен содержать числа через запятую")
 
+    if len(worker_ids) > MAX_PAGE_SIZE:
+        raise HTTPException(status_code=400, detail=f"Не больше {MAX_PAGE_SIZE} исполнителей за запрос")
 
-    
\ No newline at end of file
+    ratings = get_ratings(db, worker_ids)
+    return {"ratings": {worker_id: ratings.get(worker_id, empty_rating()) for worker_id in worker_ids}}
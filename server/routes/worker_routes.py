@@ -1,10 +1,18 @@
 import os
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from database import SessionLocal
-from models.user import User
-from core.security import get_current_user 
+from core.security import get_current_user, get_async_db, AuthUser
 from models.worker import Worker
+from core.uploads import save_upload
+from core.images import enqueue_variants, image_variants
+from core.jobs import notify
+from core.versions import user_changed, bump_versions
+from schemas.common import MessageOut
+from schemas.workers import WorkerSavedOut, CurrentWorkerOut
 
 router = APIRouter()
 
@@ -18,7 +26,7 @@ def get_db():
 
 os.makedirs("user_images", exist_ok=True)
 
-@router.post("/worker")
+@router.post("/worker", response_model=WorkerSavedOut)
 async def create_worker(
     name: str = Form(None),
     email: str = Form(None),
@@ -28,33 +36,26 @@ async def create_worker(
     city: str = Form(None),
     description: str = Form(None),
     image: UploadFile = File(None),
-    db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    db: AsyncSession = Depends(get_async_db),
+    current_user: AuthUser = Depends(get_current_user)
 ):
 
 
 
 
-    worker = db.query(Worker).filter(Worker.user_id == current_user.id).first()
+    worker = await db.scalar(select(Worker).where(Worker.user_id == current_user.id))
 
 
     image_path = worker.image_path if worker else None
     
 
     if image:
-        file_extension = image.filename.split(".")[-1]
-        new_filename = f"user_{current_user.id}.{file_extension}"
-        image_path = f"user_images/{new_filename}"
-        print(f"📷 Начинаю сохранение файла: {image.filename} → {image_path}")
-
-        os.makedirs("user_images", exist_ok=True)
-
         try:
-            with open(image_path, "wb") as f:
-                content = await image.read()
-                print(f"📝 Прочитано байт: {len(content)}") 
-                f.write(content)
-            print(f"✅ Файл успешно сохранён на диск: {image_path}")
+            image_path = await save_upload(image, "user_images")
+            await db.run_sync(enqueue_variants, image_path, user_changed(current_user.id))
+            print(f"✅ Файл успешно сохранён на диск: {image.filename} → {image_path}")
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"❌ Ошибка при сохранении файла: {str(e)}")
             raise HTTPException(status_code=500, detail="Не удалось сохранить изображение")
@@ -95,11 +96,13 @@ async def create_worker(
         db.add(worker)
 
     try:
-        db.commit()
-        db.refresh(worker)
+        await db.run_sync(bump_versions, user_changed(current_user.id))
+        await db.commit()
+        await db.refresh(worker)
+        notify()
         print("✅ Данные сохранены в БД")
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         print(f"❌ Ошибка при сохранении в БД: {str(e)}")
         raise HTTPException(status_code=400, detail=f"Ошибка при сохранении в БД: {str(e)}")
 
@@ -116,12 +119,13 @@ async def create_worker(
             "city": worker.city,
             "description": worker.description,
             "data": worker.data.strftime("%Y-%m-%d") if worker.data else None,
-            "image_path": worker.image_path
+            "image_path": worker.image_path,
+            "image_variants": await run_in_threadpool(image_variants, worker.image_path)
         }
     }
 
 
-@router.delete("/pizzas/{pizza_id}")
+@router.delete("/pizzas/{pizza_id}", response_model=MessageOut)
 def delete_pizza(pizza_id: int):
 
     db = SessionLocal()
@@ -139,14 +143,17 @@ def delete_pizza(pizza_id: int):
     
     return {"message": "Пицца удалена!"}
 
-@router.get("/worker/me")
+@router.get("/worker/me", response_model=CurrentWorkerOut)
 def get_current_worker(
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthUser = Depends(get_current_user)
 ):
 
 
-    worker = db.query(Worker).filter(Worker.user_id == current_user.id).first()
+    worker = db.query(
+        Worker.name, Worker.surname, Worker.number, Worker.country,
+        Worker.city, Worker.description, Worker.data, Worker.image_path
+    ).filter(Worker.user_id == current_user.id).first()
 
 
     return {
@@ -0,0 +1,29 @@
+from typing import Optional
+from pydantic import BaseModel
+
+
+class MessageOut(BaseModel):
+    message: str
+
+
+class ImageVariants(BaseModel):
+    thumb: Optional[str] = None
+    card: Optional[str] = None
+    full: Optional[str] = None
+    original: Optional[str] = None
+    ready: bool = False
+
+
+class RatingOut(BaseModel):
+    rating: float
+    count: int
+
+
+class UserCard(BaseModel):
+    """Краткая карточка пользователя (core.users.build_user_card)"""
+    id: int
+    username: str
+    image_path: Optional[str] = None
+    image_variants: Optional[ImageVariants] = None
+    rating: float
+    count: int
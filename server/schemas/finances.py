@@ -0,0 +1,27 @@
+from typing import Optional, List
+from pydantic import BaseModel
+
+
+class TransactionItem(BaseModel):
+    id: int
+    amount: float
+    status: Optional[str] = None
+    created_at: Optional[str] = None
+
+
+class TransactionsPage(BaseModel):
+    items: List[TransactionItem]
+    next_cursor: Optional[str] = None
+
+
+class FinancesOut(BaseModel):
+    balance: float
+    total_earned: float
+    transactions: List[TransactionItem]
+    next_cursor: Optional[str] = None
+
+
+class WithdrawOut(BaseModel):
+    message: str
+    transaction: TransactionItem
+    balance: float
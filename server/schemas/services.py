@@ -0,0 +1,177 @@
+from typing import Optional, List, Dict
+from pydantic import BaseModel, ConfigDict
+from schemas.common import ImageVariants, RatingOut, UserCard
+
+
+class ServiceOut(BaseModel):
+    """Заказ целиком, без связей"""
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    freelancer_name: str
+    service_title: str
+    description: Optional[str] = None
+    price: float
+    image_path: Optional[str] = None
+    duration: Optional[int] = None
+    skills: Optional[str] = None
+    freelancer_id: Optional[int] = None
+    status: str
+    responses_count: int = 0
+    category: Optional[str] = None
+    user_id: int
+
+
+class ServiceListItem(BaseModel):
+    id: int
+    freelancer_name: str
+    service_title: str
+    description: Optional[str] = None
+    price: float
+    image_path: Optional[str] = None
+    image_variants: Optional[ImageVariants] = None
+    duration: Optional[int] = None
+    skills: Optional[str] = None
+    freelancer_id: Optional[int] = None
+    status: str
+    category: Optional[str] = None
+    user_id: int
+    responses_count: int = 0
+    owner: Optional[UserCard] = None
+    freelancer: Optional[UserCard] = None
+
+
+class ServiceListPage(BaseModel):
+    items: List[ServiceListItem]
+    next_cursor: Optional[str] = None
+
+
+class ServiceSearchItem(BaseModel):
+    id: int
+    service_title: str
+    title_highlight: Optional[str] = None
+    snippet: Optional[str] = None
+    rank: Optional[float] = None
+    description: Optional[str] = None
+    price: float
+    duration: Optional[int] = None
+    skills: Optional[str] = None
+    status: str
+    category: Optional[str] = None
+    image_path: Optional[str] = None
+    image_variants: Optional[ImageVariants] = None
+    user_id: int
+    freelancer_id: Optional[int] = None
+
+
+class ServiceSearchPage(BaseModel):
+    items: List[ServiceSearchItem]
+    next_offset: Optional[int] = None
+
+
+class ServiceCreatedOut(BaseModel):
+    message: str
+    service: ServiceOut
+    image_variants: Optional[ImageVariants] = None
+
+
+class StatusUpdatedOut(BaseModel):
+    message: str
+    status: str
+
+
+class ReviewsUpdatedOut(BaseModel):
+    message: str
+    reviews: Optional[int] = None
+
+
+class ResponseChangedOut(BaseModel):
+    message: str
+    name: str
+
+
+class ServiceResponseItem(BaseModel):
+    name: str
+    created_at: Optional[str] = None
+
+
+class ServiceResponsesPage(BaseModel):
+    items: List[ServiceResponseItem]
+    next_cursor: Optional[str] = None
+
+
+class CategoryOut(BaseModel):
+    name: str
+    count: int
+
+
+class CategoriesOut(BaseModel):
+    categories: List[CategoryOut]
+
+
+class CompleteOut(BaseModel):
+    message: str
+    balance: float
+
+
+class RespondOut(BaseModel):
+    message: str
+    status: str
+    freelancer_id: int
+
+
+class CustomerOut(BaseModel):
+    name: str
+    email: Optional[str] = None
+
+
+class ReviewOut(BaseModel):
+    id: int
+    service_id: int
+    reviewer_id: int
+    worker_id: int
+    rating: float
+    created_at: Optional[str] = None
+
+
+class ServiceDetail(BaseModel):
+    id: int
+    service_title: str
+    description: Optional[str] = None
+    price: float
+    duration: Optional[int] = None
+    skills: Optional[str] = None
+    image_path: Optional[str] = None
+    image_variants: Optional[ImageVariants] = None
+    reviews: List[ReviewOut]
+    status: str
+    category: Optional[str] = None
+    responses_count: int = 0
+    freelancer_name: str
+    user_id: int
+    freelancer_id: Optional[int] = None
+    customer: CustomerOut
+    owner: Optional[UserCard] = None
+    freelancer: Optional[UserCard] = None
+
+
+class CompletedServiceItem(BaseModel):
+    id: int
+    service_title: str
+    description: Optional[str] = None
+    price: float
+    duration: int
+    category: Optional[str] = None
+    status: str
+    image_path: Optional[str] = None
+    freelancer_name: str
+    customer_name: str
+    customer_id: int
+
+
+class HasRatedOut(BaseModel):
+    has_rated: bool
+
+
+class RatingsOut(BaseModel):
+    ratings: Dict[int, RatingOut]
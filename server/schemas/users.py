@@ -0,0 +1,41 @@
+from typing import Optional, List
+from pydantic import BaseModel
+from schemas.common import UserCard
+
+
+class UserRegister(BaseModel):
+    username: str
+    email: str
+    password: str
+
+
+class UserLogin(BaseModel):
+    username: str
+    password: str
+
+
+class AuthUserOut(BaseModel):
+    id: int
+    username: str
+    email: Optional[str] = None
+
+
+class AuthOut(BaseModel):
+    token: str
+    user: AuthUserOut
+    message: Optional[str] = None
+
+
+class UsersBatchOut(BaseModel):
+    users: List[UserCard]
+
+
+class UserOut(BaseModel):
+    id: int
+    username: str
+    email: Optional[str] = None
+    image_path: Optional[str] = None
+
+
+class AvatarOut(BaseModel):
+    image_path: Optional[str] = None
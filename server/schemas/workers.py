@@ -0,0 +1,41 @@
+from typing import Optional
+from pydantic import BaseModel
+from schemas.common import ImageVariants
+
+
+class WorkerOut(BaseModel):
+    id: int
+    name: Optional[str] = None
+    surname: Optional[str] = None
+    email: Optional[str] = None
+    number: Optional[str] = None
+    country: Optional[str] = None
+    city: Optional[str] = None
+    description: Optional[str] = None
+    data: Optional[str] = None
+    image_path: Optional[str] = None
+    image_variants: Optional[ImageVariants] = None
+
+
+class WorkerSavedOut(BaseModel):
+    message: str
+    user: WorkerOut
+
+
+class CurrentWorker(BaseModel):
+    id: int
+    username: str
+    email: Optional[str] = None
+    name: Optional[str] = None
+    surname: Optional[str] = None
+    number: Optional[str] = None
+    country: Optional[str] = None
+    city: Optional[str] = None
+    description: Optional[str] = None
+    data: Optional[str] = None
+    image_path: Optional[str] = None
+
+
+class CurrentWorkerOut(BaseModel):
+    message: str
+    user: CurrentWorker
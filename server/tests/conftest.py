@@ -0,0 +1,82 @@
+"""
+Тесты запускаются из server/: python -m pytest -q
+Приложение поднимается на временной SQLite-базе с QUERY_BUDGET_MODE=raise:
+маршрут, превысивший @query_budget или повторяющий запрос (N+1), роняет тест
+"""
+import os
+import sys
+import tempfile
+
+import pytest
+
+SERVER_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WORK_DIR = tempfile.mkdtemp(prefix="lapis-tests-")
+
+os.environ.update({
+    "DATABASE_URL": f"sqlite:///{os.path.join(WORK_DIR, 'test.db')}",
+    "AUTO_MIGRATE": "1",
+    "QUERY_BUDGET_MODE": "raise",
+    "RATE_LIMIT_ENABLED": "0",
+    "JOB_WORKERS": "0",
+    "LEDGER_SNAPSHOT_INTERVAL": "0",
+    "BCRYPT_ROUNDS": "4",
+})
+sys.path.insert(0, SERVER_DIR)
+# Загруженные картинки пишутся в относительные папки - держим их во временном каталоге
+os.chdir(WORK_DIR)
+os.makedirs("pizza_images", exist_ok=True)
+
+
+def _enforce_foreign_keys(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.close()
+
+
+# SQLite по умолчанию не проверяет внешние ключи - в тестах проверяет, как Postgres
+import database
+from sqlalchemy import event
+event.listen(database.engine, "connect", _enforce_foreign_keys)
+event.listen(database.async_engine.sync_engine, "connect", _enforce_foreign_keys)
+
+
+@pytest.fixture(scope="session")
+def app():
+    from main import app
+    return app
+
+
+@pytest.fixture(scope="session")
+def client(app):
+    from fastapi.testclient import TestClient
+    return TestClient(app)
+
+
+@pytest.fixture(scope="session")
+def register(client):
+    """Зарегистрировать пользователя: (id, заголовки с токеном)"""
+    def create(username: str):
+        response = client.post("/register", json={
+            "username": username, "email": f"{username}@example.com", "password": "secret"
+        })
+        assert response.status_code == 200, response.text
+        body = response.json()
+        return body["user"]["id"], {"Authorization": f"Bearer {body['token']}"}
+
+    return create
+
+
+@pytest.fixture
+def db(app):
+    from database import SessionLocal
+    with SessionLocal() as session:
+        yield session
+
+
+@pytest.fixture
+def empty_queue(db):
+    """Задачи, оставшиеся от других тестов, не должны попасть в claim_job"""
+    from sqlalchemy import delete
+    from models.job import Job
+    db.execute(delete(Job))
+    db.commit()
@@ -0,0 +1,68 @@
+"""Варианты изображений: одна задача на файл, версии всех записей с ним поднимаются"""
+import io
+import json
+
+from PIL import Image
+from sqlalchemy import delete, select
+
+from models.job import Job
+from models.service import Service
+from core.images import JOB_IMAGE_VARIANTS, shutdown_image_pool
+from core.jobs import claim_job, run_job
+from core.versions import read_versions, service_key
+
+
+def png_bytes() -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (64, 48), "teal").save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def add_service(client, headers: dict, image: bytes) -> dict:
+    response = client.post("/services", headers=headers, files={"image": ("photo.png", image, "image/png")}, data={
+        "freelancer_name": "images",
+        "service_title": "Заказ с фото",
+        "description": "Описание",
+        "price": "10",
+        "duration": "1",
+        "skills": "figma",
+        "category": "Дизайн",
+    })
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def variant_jobs(db) -> list:
+    db.expire_all()
+    return db.execute(select(Job.dedupe_key, Job.payload).where(Job.kind == JOB_IMAGE_VARIANTS)).all()
+
+
+def test_same_image_is_processed_once(client, db, register, empty_queue):
+    user_id, headers = register("images_owner")
+    image = png_bytes()
+    first = add_service(client, headers, image)
+    second = add_service(client, headers, image)
+    image_path = first["service"]["image_path"]
+    assert second["service"]["image_path"] == image_path
+
+    jobs = variant_jobs(db)
+    assert len(jobs) == 1
+    assert jobs[0].dedupe_key == image_path
+    keys = json.loads(jobs[0].payload)["version_keys"]
+    service_keys = [service_key(first["service"]["id"]), service_key(second["service"]["id"])]
+    assert set(service_keys) <= set(keys)
+
+    before = read_versions(db, service_keys)
+    try:
+        assert run_job(*claim_job(db)) == "done"
+    finally:
+        shutdown_image_pool()
+    after = read_versions(db, service_keys)
+    assert all(after[key][0] == before[key][0] + 1 for key in service_keys)
+
+    third = add_service(client, headers, image)
+    assert third["image_variants"]["ready"] is True
+    assert variant_jobs(db) == []
+    # Остальные тесты считают заказы в общей базе
+    db.execute(delete(Service).where(Service.user_id == user_id))
+    db.commit()
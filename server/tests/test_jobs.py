@@ -0,0 +1,97 @@
+"""Очередь фоновых задач: аренда, повторная выдача и экспоненциальная задержка"""
+import datetime
+
+from sqlalchemy import select, update
+
+from models.job import Job
+from core import jobs
+from core.jobs import job_handler, enqueue, claim_job, run_job, backoff_seconds, QUEUED, RUNNING
+from core.versions import bump_versions, read_versions
+from core.config import JOB_BACKOFF_BASE, JOB_BACKOFF_MAX
+
+JOB_TOUCH = "test_touch"
+JOB_BROKEN = "test_broken"
+TOUCH_KEY = "test:touched"
+
+
+@job_handler(JOB_TOUCH)
+def touch(db, payload: dict):
+    bump_versions(db, [TOUCH_KEY])
+
+
+@job_handler(JOB_BROKEN, max_attempts=3)
+def broken(db, payload: dict):
+    raise RuntimeError("сломано")
+
+
+def touched(db) -> int:
+    return read_versions(db, [TOUCH_KEY]).get(TOUCH_KEY, (0, None))[0]
+
+
+def put(db, kind: str):
+    enqueue(db, kind, {})
+    db.commit()
+
+
+def job_row(db):
+    db.expire_all()
+    return db.execute(select(Job.status, Job.attempts, Job.run_at, Job.last_error)).one()
+
+
+def test_expired_lease_is_reclaimed_and_stale_worker_loses(db, empty_queue):
+    put(db, JOB_TOUCH)
+    first, stale_lease = claim_job(db)
+    assert claim_job(db) is None
+
+    db.execute(update(Job).values(locked_until=datetime.datetime.utcnow() - datetime.timedelta(seconds=1)))
+    db.commit()
+    second, lease = claim_job(db)
+    assert second.id == first.id and lease != stale_lease
+    assert second.attempts == 2
+
+    before = touched(db)
+    # Старый воркер доделал задачу после потери аренды: его изменения откатываются
+    assert run_job(first, stale_lease) == "lost"
+    assert touched(db) == before
+    assert run_job(second, lease) == "done"
+    assert touched(db) == before + 1
+    assert db.execute(select(Job.id)).first() is None
+
+
+def test_failure_is_retried_with_backoff_then_failed(db, empty_queue):
+    put(db, JOB_BROKEN)
+    started = datetime.datetime.utcnow()
+    assert run_job(*claim_job(db)) == "retry"
+
+    status, attempts, run_at, last_error = job_row(db)
+    assert (status, attempts) == (QUEUED, 1)
+    assert "сломано" in last_error
+    delay = (run_at - started).total_seconds()
+    assert JOB_BACKOFF_BASE * 0.5 - 0.1 <= delay <= JOB_BACKOFF_BASE + 1
+    # Задержка ещё не прошла - задачу никто не возьмёт
+    assert claim_job(db) is None
+
+    for expected in ("retry", "failed"):
+        db.execute(update(Job).values(run_at=datetime.datetime.utcnow()))
+        db.commit()
+        assert run_job(*claim_job(db)) == expected
+    assert job_row(db)[:2] == ("failed", 3)
+
+
+def test_backoff_grows_exponentially_up_to_max(monkeypatch):
+    monkeypatch.setattr(jobs.random, "uniform", lambda low, high: high)
+    assert backoff_seconds(1) == JOB_BACKOFF_BASE
+    assert backoff_seconds(2) == JOB_BACKOFF_BASE * 2
+    assert backoff_seconds(3) == JOB_BACKOFF_BASE * 4
+    assert backoff_seconds(50) == JOB_BACKOFF_MAX
+
+    monkeypatch.setattr(jobs.random, "uniform", lambda low, high: low)
+    assert backoff_seconds(2) == JOB_BACKOFF_BASE
+
+
+def test_running_job_is_not_claimed_twice(db, empty_queue):
+    put(db, JOB_TOUCH)
+    claimed, lease = claim_job(db)
+    assert job_row(db)[0] == RUNNING
+    assert claim_job(db) is None
+    assert run_job(claimed, lease) == "done"
@@ -0,0 +1,104 @@
+"""Журнал движения денег"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from sqlalchemy import func, select
+
+from database import SessionLocal
+from models.ledger_entry import LedgerEntry
+from models.wallet import Wallet
+from core.ledger import credit_service_payment, debit_withdrawal, take_snapshots, to_minor, KIND_WITHDRAWAL
+
+
+def test_delete_user_keeps_ledger(client, db, register):
+    """Пользователь с заказом и выводом удаляется при включённых внешних ключах, журнал остаётся"""
+    user_id, headers = register("ledger_deleted")
+    response = client.post("/services", headers=headers, files={"image": ("a.png", b"\x89PNG\r\n\x1a\n", "image/png")}, data={
+        "freelancer_name": "ledger_deleted",
+        "service_title": "Заказ",
+        "description": "Описание",
+        "price": "50",
+        "duration": "1",
+        "skills": "python",
+        "category": "Программирование",
+    })
+    assert response.status_code == 200, response.text
+    credit_service_payment(db, user_id, to_minor(50), response.json()["service"]["id"])
+    db.commit()
+    assert client.post("/withdraw", headers=headers, json={"amount": 20}).status_code == 200
+
+    response = client.delete(f"/users/{user_id}")
+    assert response.status_code == 200, response.text
+
+    assert db.scalar(select(Wallet.user_id).where(Wallet.user_id == user_id)) is None
+    entries = db.scalar(select(func.count()).select_from(LedgerEntry).where(LedgerEntry.user_id == user_id))
+    assert entries == 2
+
+
+def funded_user(client, db, register, username: str, amount: float) -> int:
+    user_id, _ = register(username)
+    credit_service_payment(db, user_id, to_minor(amount), None)
+    db.commit()
+    return user_id
+
+
+def balance(db, user_id: int) -> int:
+    db.expire_all()
+    return db.scalar(select(Wallet.balance_minor).where(Wallet.user_id == user_id))
+
+
+def test_overdraft_is_rejected(client, db, register):
+    user_id = funded_user(client, db, register, "ledger_overdraft", 10)
+    entries = db.scalar(select(func.count()).select_from(LedgerEntry).where(LedgerEntry.user_id == user_id))
+
+    assert debit_withdrawal(db, user_id, to_minor(15)) is None
+    db.commit()
+    assert balance(db, user_id) == to_minor(10)
+    assert db.scalar(select(func.count()).select_from(LedgerEntry).where(LedgerEntry.user_id == user_id)) == entries
+
+    assert debit_withdrawal(db, user_id, to_minor(10)) == 0
+    db.commit()
+    assert balance(db, user_id) == 0
+
+
+def test_concurrent_debits_never_overdraw(client, db, register):
+    """Восемь параллельных списаний по 20$ со 100$: проходят ровно пять, баланс не уходит в минус"""
+    user_id = funded_user(client, db, register, "ledger_concurrent", 100)
+    barrier = threading.Barrier(8)
+
+    def debit():
+        with SessionLocal() as session:
+            barrier.wait()
+            result = debit_withdrawal(session, user_id, to_minor(20))
+            session.commit()
+            return result
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        results = list(pool.map(lambda _: debit(), range(8)))
+
+    assert sum(result is not None for result in results) == 5
+    assert balance(db, user_id) == 0
+    withdrawn = db.scalar(
+        select(func.sum(LedgerEntry.amount_minor))
+        .where(LedgerEntry.user_id == user_id, LedgerEntry.kind == KIND_WITHDRAWAL)
+    )
+    assert withdrawn == -to_minor(100)
+
+
+def test_snapshots_follow_ledger(client, db, register):
+    user_id = funded_user(client, db, register, "ledger_snapshot", 30)
+    debit_withdrawal(db, user_id, to_minor(12))
+    db.commit()
+    take_snapshots(db)
+
+    wallet = db.get(Wallet, user_id)
+    db.refresh(wallet)
+    assert wallet.snapshot_balance_minor == wallet.balance_minor == to_minor(18)
+    assert wallet.snapshot_entry_id == db.scalar(select(func.max(LedgerEntry.id)))
+
+    # Новый кошелёк начинает снимок с конца журнала, а не с нулевой записи
+    newcomer = funded_user(client, db, register, "ledger_snapshot_new", 5)
+    take_snapshots(db)
+    wallet = db.get(Wallet, newcomer)
+    db.refresh(wallet)
+    assert wallet.snapshot_balance_minor == wallet.balance_minor == to_minor(5)
@@ -0,0 +1,103 @@
+"""Бюджеты SQL на горячих маршрутах: в режиме raise превышение или N+1 роняет тест"""
+import pytest
+
+from core.query_budget import QueryBudgetExceeded
+from routes import pizza_routes
+
+PNG = b"\x89PNG\r\n\x1a\n" + b"\x00" * 32
+
+
+def register(client, username: str) -> dict:
+    response = client.post("/register", json={
+        "username": username, "email": f"{username}@example.com", "password": "secret"
+    })
+    assert response.status_code == 200, response.text
+    return {"Authorization": f"Bearer {response.json()['token']}"}
+
+
+def add_service(client, headers: dict, title: str, price: float) -> int:
+    response = client.post("/services", headers=headers, files={"image": (f"{title}.png", PNG, "image/png")}, data={
+        "freelancer_name": "owner",
+        "service_title": title,
+        "description": "Описание заказа",
+        "price": str(price),
+        "duration": "3",
+        "skills": "python, sql",
+        "category": "Программирование",
+    })
+    assert response.status_code == 200, response.text
+    return response.json()["service"]["id"]
+
+
+@pytest.fixture(scope="module")
+def data(client):
+    """Несколько заказчиков и исполнителей: без этого N+1 не отличить от одного запроса"""
+    owners = [register(client, f"owner{i}") for i in range(3)]
+    workers = [register(client, f"worker{i}") for i in range(3)]
+
+    service_ids = []
+    for i, owner in enumerate(owners):
+        for j in range(3):
+            service_ids.append(add_service(client, owner, f"Заказ {i}-{j}", 100 + 10 * j))
+
+    for worker, service_id in zip(workers, service_ids):
+        assert client.post(f"/services/{service_id}/respond", headers=worker).status_code == 200
+        assert client.post(f"/services/{service_id}/responses", headers=worker).status_code == 200
+        assert client.patch(f"/services/{service_id}/complete", headers=worker).status_code == 200
+
+    for i in range(3):
+        assert client.post("/withdraw", headers=workers[0], json={"amount": 10 + i}).status_code == 200
+
+    return {"owners": owners, "workers": workers, "service_ids": service_ids}
+
+
+def test_services_list(client, data):
+    response = client.get("/services")
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == len(data["service_ids"])
+
+
+@pytest.mark.parametrize("embed", ["owner", "freelancer", "owner,freelancer"])
+def test_services_list_with_embed(client, data, embed):
+    response = client.get("/services", params={"embed": embed})
+    assert response.status_code == 200
+
+
+def test_services_list_next_page(client, data):
+    first = client.get("/services", params={"limit": 2}).json()
+    response = client.get("/services", params={"limit": 2, "cursor": first["next_cursor"]})
+    assert response.status_code == 200
+
+
+def test_service_detail(client, data):
+    for service_id in data["service_ids"]:
+        assert client.get(f"/services/{service_id}").status_code == 200
+
+
+def test_finances(client, data):
+    response = client.get("/finances", headers=data["workers"][0])
+    assert response.status_code == 200
+    assert response.json()["transactions"]
+
+
+def test_budget_is_enforced(client, data, monkeypatch):
+    """Проверка, что режим raise действительно включён и бюджет маршрута читается"""
+    monkeypatch.setattr(pizza_routes.get_services, "query_budget", 1)
+    with pytest.raises(QueryBudgetExceeded):
+        client.get("/services")
+
+
+def test_categories_cache_hit_skips_database(client, data, monkeypatch):
+    """Тёплый кэш категорий отвечает без SQL, а новый заказ сбрасывает его после коммита"""
+    client.get("/services/categories")
+    monkeypatch.setattr(pizza_routes.get_all_categories, "query_budget", 0)
+    before = client.get("/services/categories")
+    assert before.status_code == 200
+    assert client.get("/services/categories", headers={"If-None-Match": before.headers["etag"]}).status_code == 304
+
+    monkeypatch.undo()
+    add_service(client, data["owners"][0], "Заказ после кэша", 100)
+    after = client.get("/services/categories")
+    assert after.headers["etag"] != before.headers["etag"]
+    assert sum(item["count"] for item in after.json()["categories"]) == \
+        sum(item["count"] for item in before.json()["categories"]) + 1
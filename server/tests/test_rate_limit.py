@@ -0,0 +1,98 @@
+"""Ограничение частоты запросов"""
+import pytest
+from fastapi import APIRouter, FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import delete, select
+
+from models.rate_limit_bucket import RateLimitBucket
+from core import rate_limit as rate_limit_module
+from core.rate_limit import RateLimitMiddleware, MemoryBuckets, DatabaseBuckets, Rate, rate_limit
+from core.security import create_jwt_token
+
+USER_KEY = "POST /limited|user:7"
+
+
+def limited_client(backend) -> TestClient:
+    router = APIRouter()
+
+    @router.post("/limited")
+    @rate_limit(user="5/60", ip="1/60")
+    def limited():
+        return {"ok": True}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(RateLimitMiddleware, routers=[router], enabled=True, backend=backend)
+    return TestClient(app)
+
+
+def memory_tokens(backend: MemoryBuckets, key: str) -> float:
+    return backend._buckets[key][0]
+
+
+def database_tokens(backend: DatabaseBuckets, key: str) -> float:
+    from database import SessionLocal
+    with SessionLocal() as db:
+        return db.scalar(select(RateLimitBucket.tokens).where(RateLimitBucket.key == key))
+
+
+@pytest.fixture
+def empty_buckets(db):
+    db.execute(delete(RateLimitBucket))
+    db.commit()
+
+
+@pytest.mark.parametrize("backend, tokens", [
+    (MemoryBuckets, memory_tokens),
+    (DatabaseBuckets, database_tokens),
+])
+def test_rejected_by_ip_does_not_spend_user_token(app, empty_buckets, backend, tokens):
+    """Лимит по IP исчерпан: запрос отклонён и не тратит токен пользователя"""
+    backend = backend()
+    client = limited_client(backend)
+    headers = {"Authorization": f"Bearer {create_jwt_token(7)}"}
+
+    assert client.post("/limited", headers=headers).status_code == 200
+    assert tokens(backend, USER_KEY) == pytest.approx(4, abs=0.2)
+
+    for _ in range(3):
+        response = client.post("/limited", headers=headers)
+        assert response.status_code == 429
+        assert int(response.headers["retry-after"]) >= 1
+    assert tokens(backend, USER_KEY) == pytest.approx(4, abs=0.2)
+
+
+class Clock:
+    """Подменяет time в core.rate_limit: корзины пополняются без sleep"""
+
+    def __init__(self, now: float):
+        self.now = now
+
+    def monotonic(self) -> float:
+        return self.now
+
+    def time(self) -> float:
+        return self.now
+
+
+@pytest.mark.parametrize("backend", [MemoryBuckets, DatabaseBuckets])
+def test_bucket_refills_over_time(app, empty_buckets, monkeypatch, backend):
+    clock = Clock(1_000_000.0)
+    monkeypatch.setattr(rate_limit_module, "time", clock)
+    backend = backend()
+    rate = Rate("2/10")
+
+    assert backend.take_sync("refill", rate) == 0
+    assert backend.take_sync("refill", rate) == 0
+    assert backend.take_sync("refill", rate) == pytest.approx(5)
+
+    clock.now += 4
+    assert backend.take_sync("refill", rate) == pytest.approx(1)
+    clock.now += 1
+    assert backend.take_sync("refill", rate) == 0
+
+    # Долгий простой не копит токенов больше ёмкости
+    clock.now += 3600
+    assert backend.take_sync("refill", rate) == 0
+    assert backend.take_sync("refill", rate) == 0
+    assert backend.take_sync("refill", rate) > 0
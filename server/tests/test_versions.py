@@ -0,0 +1,40 @@
+"""Валидаторы условных запросов"""
+import datetime
+from email.utils import format_datetime
+
+from starlette.requests import Request
+
+from core.versions import Validators
+
+
+def request(**headers) -> Request:
+    return Request({
+        "type": "http",
+        "headers": [(name.replace("_", "-").encode(), value.encode()) for name, value in headers.items()],
+    })
+
+
+def http_date(moment: datetime.datetime) -> str:
+    return format_datetime(moment.replace(tzinfo=datetime.timezone.utc), usegmt=True)
+
+
+def test_change_in_current_second_has_no_last_modified():
+    """Вторая запись в ту же секунду дала бы ту же дату - ложный 304 по If-Modified-Since"""
+    now = datetime.datetime.utcnow()
+    validators = Validators(["services"], {"services": (2, now)})
+    assert validators.last_modified is None
+    assert not validators.matches(request(if_modified_since=http_date(now)))
+
+
+def test_if_modified_since_after_the_second_passed():
+    changed = datetime.datetime.utcnow() - datetime.timedelta(seconds=5)
+    validators = Validators(["services"], {"services": (2, changed)})
+    assert validators.matches(request(if_modified_since=http_date(changed)))
+    assert not validators.matches(request(if_modified_since=http_date(changed - datetime.timedelta(seconds=1))))
+
+
+def test_if_none_match_takes_precedence():
+    changed = datetime.datetime.utcnow() - datetime.timedelta(seconds=5)
+    validators = Validators(["services"], {"services": (2, changed)})
+    assert not validators.matches(request(if_none_match='"old"', if_modified_since=http_date(changed)))
+    assert validators.matches(request(if_none_match=validators.etag, if_modified_since="bad date"))
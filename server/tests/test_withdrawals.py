@@ -0,0 +1,83 @@
+"""Выплаты: отказ провайдера возвращает деньги, неизвестный исход оставляет транзакцию на проверку"""
+import datetime
+
+import pytest
+from sqlalchemy import select, update
+
+from models.job import Job
+from models.transaction import Transaction
+from models.wallet import Wallet
+from core import withdrawals
+from core.jobs import claim_job, run_job
+from core.ledger import credit_service_payment, to_minor
+
+
+@pytest.fixture
+def withdrawal(client, db, register, empty_queue, request):
+    """Пользователь со 100$ на балансе вывел 40$; возвращает (id пользователя, id транзакции)"""
+    user_id, headers = register(f"payee_{request.node.name[:40]}")
+    credit_service_payment(db, user_id, to_minor(100), None)
+    db.commit()
+
+    response = client.post("/withdraw", headers=headers, json={"amount": 40})
+    assert response.status_code == 200, response.text
+    return user_id, response.json()["transaction"]["id"]
+
+
+def settle(db):
+    claimed = claim_job(db)
+    assert claimed is not None
+    return run_job(*claimed)
+
+
+def state(db, user_id: int, transaction_id: int):
+    db.expire_all()
+    status = db.scalar(select(Transaction.status).where(Transaction.id == transaction_id))
+    balance_minor = db.scalar(select(Wallet.balance_minor).where(Wallet.user_id == user_id))
+    return status, balance_minor
+
+
+def test_default_provider_marks_processed(db, withdrawal):
+    assert settle(db) == "done"
+    assert state(db, *withdrawal) == (withdrawals.STATUS_DONE, to_minor(60))
+
+
+def test_provider_failure_refunds(db, withdrawal, monkeypatch):
+    def declined(**kwargs):
+        raise withdrawals.PayoutFailed("счёт закрыт")
+
+    monkeypatch.setattr(withdrawals, "_provider", declined)
+    assert settle(db) == "done"
+    assert state(db, *withdrawal) == (withdrawals.STATUS_REJECTED, to_minor(100))
+
+
+def test_unknown_outcome_is_held_without_refund(db, withdrawal, monkeypatch):
+    def timeout(**kwargs):
+        raise TimeoutError("провайдер не ответил")
+
+    monkeypatch.setattr(withdrawals, "_provider", timeout)
+    db.execute(update(Job).values(max_attempts=2))
+    db.commit()
+
+    assert settle(db) == "retry"
+    assert state(db, *withdrawal) == (withdrawals.STATUS_PENDING, to_minor(60))
+
+    db.execute(update(Job).values(run_at=datetime.datetime.utcnow()))
+    db.commit()
+    assert settle(db) == "failed"
+    assert state(db, *withdrawal) == (withdrawals.STATUS_REVIEW, to_minor(60))
+
+
+def test_expired_last_lease_is_held_without_refund(db, withdrawal, monkeypatch):
+    """Воркер взял последнюю попытку и пропал: выплата могла пройти, возвращать нельзя"""
+    calls = []
+    monkeypatch.setattr(withdrawals, "_provider", lambda **kwargs: calls.append(kwargs))
+    db.execute(update(Job).values(
+        status="running", attempts=1, max_attempts=1,
+        locked_until=datetime.datetime.utcnow() - datetime.timedelta(seconds=1)
+    ))
+    db.commit()
+
+    assert settle(db) == "failed"
+    assert calls == []
+    assert state(db, *withdrawal) == (withdrawals.STATUS_REVIEW, to_minor(60))